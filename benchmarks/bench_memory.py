@@ -0,0 +1,82 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Measure the memory held by tree-mode results and parsed config files.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_memory.py``.
+For each monorepo profile of ``benchmarks/suite``, ``resolve_tree()``
+runs under :mod:`tracemalloc`.  The memory still allocated afterwards is
+split into what the results hold and what the cached config files hold,
+by emptying the caches and measuring again.  With ``--classes``, results
+are hash-consed into settings classes.
+"""
+
+import argparse
+import gc
+import tempfile
+import tracemalloc
+
+from suite.monorepo import PROFILES, generate
+
+from toolconfig_core import cache
+from toolconfig_core.ecpy import fnmatch
+from toolconfig_core.resolve import resolve_tree
+from toolconfig_core.settings_classes import SettingsClasses
+
+
+def allocated():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def measure(root, use_classes):
+    """Return ``(files, result bytes, config bytes, peak bytes)``"""
+    cache.clear()
+    fnmatch.clear_cache()
+    tracemalloc.start()
+    try:
+        base = allocated()
+        classes = SettingsClasses() if use_classes else None
+        results = resolve_tree(root, classes=classes)
+        del classes
+        total = allocated() - base
+        cache.clear()
+        fnmatch.clear_cache()
+        held_by_results = allocated() - base
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return len(results), held_by_results, total - held_by_results, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--profile",
+        "-p",
+        action="append",
+        choices=sorted(PROFILES),
+        help="Monorepo shape; repeatable (default all)",
+    )
+    parser.add_argument(
+        "--classes", action="store_true", help="Share results' settings classes"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'profile':<10} {'files':>7} {'results':>10} {'per file':>9}"
+        f" {'configs':>10} {'peak':>10}"
+    )
+    for name in args.profile or PROFILES:
+        with tempfile.TemporaryDirectory() as root:
+            generate(root, PROFILES[name])
+            files, results, configs, peak = measure(root, args.classes)
+        print(
+            f"{name:<10} {files:7d} {results / 1e6:7.2f} MB {results / files:7.0f} B"
+            f" {configs / 1e6:7.2f} MB {peak / 1e6:7.2f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Benchmark matching of globs with ``{a..b}`` numeric ranges.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_numeric_ranges.py``.
+"""
+
+import argparse
+import timeit
+
+from toolconfig_core.ecpy.fnmatch import PatternSet, clear_cache, fnmatchcase
+
+SINGLE = "**/file{1..10000}.txt"
+DOUBLE = "**/dir{1..100}/file{1..100}.txt"
+NAMES = (
+    "/src/file1.txt",
+    "/src/file5000.txt",
+    "/src/file10001.txt",
+    "/src/file0100.txt",
+    "/src/dir50/file50.txt",
+    "/src/other.txt",
+)
+MANY = ["**/part{%d..%d}.dat" % (i * 100, i * 100 + 99) for i in range(1, 200)]
+
+
+def bench(label, func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=5))
+    print(f"{label:<40} {seconds / number * 1e6:10.2f} us/call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", "-n", type=int, default=2000)
+    args = parser.parse_args()
+
+    clear_cache()
+    for pat in (SINGLE, DOUBLE):
+        bench(
+            f"fnmatchcase {pat}",
+            lambda: [fnmatchcase(name, pat) for name in NAMES],
+            args.number,
+        )
+
+    patterns = PatternSet([SINGLE, DOUBLE] + MANY)
+    bench(
+        f"PatternSet of {len(patterns)} range globs",
+        lambda: [patterns.fnmatchcase(name) for name in NAMES],
+        args.number,
+    )
+    bench(
+        f"fnmatchcase loop over {len(patterns)}",
+        lambda: [
+            [fnmatchcase(name, pat) for pat in patterns.patterns] for name in NAMES
+        ],
+        max(1, args.number // 100),
+    )
+
+
+if __name__ == "__main__":
+    main()
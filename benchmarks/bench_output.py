@@ -0,0 +1,78 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Benchmark the CLI's output formats.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_output.py``.
+Each format writes the results for the same paths to an in-memory
+file.  ``toml (whole)`` is the old approach of ``tomli_w.dumps()`` of a
+dict of all results.
+"""
+
+import argparse
+import io
+import time
+
+import tomli_w
+
+from toolconfig_core.output import FORMATS, make_writer
+
+SETTINGS = [
+    {"indent_style": "space", "indent_size": 4, "max_line_length": 88},
+    {"indent_style": "tab", "charset": "utf-8"},
+    {"indent_style": "space", "indent_size": 2, "trim_trailing_whitespace": True},
+    {"owner": "team-a", "lint": "strict", "indent_size": 4},
+    {},
+]
+
+
+def make_results(count, shared):
+    """Return ``count`` results in sorted order of path.  If ``shared``,
+    paths with the same settings share one dict, otherwise each has its
+    own copy, as fresh resolution gives."""
+    results = {}
+    for i in range(count):
+        settings = SETTINGS[i % len(SETTINGS)]
+        path = f"/repo/pkg{i // 1000:03d}/mod{i % 1000:03d}.py"
+        results[path] = settings if shared else dict(settings)
+    return results
+
+
+def bench(label, func, count):
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        text = func()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    print(
+        f"{label:<20} {best * 1e3:9.1f} ms  {count / best:10.0f} paths/s"
+        f"  {len(text) / 1e6:6.1f} MB"
+    )
+
+
+def write(format, results):
+    out = io.StringIO()
+    writer = make_writer(format, out)
+    writer.write_all(results.items())
+    writer.close()
+    return out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", "-n", type=int, default=100000)
+    args = parser.parse_args()
+
+    for shared in (False, True):
+        results = make_results(args.paths, shared)
+        print(f"{args.paths} paths, {'shared' if shared else 'separate'} dicts")
+        bench("toml (whole)", lambda: tomli_w.dumps(results) + "\n", args.paths)
+        for format in FORMATS:
+            bench(format, lambda: write(format, results), args.paths)
+        print()
+
+
+if __name__ == "__main__":
+    main()
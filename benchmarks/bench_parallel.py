@@ -0,0 +1,86 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Benchmark how tree resolution scales with the number of processes.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_parallel.py``.
+A synthetic project is generated in a temporary directory and resolved
+with ``--jobs`` 1, 2, 4, ... up to the number of CPUs.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from toolconfig_core import TC_CONFIG_NAME, cache
+from toolconfig_core.resolve import resolve_tree
+
+EXTENSIONS = ("py", "c", "h", "txt", "md", "json", "toml", "yaml")
+
+
+def make_tree(root, dirs, subdirs, files, sections):
+    """Create ``dirs`` x ``subdirs`` directories of ``files`` files each.
+    The root config has ``sections`` sections."""
+    lines = ["root = true"]
+    for i in range(sections):
+        ext = EXTENSIONS[i % len(EXTENSIONS)]
+        lines.append(f"['**/dir{i % dirs}/**/*{i}.{{{ext},bak}}']\nkey{i} = {i}")
+    lines.append("['*.{py,c,h}']\nindent = 4")
+    with open(os.path.join(root, TC_CONFIG_NAME), "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+    for d in range(dirs):
+        top = os.path.join(root, f"dir{d}")
+        os.mkdir(top)
+        with open(os.path.join(top, TC_CONFIG_NAME), "w") as f:
+            f.write(f"['*.md']\nowner = 'team{d}'\n")
+        for s in range(subdirs):
+            sub = os.path.join(top, f"sub{s}")
+            os.mkdir(sub)
+            for i in range(files):
+                ext = EXTENSIONS[i % len(EXTENSIONS)]
+                open(os.path.join(sub, f"file{i}.{ext}"), "w").close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dirs", type=int, default=16)
+    parser.add_argument("--subdirs", type=int, default=16)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--sections", type=int, default=200)
+    parser.add_argument("--max-jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    jobs = [1]
+    while jobs[-1] * 2 <= args.max_jobs:
+        jobs.append(jobs[-1] * 2)
+    if jobs[-1] != args.max_jobs:
+        jobs.append(args.max_jobs)
+
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, args.dirs, args.subdirs, args.files, args.sections)
+        count = args.dirs * args.subdirs * args.files
+        print(f"{count} files, {args.sections} sections in the root config")
+
+        baseline = None
+        expected = None
+        for n in jobs:
+            cache.clear()
+            start = time.perf_counter()
+            results = resolve_tree(root, jobs=n)
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            if expected is None:
+                expected = results
+            elif results != expected:
+                raise RuntimeError(f"Results with {n} jobs differ from 1 job")
+            print(
+                f"jobs={n:<3} {seconds:8.3f} s  {count / seconds:10.0f} files/s"
+                f"  speedup {baseline / seconds:5.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Benchmark the throughput of EditorConfig parsing.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_parse.py``.
+Large EditorConfig files are generated with a mix of sections, options,
+trailing comments, comment lines and blank lines.  ``tokenize`` times
+just reading and tokenizing a file; ``load`` times building an
+``EditorConfigFile``, which also compiles the file's globs.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from toolconfig_core.ecpy import fnmatch
+from toolconfig_core.ecpy.ini import EditorConfigFile, EditorConfigParser
+
+OPTIONS = (
+    "indent_style = space",
+    "indent_size = 4",
+    "end_of_line = lf ; Unix",
+    "charset = utf-8",
+    "trim_trailing_whitespace = true",
+    "max_line_length = 88 # black",
+    "owner: team-a",
+)
+
+
+class Tokenizer(EditorConfigParser):
+    """Keeps every section's options, without matching section globs"""
+
+    __slots__ = ()
+
+    def _start_section(self, fpname, sectname):
+        return {}
+
+
+def make_file(path, sections, newline):
+    lines = ["# Generated", "root = true", ""]
+    for i in range(sections):
+        lines.append(f"[{{src,lib}}/**/mod{i}*.{{py,pyi}}]")
+        if i % 5 == 0:
+            lines.append("; Options for this module")
+        for j in range(i % 4 + 2):
+            lines.append("  " + OPTIONS[(i + j) % len(OPTIONS)])
+        lines.append("")
+    with open(path, "w", newline="") as f:
+        f.write(newline.join(lines) + newline)
+    return len(lines)
+
+
+def bench(label, func, size, lines):
+    best = None
+    for _ in range(5):
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    print(
+        f"  {label:<10} {best * 1e3:9.2f} ms  {size / best / 1e6:7.2f} MB/s"
+        f"  {lines / best / 1e6:6.2f} M lines/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sections", "-n", type=int, nargs="+", default=[100, 1000, 10000]
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        for sections in args.sections:
+            for newline in ("\n", "\r\n"):
+                path = os.path.join(root, f"{sections}.editorconfig")
+                lines = make_file(path, sections, newline)
+                size = os.path.getsize(path)
+                print(
+                    f"{sections} sections, {lines} lines, {size / 1e6:.2f} MB,"
+                    f" {newline!r} line endings"
+                )
+                bench("tokenize", lambda: Tokenizer("\0").read(path), size, lines)
+                fnmatch.clear_cache()
+                bench("load", lambda: EditorConfigFile(path), size, lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Benchmark the startup time of the toolconfig CLI.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_startup.py``.
+Reports the cumulative import time of ``toolconfig_core.__main__`` from
+``python -X importtime``, the slowest modules it imports, and the wall
+time of running ``toolconfig PATH`` to completion.  With ``--max-ms``,
+exits with status 1 if the import time exceeds the budget.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MODULE = "toolconfig_core.__main__"
+
+
+def import_times():
+    """Return ``{module: cumulative microseconds}`` for one cold import"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", "-n", type=int, default=20)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, help="Import-time budget")
+    args = parser.parse_args()
+
+    samples = [import_times() for _ in range(args.runs)]
+    total_ms = statistics.median(s[MODULE] for s in samples) / 1000
+    print(f"import {MODULE}: {total_ms:.1f} ms (median of {args.runs})")
+
+    slowest = sorted(samples[-1].items(), key=lambda item: -item[1])
+    print("Slowest imports (cumulative):")
+    for name, micros in slowest[1 : args.top + 1]:
+        print(f"  {micros / 1000:7.1f} ms  {name}")
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "file.py")
+        walls = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "toolconfig_core", path],
+                stdout=subprocess.DEVNULL,
+                check=True,
+            )
+            walls.append(time.perf_counter() - start)
+        print(f"toolconfig PATH: {statistics.median(walls) * 1000:.1f} ms wall")
+
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"Import time exceeds the budget of {args.max_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
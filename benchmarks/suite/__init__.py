@@ -0,0 +1,19 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Benchmark suite for toolconfig_core.
+
+Run from the top of the repository with::
+
+    PYTHONPATH=src python -m benchmarks.suite run -o results.json
+    PYTHONPATH=src python -m benchmarks.suite compare baseline.json results.json
+
+``run`` generates a synthetic monorepo for each profile in
+:data:`benchmarks.suite.monorepo.PROFILES`, times each scenario in
+:data:`benchmarks.suite.scenarios.SCENARIOS` against it, and writes the
+timings as JSON.  ``compare`` reports the change in each timing between
+two such files, and exits with status 1 if any got slower by more than
+the threshold.  ``generate`` just creates a monorepo, e.g., for
+profiling by hand.
+"""
@@ -0,0 +1,214 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Command line of the benchmark suite.  See :mod:`benchmarks.suite`."""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import toolconfig_core
+
+from .monorepo import PROFILES, generate
+from .scenarios import SCENARIOS
+
+#: Version of the results file format
+FORMAT_VERSION = 1
+
+#: Default relative slowdown that ``compare`` reports as a regression
+DEFAULT_THRESHOLD = 0.10
+
+
+def measure(case, repeat):
+    """Return the seconds each of ``repeat`` runs of ``case`` took, after
+    one untimed warm-up run"""
+    times = []
+    for i in range(repeat + 1):
+        if case.setup is not None:
+            case.setup()
+        start = time.perf_counter()
+        case.run()
+        seconds = time.perf_counter() - start
+        if i:
+            times.append(seconds)
+    return times
+
+
+def run(args):
+    results = {}
+    for profile_name in args.profile:
+        profile = PROFILES[profile_name]
+        with tempfile.TemporaryDirectory() as root:
+            repo = generate(root, profile)
+            print(
+                f"{profile_name}: {len(repo.dirs)} dirs, {len(repo.files)} files,"
+                f" {len(repo.configs)} config files",
+                file=sys.stderr,
+            )
+            for name, make_case in SCENARIOS.items():
+                if not any(fnmatch.fnmatchcase(name, p) for p in args.scenario):
+                    continue
+                case = make_case(repo)
+                if not case.ops:
+                    continue
+                times = measure(case, args.repeat)
+                key = f"{profile_name}/{name}"
+                results[key] = {
+                    "ops": case.ops,
+                    "times": times,
+                    "min": min(times),
+                    "median": statistics.median(times),
+                }
+                print(
+                    f"  {name:<16} {min(times) * 1e3:10.2f} ms"
+                    f"  {min(times) / case.ops * 1e6:10.2f} us/op",
+                    file=sys.stderr,
+                )
+
+    document = {
+        "version": FORMAT_VERSION,
+        "meta": {
+            "toolconfig_core": toolconfig_core.VERSION,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "repeat": args.repeat,
+        },
+        "profiles": {name: PROFILES[name]._asdict() for name in args.profile},
+        "results": results,
+    }
+    text = json.dumps(document, indent=2) + "\n"
+    if args.output == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.output, "w") as f:
+            f.write(text)
+    return 0
+
+
+def load_results(path):
+    with open(path) as f:
+        document = json.load(f)
+    if document.get("version") != FORMAT_VERSION:
+        raise SystemExit(f"{path}: unsupported results version")
+    return document["results"]
+
+
+def compare(args):
+    """Print the change in each timing.  Return 1 if any got slower by
+    more than the threshold, else 0."""
+    baseline = load_results(args.baseline)
+    current = load_results(args.current)
+    regressions = []
+
+    print(f"{'benchmark':<28} {'baseline':>12} {'current':>12} {'change':>8}")
+    for key in sorted(set(baseline) | set(current)):
+        if key not in current:
+            print(f"{key:<28} {'':>12} {'missing':>12}")
+            continue
+        if key not in baseline:
+            print(f"{key:<28} {'new':>12}")
+            continue
+        if baseline[key]["ops"] != current[key]["ops"]:
+            print(f"{key:<28} {'(different workload, not compared)':>34}")
+            continue
+        old = baseline[key][args.metric]
+        new = current[key][args.metric]
+        change = new / old - 1
+        flag = ""
+        if change > args.threshold:
+            flag = "  SLOWER"
+            regressions.append(key)
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(
+            f"{key:<28} {old * 1e3:9.2f} ms {new * 1e3:9.2f} ms"
+            f" {change:+8.1%}{flag}"
+        )
+
+    if regressions:
+        print(
+            f"{len(regressions)} regression(s) over {args.threshold:.0%}:"
+            f" {', '.join(regressions)}"
+        )
+        return 1
+    return 0
+
+
+def generate_only(args):
+    os.makedirs(args.dir, exist_ok=True)
+    repo = generate(args.dir, PROFILES[args.profile])
+    print(
+        f"{len(repo.dirs)} dirs, {len(repo.files)} files,"
+        f" {len(repo.configs)} config files in {args.dir}"
+    )
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.suite", description=__doc__.splitlines()[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Time the scenarios")
+    run_parser.add_argument(
+        "--profile",
+        "-p",
+        action="append",
+        choices=sorted(PROFILES),
+        help="Monorepo shape; repeatable (default all)",
+    )
+    run_parser.add_argument(
+        "--scenario",
+        "-s",
+        action="append",
+        metavar="PATTERN",
+        help=f"Glob of scenario names; repeatable (default all: {', '.join(SCENARIOS)})",
+    )
+    run_parser.add_argument("--repeat", "-n", type=int, default=5)
+    run_parser.add_argument(
+        "--output", "-o", default="-", help="Results file (default stdout)"
+    )
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser(
+        "compare", help="Compare results against a baseline"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold",
+        "-t",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Relative slowdown to report, e.g., 0.1 for 10%% (default %(default)s)",
+    )
+    compare_parser.add_argument("--metric", choices=("min", "median"), default="min")
+    compare_parser.set_defaults(func=compare)
+
+    generate_parser = commands.add_parser("generate", help="Just create a monorepo")
+    generate_parser.add_argument("dir")
+    generate_parser.add_argument(
+        "--profile", "-p", choices=sorted(PROFILES), default="deep"
+    )
+    generate_parser.set_defaults(func=generate_only)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        args.profile = args.profile or list(PROFILES)
+        args.scenario = args.scenario or ["*"]
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
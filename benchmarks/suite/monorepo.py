@@ -0,0 +1,185 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Generate synthetic monorepos to benchmark against.
+
+A monorepo is a tree of directories ``depth`` levels deep with ``fanout``
+subdirectories each, and ``files`` empty files in every directory.  The
+root has a config file with ``root = true`` and ``sections`` sections;
+other directories have a config file with probability ``config_ratio``,
+of ``sections // 10 + 1`` sections.  Each config file is a ToolConfig
+file with probability ``tc_ratio``, otherwise an EditorConfig file.
+
+Generation is deterministic for a given :class:`Profile`.
+"""
+
+import os
+import random
+from collections import namedtuple
+
+from toolconfig_core import EC_CONFIG_NAME, TC_CONFIG_NAME
+
+Profile = namedtuple(
+    "Profile", "depth fanout files sections config_ratio tc_ratio seed"
+)
+
+#: The standard shapes of monorepo
+PROFILES = {
+    # Long chains of config files
+    "deep": Profile(
+        depth=8, fanout=2, files=8, sections=20, config_ratio=0.5, tc_ratio=0.5, seed=1
+    ),
+    # Many directories, mostly without config files
+    "wide": Profile(
+        depth=2,
+        fanout=30,
+        files=16,
+        sections=20,
+        config_ratio=0.1,
+        tc_ratio=0.5,
+        seed=2,
+    ),
+    # Few directories, large config files
+    "sections": Profile(
+        depth=2,
+        fanout=5,
+        files=40,
+        sections=400,
+        config_ratio=1.0,
+        tc_ratio=0.5,
+        seed=3,
+    ),
+}
+
+EXTENSIONS = ("py", "c", "h", "txt", "md", "json", "toml", "yaml")
+
+# (name, values) of the options sections set
+OPTIONS = (
+    ("indent_style", ("space", "tab")),
+    ("indent_size", ("2", "4", "8")),
+    ("end_of_line", ("lf", "crlf")),
+    ("charset", ("utf-8", "latin1")),
+    ("trim_trailing_whitespace", ("true", "false")),
+    ("insert_final_newline", ("true", "false")),
+    ("max_line_length", ("80", "88", "120")),
+    ("owner", ("team-a", "team-b", "team-c")),
+)
+
+
+class Monorepo(object):
+    """A generated monorepo.
+
+    Attributes:
+        root (str): The top directory
+        dirs (list): Every directory, root first, parents before children
+        files (list): Every file other than config files
+        configs (list): ``(path, globs)`` of every config file
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.dirs = []
+        self.files = []
+        self.configs = []
+
+    @property
+    def ec_files(self):
+        return [path for path, _ in self.configs if path.endswith(EC_CONFIG_NAME)]
+
+    @property
+    def tc_files(self):
+        return [path for path, _ in self.configs if path.endswith(TC_CONFIG_NAME)]
+
+    def sample(self, count):
+        """Return ``count`` files spread evenly over :attr:`files`"""
+        step = max(1, len(self.files) // count)
+        return self.files[::step][:count]
+
+
+def make_glob(rng, level):
+    """Return a random glob of one of the commonly used forms"""
+    ext = rng.choice(EXTENSIONS)
+    n = rng.randrange(100)
+    return rng.choice(
+        (
+            f"*.{ext}",
+            f"*.{{{ext},bak}}",
+            f"**/d{n % 10}/*.{ext}",
+            f"**/file{n % 10}*",
+            f"file{{0..{n}}}.{ext}",
+            f"[!x]*.{ext}",
+            f"**/d{level}/**/*{n}.{{{ext},{rng.choice(EXTENSIONS)}}}",
+        )
+    )
+
+
+def make_sections(rng, count, level):
+    """Return ``count`` ``(glob, {name: value})`` sections, with no two
+    globs the same, since TOML does not allow that"""
+    sections = {}
+    while len(sections) < count:
+        glob = make_glob(rng, level)
+        if glob in sections:
+            continue
+        options = sections[glob] = {}
+        for name, values in rng.sample(OPTIONS, rng.randint(1, 4)):
+            options[name] = rng.choice(values)
+    return list(sections.items())
+
+
+def write_config(dir_name, sections, is_root, is_tc):
+    """Write a config file and return its path"""
+    if is_tc:
+        path = os.path.join(dir_name, TC_CONFIG_NAME)
+        lines = ["root = true"] if is_root else []
+        for glob, options in sections:
+            lines.append(f"['{glob}']")
+            lines.extend(f"{name} = '{value}'" for name, value in options.items())
+    else:
+        path = os.path.join(dir_name, EC_CONFIG_NAME)
+        lines = ["root = true"] if is_root else []
+        for glob, options in sections:
+            lines.append(f"[{glob}]")
+            lines.extend(f"{name} = {value}" for name, value in options.items())
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def generate(root, profile):
+    """Create a monorepo of shape ``profile`` in the existing directory
+    ``root``.
+
+    Returns:
+        Monorepo: What was created
+    """
+    rng = random.Random(profile.seed)
+    repo = Monorepo(root)
+    level_dirs = [root]
+    for level in range(profile.depth + 1):
+        next_level = []
+        for dir_name in level_dirs:
+            repo.dirs.append(dir_name)
+            is_root = dir_name == root
+            if is_root or rng.random() < profile.config_ratio:
+                count = profile.sections if is_root else profile.sections // 10 + 1
+                sections = make_sections(rng, count, level)
+                is_tc = rng.random() < profile.tc_ratio
+                path = write_config(dir_name, sections, is_root, is_tc)
+                repo.configs.append((path, [glob for glob, _ in sections]))
+
+            for i in range(profile.files):
+                path = os.path.join(
+                    dir_name, f"file{i}.{EXTENSIONS[i % len(EXTENSIONS)]}"
+                )
+                open(path, "w").close()
+                repo.files.append(path)
+
+            if level < profile.depth:
+                for i in range(profile.fanout):
+                    sub = os.path.join(dir_name, f"d{i}")
+                    os.mkdir(sub)
+                    next_level.append(sub)
+        level_dirs = next_level
+    return repo
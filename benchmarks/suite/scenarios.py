@@ -0,0 +1,128 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""The scenarios the suite times.
+
+Each scenario is a function of a :class:`~benchmarks.suite.monorepo.Monorepo`
+that returns a :class:`Case`.  ``setup`` is called, untimed, before each
+timed call of ``run``.  ``ops`` is the number of operations one ``run``
+does, e.g., paths resolved or files parsed, so results can be reported
+per operation.
+"""
+
+import re
+from collections import namedtuple
+
+from toolconfig_core import cache
+from toolconfig_core.config_file import ToolConfigFile
+from toolconfig_core.ecpy import fnmatch
+from toolconfig_core.ecpy.ini import EditorConfigFile
+from toolconfig_core.glob import GlobSet
+from toolconfig_core.handler import ToolConfigHandler
+from toolconfig_core.resolve import resolve_many, resolve_tree
+
+Case = namedtuple("Case", "run ops setup")
+
+#: Scenario functions by name, in the order they run
+SCENARIOS = {}
+
+# Number of paths in a batch, and of lookups per run of lookup.warm
+BATCH_SIZE = 1000
+LOOKUPS = 200
+
+
+def scenario(name):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+
+    return register
+
+
+def cold():
+    """Forget every parsed file, directory probe and compiled glob"""
+    cache.clear()
+    fnmatch.clear_cache()
+    re.purge()
+
+
+@scenario("lookup.cold")
+def lookup_cold(repo):
+    """One ``ToolConfigHandler`` lookup of the deepest file, with empty caches"""
+    path = repo.files[-1]
+    return Case(lambda: ToolConfigHandler(path).get_options(), 1, cold)
+
+
+@scenario("lookup.warm")
+def lookup_warm(repo):
+    """``ToolConfigHandler`` lookups of files across the tree, with warm
+    caches, as in a long-running editor service"""
+    paths = repo.sample(LOOKUPS)
+
+    def run():
+        for path in paths:
+            ToolConfigHandler(path).get_options()
+
+    return Case(run, len(paths), None)
+
+
+@scenario("batch")
+def batch(repo):
+    """``resolve_many()`` of files across the tree, with empty caches"""
+    paths = repo.sample(BATCH_SIZE)
+    return Case(lambda: resolve_many(paths), len(paths), cold)
+
+
+@scenario("tree")
+def tree(repo):
+    """``resolve_tree()`` of the whole monorepo, with empty caches"""
+    return Case(lambda: resolve_tree(repo.root), len(repo.files), cold)
+
+
+@scenario("glob.translate")
+def glob_translate(repo):
+    """``fnmatch.translate()`` of every section glob"""
+    globs = [glob for _, globs in repo.configs for glob in globs]
+
+    def run():
+        for glob in globs:
+            fnmatch.translate(glob)
+
+    return Case(run, len(globs), None)
+
+
+@scenario("glob.compile")
+def glob_compile(repo):
+    """A ``GlobSet`` of every config file, with nothing compiled yet"""
+    configs = repo.configs
+
+    def run():
+        for path, globs in configs:
+            GlobSet(path, globs)
+
+    return Case(run, len(configs), cold)
+
+
+@scenario("parse.ec")
+def parse_ec(repo):
+    """Parse every EditorConfig file, bypassing the config cache"""
+    paths = repo.ec_files
+
+    def run():
+        for path in paths:
+            EditorConfigFile(path)
+
+    return Case(run, len(paths), None)
+
+
+@scenario("parse.tc")
+def parse_tc(repo):
+    """Parse every ToolConfig file, bypassing the config cache"""
+    paths = repo.tc_files
+
+    def run():
+        for path in paths:
+            ToolConfigFile(path)
+
+    return Case(run, len(paths), None)
@@ -2,23 +2,30 @@
 # Copyright (c) 2023 Christopher White.
 # SPDX-License-Identifier: BSD-2-Clause
 
-"""toolconfig(1) CLI"""
+"""toolconfig(1) CLI
 
+Editors run ``toolconfig PATH`` often, so startup time matters.  Modules
+that only some options need, including argparse, are imported when
+those options are used, and a command line of nothing but absolute paths
+is handled without parsing options at all.
+"""
 
-import argparse
+import os
+import sys
 
-import tomli_w
+from toolconfig_core import EC_CONFIG_NAME, TC_CONFIG_NAME, VERSION
+from toolconfig_core.resolve import DirectoryTrie, resolve_many, resolve_tree
 
-from toolconfig_core import EC_CONFIG_NAME, VERSION
-from toolconfig_core.config_file import ToolConfigFile, find_root_dir, get_filenames
-from toolconfig_core.handler import ToolConfigHandler
 
-
-def parse_args():
+def parse_args(argv=None):
     """Parse the arguments.
     Return:
         argparse.Namespace: the parsed arguments
     """
+    import argparse
+
+    from toolconfig_core import output
+
     parser = argparse.ArgumentParser(
         description="Get tool settings to apply to a particular file in a project"
     )
@@ -26,12 +33,65 @@ def parse_args():
         "abs_path",
         metavar="PATH",
         type=str,
-        nargs="+",
+        nargs="*",
         help="The absolute path to the file in the project",
     )
+    parser.add_argument(
+        "--tree",
+        metavar="DIR",
+        help="Get the settings for every file below DIR",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        metavar="N",
+        type=int,
+        default=1,
+        help="Use N processes (0 for one per CPU).  Default 1.",
+    )
+    parser.add_argument(
+        "--stdin",
+        action="store_true",
+        help="Read paths from standard input, one per line, and print each "
+        "result as soon as it is ready",
+    )
+    parser.add_argument(
+        "--null",
+        "-0",
+        action="store_true",
+        help="With --stdin, paths are separated by NUL characters",
+    )
+    parser.add_argument(
+        "--format",
+        choices=output.FORMATS,
+        help="Output format.  Default toml, or ndjson with --stdin.",
+    )
     parser.add_argument(
         "--version", "-V", action="version", version=f"toolconfig-core-py {VERSION}"
     )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Use the persistent cache of parsed config files "
+        "(see `toolconfig cache --help`)",
+    )
+    parser.add_argument(
+        "--connect",
+        action="store_true",
+        help="Ask a running `toolconfig serve` for the settings, or work them "
+        "out in this process if none is running",
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="SOCKET",
+        help="The socket of the server for --connect",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print counts of the work done to stderr.  Work done by --jobs "
+        "worker processes or a --connect server is not counted.",
+    )
 
     # Arguments intended for editorconfig-core-tests only
     parser.add_argument(
@@ -41,7 +101,141 @@ def parse_args():
         help="Alternative name for .editorconfig files (TESTING ONLY).  Changes output format.",
     )
 
-    return parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.null and not args.stdin:
+        parser.error("--null requires --stdin")
+    if args.stdin:
+        if args.abs_path or args.tree or args.connect or args.jobs != 1:
+            parser.error(
+                "--stdin cannot be used with PATH, --tree, --connect or --jobs"
+            )
+        return args
+    if not args.abs_path and not args.tree:
+        parser.error("at least one PATH, --tree or --stdin is required")
+    if args.tree and args.connect:
+        parser.error("--tree cannot be used with --connect")
+    return args
+
+
+def parse_cache_args(argv):
+    """Parse the arguments of ``toolconfig cache``.
+    Return:
+        argparse.Namespace: the parsed arguments
+    """
+    import argparse
+
+    from toolconfig_core import diskcache
+
+    parser = argparse.ArgumentParser(
+        prog="toolconfig cache",
+        description="Manage the persistent cache of parsed config files",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        help=f"The cache directory (default {diskcache.default_cache_dir()})",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+    warm = commands.add_parser(
+        "warm", help="Cache the config files that apply to files in PATHs"
+    )
+    warm.add_argument(
+        "paths",
+        metavar="PATH",
+        nargs="+",
+        help="A file or directory in the project.  Directories are searched "
+        "recursively for config files.",
+    )
+    commands.add_parser("clear", help="Delete all cached files")
+    commands.add_parser("stats", help="Describe the cache")
+    return parser.parse_args(argv)
+
+
+def warm_cache(paths):
+    """Load the config files that apply to each of ``paths``.
+
+    Args:
+        paths (iterable): Files or directories.  Directories are walked,
+            and config files in them are loaded too.
+    """
+    trie = DirectoryTrie()
+    for path in paths:
+        path = os.path.abspath(path)
+        if not os.path.isdir(path):
+            trie.chain(os.path.dirname(path))
+            continue
+        trie.chain(path)
+        for dir_name, _, filenames in os.walk(path):
+            if TC_CONFIG_NAME in filenames or EC_CONFIG_NAME in filenames:
+                trie.chain(dir_name)
+
+
+def cache_main(argv):
+    """``toolconfig cache`` CLI"""
+    from toolconfig_core import diskcache
+
+    args = parse_cache_args(argv)
+    disk = diskcache.enable(args.cache_dir)
+    if not disk.verify():
+        print(
+            f"toolconfig: not using {disk.directory}: it must be owned by you"
+            " and writable only by you",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    if args.command == "warm":
+        warm_cache(args.paths)
+        print(f"Cached {disk.writes} new and {disk.hits} existing config files")
+    elif args.command == "clear":
+        print(f"Removed {disk.clear()} cached config files")
+    else:
+        import tomli_w
+
+        print(tomli_w.dumps(disk.stats()), end="")
+
+
+def parse_serve_args(argv):
+    """Parse the arguments of ``toolconfig serve``.
+    Return:
+        argparse.Namespace: the parsed arguments
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="toolconfig serve",
+        description="Answer requests from `toolconfig --connect` on a Unix socket",
+    )
+    parser.add_argument("--socket", metavar="SOCKET", help="Where to listen")
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Use the persistent cache of parsed config files",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Watch config files for changes instead of checking them on "
+        "every request",
+    )
+    return parser.parse_args(argv)
+
+
+def serve_main(argv):
+    """``toolconfig serve`` CLI"""
+    from toolconfig_core import server  # Unix-only
+
+    args = parse_serve_args(argv)
+    if args.cache:
+        from toolconfig_core import diskcache
+
+        diskcache.enable()
+    if args.watch:
+        from toolconfig_core import watch
+
+        watch.enable()
+    server.serve(args.socket)
 
 
 def print_ec_output(output):
@@ -52,23 +246,97 @@ def print_ec_output(output):
         print(f"{k}={v}")
 
 
-def main():
-    """CLI"""
-    args = parse_args()
+def stream_main(args, ec_filename):
+    """Handle ``--stdin``: print each result as soon as it is ready"""
+    from toolconfig_core import output, stream
+
+    separator = b"\0" if args.null else b"\n"
+    batches = stream.read_paths(sys.stdin.buffer, separator)
+    format = args.format or "ndjson"
+    writer = output.make_writer(format, sys.stdout)
+    # A repeated path would be a duplicate key in the other formats
+    unique = format not in output.LINE_FORMATS
+    for results in stream.resolve_batches(batches, ec_filename, unique=unique):
+        writer.write_all(results)
+        writer.flush()
+    writer.close()
+
+
+def write_results(results, format, classes=None):
+    """Write ``results``, a dict of options by path, to stdout.
+    ``classes`` is the table of settings classes they were resolved with."""
+    from toolconfig_core import output
+
+    writer = output.make_writer(format, sys.stdout, classes)
+    writer.write_all(results.items())
+    writer.close()
+
+
+def run(args):
+    """Produce the output for parsed arguments ``args``"""
     ec_filename = args.ec_filename or EC_CONFIG_NAME
+    if args.cache:
+        from toolconfig_core import diskcache
 
-    options = {}
-    for abs_path in args.abs_path:
-        handler = ToolConfigHandler(abs_path, ec_filename)
-        options[abs_path] = handler.get_options()
+        diskcache.enable()
+
+    if args.stdin:
+        return stream_main(args, ec_filename)
 
     # Produce output, always in sorted order of path name
-    output = {k: options[k] for k in sorted(options.keys())}
+    if args.connect:
+        from toolconfig_core.server import resolve_many_via_server  # Unix-only
 
-    if args.ec_filename:
-        print_ec_output(output)  # editorconfig-core-test mode
+        classes = None
+        results = resolve_many_via_server(args.abs_path, ec_filename, args.socket)
     else:
-        print(tomli_w.dumps(output))  # Normal output
+        classes = None
+        if args.format in ("grouped", "grouped-by-class"):
+            from toolconfig_core.settings_classes import SettingsClasses
+
+            # Results with the same settings share one dict.  Only for the
+            # formats that need class IDs, since a shared dict has the key
+            # order of the first equal settings.
+            classes = SettingsClasses()
+        trie = DirectoryTrie(ec_filename)
+        results = resolve_many(args.abs_path, ec_filename, trie, args.jobs, classes)
+        if args.tree:
+            results.update(
+                resolve_tree(
+                    os.path.abspath(args.tree), ec_filename, trie, args.jobs, classes
+                )
+            )
+            results = {k: results[k] for k in sorted(results.keys())}
+
+    if args.ec_filename and not args.format:
+        print_ec_output(results)  # editorconfig-core-test mode
+    else:
+        write_results(results, args.format or "toml", classes)
+
+
+def main(argv=None):
+    """CLI"""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and all(os.path.isabs(arg) for arg in argv):
+        # Just paths: the same as parse_args() would give, minus its cost
+        return write_results(resolve_many(argv), "toml")
+    if argv[:1] == ["cache"]:
+        return cache_main(argv[1:])
+    if argv[:1] == ["serve"]:
+        return serve_main(argv[1:])
+
+    args = parse_args(argv)
+    if not args.stats:
+        return run(args)
+
+    from toolconfig_core import stats
+
+    stats.enable()
+    try:
+        return run(args)
+    finally:
+        sys.stderr.write(stats.report())
 
 
 if __name__ == "__main__":
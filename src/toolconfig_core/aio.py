@@ -0,0 +1,167 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""asyncio interface.
+
+:func:`resolve` and :func:`resolve_many` give the same results as
+:class:`~toolconfig_core.handler.ToolConfigHandler` without blocking the
+event loop on file I/O.  Config files that are current in
+:data:`toolconfig_core.cache.config_cache` are used directly.  Others are
+loaded by a small thread pool, and coroutines that need the same
+directory's config file at the same time share one load.
+
+Example::
+
+    options = await toolconfig_core.aio.resolve("/path/to/file.py")
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from toolconfig_core import EC_CONFIG_NAME
+from toolconfig_core.config_file import ConfigFile
+from toolconfig_core.exceptions import PathError
+from toolconfig_core.handler import ToolConfigHandler
+
+#: Default size of an :class:`AsyncResolver`'s thread pool
+DEFAULT_MAX_WORKERS = 4
+
+
+class AsyncResolver(object):
+    """Resolve options from coroutines.
+
+    Args:
+        ec_name (str): The name of EditorConfig files
+        max_workers (int): Most config files to load at once
+    """
+
+    def __init__(self, ec_name=EC_CONFIG_NAME, max_workers=DEFAULT_MAX_WORKERS):
+        self.ec_name = ec_name
+        self.loads = 0  # Number of loads run in the thread pool
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="toolconfig-load"
+        )
+        self._loading = {}  # dir_name -> concurrent.futures.Future
+        self._lock = threading.RLock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shut down the thread pool, waiting for loads in progress."""
+        self._executor.shutdown(wait=True)
+
+    def _load(self, dir_name):
+        """Start loading the config file of ``dir_name``, or join the load
+        already in progress."""
+        with self._lock:
+            future = self._loading.get(dir_name)
+            if future is None:
+                future = self._executor.submit(ConfigFile, dir_name, self.ec_name)
+                self.loads += 1
+                self._loading[dir_name] = future
+                future.add_done_callback(lambda _: self._loaded(dir_name, future))
+            return future
+
+    def _loaded(self, dir_name, future):
+        with self._lock:
+            if self._loading.get(dir_name) is future:
+                del self._loading[dir_name]
+
+    async def config_file(self, dir_name):
+        """Return the :class:`ConfigFile` for ``dir_name``."""
+        config = ConfigFile.cached(dir_name, self.ec_name)
+        if config is not None:
+            return config
+        # Shield the shared load from the cancellation of any one waiter
+        return await asyncio.shield(asyncio.wrap_future(self._load(dir_name)))
+
+    async def resolve(self, path):
+        """Get the options for ``path``.  See :func:`resolve`."""
+        return (await self.resolve_many([path]))[path]
+
+    async def resolve_many(self, paths):
+        """Get the options for each of ``paths``.  See :func:`resolve_many`."""
+        by_dir = {}
+        for path in paths:
+            if not os.path.isabs(path):
+                raise PathError("Input file must be a full path name.")
+            by_dir.setdefault(os.path.dirname(path), []).append(path)
+
+        # One task per directory, each building on its parent's
+        tasks = {}
+
+        def chain(dir_name):
+            task = tasks.get(dir_name)
+            if task is None:
+                task = asyncio.ensure_future(walk(dir_name))
+                tasks[dir_name] = task
+            return task
+
+        async def walk(dir_name):
+            config = await self.config_file(dir_name)
+            parent = os.path.dirname(dir_name)
+            if config.is_root or parent == dir_name:
+                return (config,)
+            return (config,) + await chain(parent)
+
+        try:
+            chains = await asyncio.gather(*(chain(d) for d in by_dir))
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        results = {}
+        for (dir_name, targets), dir_chain in zip(by_dir.items(), chains):
+            for path in targets:
+                results[path] = ToolConfigHandler.options_from(dir_chain, path)
+        return {k: results[k] for k in sorted(results.keys())}
+
+
+_resolvers = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_resolver(ec_name=EC_CONFIG_NAME):
+    """Return the shared :class:`AsyncResolver` for ``ec_name``."""
+    with _resolvers_lock:
+        resolver = _resolvers.get(ec_name)
+        if resolver is None:
+            resolver = _resolvers[ec_name] = AsyncResolver(ec_name)
+        return resolver
+
+
+async def resolve(path, ec_name=EC_CONFIG_NAME):
+    """Get the options for ``path``.
+
+    The result is the same as
+    ``ToolConfigHandler(path, ec_name).get_options()``.
+
+    Raises:
+        toolconfig_core.exceptions.PathError: if ``path`` is not absolute
+        toolconfig_core.exceptions.ParsingError: if a config file is invalid
+    """
+    return await get_resolver(ec_name).resolve(path)
+
+
+async def resolve_many(paths, ec_name=EC_CONFIG_NAME):
+    """Get the options for each of ``paths``.
+
+    The result is the same as
+    :func:`toolconfig_core.resolve.resolve_many`, and is a dict in
+    sorted order of path.  Each config file is loaded at most once per
+    call, however many of ``paths`` it applies to.
+
+    Raises:
+        toolconfig_core.exceptions.PathError: if any path is not absolute
+        toolconfig_core.exceptions.ParsingError: if a config file is invalid
+    """
+    return await get_resolver(ec_name).resolve_many(paths)
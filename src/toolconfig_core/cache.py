@@ -0,0 +1,405 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Process-wide cache of parsed config files.
+
+Parsing a ToolConfig or EditorConfig file is far more expensive than
+checking whether it has changed, and the same few files (especially the
+project's root config) are consulted for every target in a project.
+:class:`ConfigCache` keeps parsed files keyed by absolute path and
+revalidates each entry against the file's ``stat()`` result on every
+lookup, so edits, replacements and deletions are always picked up.
+
+If a :mod:`toolconfig_core.watch` watcher is attached, entries it
+vouches for are trusted without calling ``stat()``, and missing files are
+remembered as well.
+
+Most directories have no config file, and looking for one costs a failed
+lookup per config-file name.  :class:`DirectoryProbeCache` remembers which
+config files a directory has, and revalidates that against the
+directory's own ``stat()``, since adding, removing or renaming an entry
+changes a directory's mtime.
+"""
+
+import errno
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+#: Default maximum number of files held by a :class:`ConfigCache`
+DEFAULT_MAX_ENTRIES = 4096
+
+#: Default maximum total on-disk size of the files held by a :class:`ConfigCache`
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+#: Default maximum number of directories held by a :class:`DirectoryProbeCache`
+DEFAULT_MAX_DIRS = 16384
+
+#: Directories, and files in the on-disk cache, modified less than this
+#: many nanoseconds ago are not remembered.  A change made in the same
+#: timestamp tick as a probe or load would not change the mtime again.
+RACY_NS = 2 * 10**9
+
+# ``loader`` is None for a file known not to exist.  ``generation`` is
+# the watcher generation the entry was checked in, or None.
+_Entry = namedtuple("_Entry", "signature loader value size generation")
+
+
+def file_signature(st):
+    """Return the fields of ``st`` (an ``os.stat_result``) that identify
+    a particular version of a file."""
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class ConfigCache(object):
+    """LRU cache of parsed config files.
+
+    Entries are keyed by absolute path and validated by
+    ``(st_mtime_ns, st_size, st_ino)``.  When either limit is exceeded,
+    the least-recently-used entries are evicted.  All methods are
+    thread-safe.
+
+    Misses are loaded through ``persistent``, a
+    :class:`toolconfig_core.diskcache.DiskCache`, if one is attached.
+    If ``watcher``, a :class:`toolconfig_core.watch.Watcher`, is attached,
+    lookups of files it is watching skip the ``stat()``.
+
+    Args:
+        max_entries (int): Maximum number of files to hold, or ``None``
+            for no limit.
+        max_bytes (int): Maximum total on-disk size of the files to hold,
+            or ``None`` for no limit.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.persistent = None
+        self.watcher = None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path):
+        return os.path.abspath(path) in self._entries
+
+    @property
+    def total_bytes(self):
+        """The total on-disk size of the cached files"""
+        return self._bytes
+
+    def get(self, path, loader):
+        """Return ``loader(path)``, reusing a cached result if possible.
+
+        Args:
+            path (str): Path of the file to load
+            loader (callable): Called with the absolute path to parse the
+                file, e.g., ``ToolConfigFile``.
+
+        Raises:
+            OSError: if the file does not exist or cannot be read
+            Any exception raised by ``loader``.  Failures are not cached.
+        """
+        path = os.path.abspath(path)
+        hit, value, st, generation = self._lookup(path, loader)
+        if hit:
+            return value
+        with self._lock:
+            self.misses += 1
+
+        signature = file_signature(st)
+        if self.persistent is not None:
+            value = self.persistent.load(path, loader, signature)
+        else:
+            value = loader(path)
+        self._store(path, _Entry(signature, loader, value, st.st_size, generation))
+        return value
+
+    def cached(self, path, loader):
+        """Return the cached ``loader(path)`` if it is current.
+
+        Unlike :meth:`get`, this never loads the file, so it is quick
+        enough to call from an event loop.
+
+        Returns:
+            The cached value, or None if the file must be loaded.
+
+        Raises:
+            OSError: if the file does not exist
+        """
+        hit, value, _, _ = self._lookup(os.path.abspath(path), loader)
+        return value if hit else None
+
+    def _lookup(self, path, loader):
+        """Look for a current entry for ``path``.
+
+        Returns:
+            tuple: ``(True, value, None, None)`` on a hit, otherwise
+            ``(False, None, stat_result, generation)``
+
+        Raises:
+            OSError: if the file does not exist or cannot be read
+        """
+        watcher = self.watcher
+        # Read the generation before stat() so that a change racing with
+        # this lookup leaves the entry untrusted.
+        generation = watcher.generation(path) if watcher is not None else None
+        if generation is not None:
+            with self._lock:
+                entry = self._entries.get(path)
+                if (
+                    entry is not None
+                    and entry.generation == generation
+                    and entry.loader in (loader, None)
+                ):
+                    self._entries.move_to_end(path)
+                    self.hits += 1
+                    if entry.loader is None:
+                        raise FileNotFoundError(
+                            errno.ENOENT, os.strerror(errno.ENOENT), path
+                        )
+                    return True, entry.value, None, None
+
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            if generation is None:
+                self.invalidate(path)
+            else:
+                self._store(path, _Entry(None, None, None, 0, generation))
+            raise
+        except OSError:
+            self.invalidate(path)
+            raise
+
+        signature = file_signature(st)
+        with self._lock:
+            entry = self._entries.get(path)
+            if (
+                entry is not None
+                and entry.signature == signature
+                and entry.loader is loader
+            ):
+                if entry.generation != generation:
+                    self._entries[path] = entry._replace(generation=generation)
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return True, entry.value, None, None
+        return False, None, st, generation
+
+    def _store(self, path, entry):
+        with self._lock:
+            self._discard(path)
+            if self.max_bytes is not None and entry.size > self.max_bytes:
+                return  # Would never fit
+            self._entries[path] = entry
+            self._bytes += entry.size
+            self._evict()
+
+    def _discard(self, path):
+        """Remove ``path``.  Caller must hold the lock."""
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry is not None
+
+    def _evict(self):
+        """Drop LRU entries until within limits.  Caller must hold the lock."""
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+    def set_limits(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        """Change the limits, evicting entries if necessary."""
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def invalidate(self, path):
+        """Forget the cached copy of ``path``, if any.
+
+        Returns:
+            bool: True if there was a cached copy
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            return self._discard(path)
+
+    def clear(self):
+        """Forget all cached files and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+# ``checked`` is the set of names whose presence is known
+_Probe = namedtuple("_Probe", "signature present checked")
+
+
+class DirectoryProbeCache(object):
+    """LRU cache of which config files exist in each directory.
+
+    Entries are keyed by directory and validated by the directory's
+    ``(st_mtime_ns, st_size, st_ino)``.  A lookup of a directory whose
+    entry is current costs one ``stat()`` however many names are asked
+    about.  Otherwise, the names not yet known are looked up one by one.
+    (Listing even a small directory takes longer than looking up the two
+    config file names.)  All methods are thread-safe.
+
+    The counters ``syscalls`` (made by this cache) and ``lookups_avoided``
+    (failed lookups of config files that callers did not have to make)
+    give :attr:`syscalls_saved`.
+
+    Args:
+        max_entries (int): Maximum number of directories to hold, or
+            ``None`` for no limit.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_DIRS):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.syscalls = 0
+        self.lookups_avoided = 0
+        self._probes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._probes)
+
+    @property
+    def syscalls_saved(self):
+        """Net number of syscalls saved"""
+        return self.lookups_avoided - self.syscalls
+
+    def present(self, dir_name, names):
+        """Return which of ``names`` exist in ``dir_name``.
+
+        ``names`` are in the order a caller would look for them, stopping
+        at the first that exists, as
+        :class:`toolconfig_core.config_file.ConfigFile` does.  That
+        determines how many lookups the caller is saved.
+
+        Args:
+            dir_name (str): Absolute path of the directory
+            names (sequence): Entry names
+
+        Returns:
+            frozenset: The names that exist.  Empty if ``dir_name`` does not
+            exist or cannot be read.
+        """
+        syscalls = 1
+        hit = False
+        try:
+            st = os.stat(dir_name)
+        except OSError:
+            result = frozenset()
+        else:
+            signature = file_signature(st)
+            with self._lock:
+                probe = self._probes.get(dir_name)
+                if probe is not None and probe.signature == signature:
+                    self._probes.move_to_end(dir_name)
+                else:
+                    probe = _Probe(signature, frozenset(), frozenset())
+
+            unknown = [n for n in names if n not in probe.checked]
+            if unknown:
+                probe = self._probe(dir_name, probe, unknown)
+                syscalls += len(unknown)
+                if time.time_ns() - st.st_mtime_ns > RACY_NS:
+                    self._store(dir_name, probe)
+            else:
+                hit = True
+            result = frozenset(n for n in names if n in probe.present)
+
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.syscalls += syscalls
+            for name in names:
+                self.lookups_avoided += 1
+                if name in result:
+                    self.lookups_avoided -= 1  # The caller still opens it
+                    break
+        return result
+
+    def _probe(self, dir_name, probe, unknown):
+        """Look up ``unknown`` names in ``dir_name``, one syscall each.
+
+        Returns:
+            _Probe: the updated probe
+        """
+        present = set(probe.present)
+        for name in unknown:
+            if os.path.lexists(os.path.join(dir_name, name)):
+                present.add(name)
+        return _Probe(probe.signature, frozenset(present), probe.checked.union(unknown))
+
+    def _store(self, dir_name, probe):
+        with self._lock:
+            self._probes[dir_name] = probe
+            self._probes.move_to_end(dir_name)
+            while self.max_entries is not None and len(self._probes) > self.max_entries:
+                self._probes.popitem(last=False)
+
+    def invalidate(self, dir_name):
+        """Forget what is known about ``dir_name``."""
+        with self._lock:
+            self._probes.pop(os.path.abspath(dir_name), None)
+
+    def clear(self):
+        """Forget all directories and reset the statistics."""
+        with self._lock:
+            self._probes.clear()
+            self.hits = 0
+            self.misses = 0
+            self.syscalls = 0
+            self.lookups_avoided = 0
+
+    def stats(self):
+        """Return a dict of the statistics"""
+        return {
+            "directories": len(self._probes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "syscalls": self.syscalls,
+            "lookups_avoided": self.lookups_avoided,
+            "syscalls_saved": self.syscalls_saved,
+        }
+
+
+#: The cache used by :class:`toolconfig_core.config_file.ConfigFile`
+config_cache = ConfigCache()
+
+#: The directory probes used by :class:`toolconfig_core.config_file.ConfigFile`
+dir_probes = DirectoryProbeCache()
+
+
+def clear():
+    """Clear the process-wide :data:`config_cache` and :data:`dir_probes`."""
+    config_cache.clear()
+    dir_probes.clear()
+
+
+def invalidate(path):
+    """Forget ``path`` in the process-wide :data:`config_cache`."""
+    return config_cache.invalidate(path)
@@ -5,18 +5,31 @@
 """Finding and processing ToolConfig files"""
 
 import os
+from sys import intern
+from types import MappingProxyType
 
-import tomli
-
-from toolconfig_core import EC_CONFIG_NAME, TC_CONFIG_NAME
+from toolconfig_core import EC_CONFIG_NAME, TC_CONFIG_NAME, stats, trace
+from toolconfig_core.cache import config_cache, dir_probes
 from toolconfig_core.ecpy.ini import EditorConfigFile
 from toolconfig_core.exceptions import ParsingError
-from toolconfig_core.glob import matches_filename
+from toolconfig_core.frozen import freeze, is_frozen, thaw
+from toolconfig_core.glob import GlobSet
+
+
+def _intern_value(value):
+    return intern(value) if type(value) is str else freeze(value)
 
 
 class ToolConfigFile(object):
     """Load a ToolConfig file.
 
+    Each section's options are held in a read-only mapping, shared by
+    every lookup, and their names and string values are interned, so
+    the many results that repeat them share the same strings.  Arrays
+    and tables in values are frozen too (see :mod:`toolconfig_core.frozen`),
+    and :meth:`settings_for` returns mutable copies of them.  The
+    sections of :attr:`config` are those same read-only mappings.
+
     Args:
         tc_path (str): the absolute path of the toolconfig file
 
@@ -25,31 +38,106 @@ class ToolConfigFile(object):
         toolconfig_core.exceptions.ParsingError: if there is a parsing problem
     """
 
+    __slots__ = ("config", "tc_path", "sections", "globs", "_nested")
+
     def __init__(self, tc_path):
         self.config = None
         self.tc_path = tc_path
-        with open(tc_path, "rb") as f:
+        if trace.active:
+            with trace.span("load_tc", path=tc_path) as span:
+                self._load(tc_path)
+                span.attributes["sections"] = len(self.sections)
+        else:
+            self._load(tc_path)
+
+    def _load(self, tc_path):
+        import tomli  # Only needed once there is a ToolConfig file
+
+        with open(tc_path, "rb") as f, stats.timer("tc.parse"):
+            if stats.enabled:
+                stats.count("files.opened")
+                stats.count("tc.parsed")
             try:
                 self.config = tomli.load(f)
             except tomli.TOMLDecodeError as e:
                 raise ParsingError(f"Could not load {tc_path}") from e
 
-    def settings_for(self, target_path):
+        # Top-level tables are sections; skip top-level properties
+        sections = []
+        for glob, properties in self.config.items():
+            if type(properties) == dict:
+                properties = MappingProxyType(
+                    {
+                        intern(name): _intern_value(value)
+                        for name, value in properties.items()
+                    }
+                )
+                self.config[glob] = properties
+                sections.append((glob, properties))
+        self.sections = tuple(sections)
+        self._nested = any(
+            is_frozen(value)
+            for _, properties in sections
+            for value in properties.values()
+        )
+        self.globs = GlobSet(tc_path, (glob for glob, _ in self.sections))
+
+    def __getstate__(self):
+        """Make the file picklable, e.g., for the on-disk cache."""
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state["sections"] = tuple(
+            (glob, dict(properties)) for glob, properties in self.sections
+        )
+        # Sections are restored from state["sections"]
+        sections = dict(self.sections)
+        state["config"] = {
+            key: None if key in sections else value
+            for key, value in self.config.items()
+        }
+        return state
+
+    def __setstate__(self, state):
+        state["sections"] = tuple(
+            (glob, MappingProxyType(properties))
+            for glob, properties in state["sections"]
+        )
+        sections = dict(state["sections"])
+        state["config"] = {
+            key: sections.get(key, value) for key, value in state["config"].items()
+        }
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def settings_for(self, target_path, normalized=None):
         """Get the options applicable to a file.
 
         Args:
             target_path (str): Absolute path to the file of interest.
+            normalized (str): ``normalize_target(target_path)``, if the
+                caller already has it
         """
         result = {}
-        for glob, properties in self.config.items():
-            # Skip top-level properties
-            if type(properties) != dict:
-                continue
-
-            if not matches_filename(self.tc_path, glob, target_path):
-                continue
-
-            result.update(properties)
+        if trace.active:
+            with trace.span(
+                "match",
+                path=target_path,
+                config=self.tc_path,
+                sections=len(self.globs),
+            ) as span:
+                indices = self.globs.matching(target_path, normalized)
+                span.attributes["matched"] = len(indices)
+        else:
+            indices = self.globs.matching(target_path, normalized)
+        if stats.enabled:
+            stats.count("match.attempted", len(self.globs))
+            stats.count("match.succeeded", len(indices))
+        for index in indices:
+            result.update(self.sections[index][1])
+        if self._nested:
+            # Don't let callers change the shared arrays and tables
+            for key, value in result.items():
+                if is_frozen(value):
+                    result[key] = thaw(value)
 
         return result
 
@@ -62,32 +150,82 @@ class ConfigFile(object):
     """Load the config file in a directory.
 
     Load the file called TC_CONFIG_NAME if it exists,
-    otherwise the file called EC_CONFIG_NAME.
+    otherwise the file called EC_CONFIG_NAME.  Parsed files are shared
+    through :data:`toolconfig_core.cache.config_cache`, and which files
+    exist is remembered by :data:`toolconfig_core.cache.dir_probes`.
 
     Args:
         dir_name (str): The directory to look in
         ec_name (str): The name of EditorConfig files
+        names (set): The names of the entries of ``dir_name``, if the caller
+            already has them.  Config files not listed are not looked for.
     """
 
-    def __init__(self, dir_name, ec_name=EC_CONFIG_NAME):
+    __slots__ = ("dir_name", "tc", "ec")
+
+    def __init__(self, dir_name, ec_name=EC_CONFIG_NAME, names=None):
+        if stats.enabled:
+            stats.count("config_file.created")
         self.dir_name = dir_name
         self.tc = None
         self.ec = None
 
+        if names is None and config_cache.watcher is None:
+            # A watcher makes missing files free to look up; otherwise ask
+            # the directory.
+            names = dir_probes.present(dir_name, (TC_CONFIG_NAME, ec_name))
+
         try:
-            self.tc = ToolConfigFile(os.path.join(dir_name, TC_CONFIG_NAME))
+            if names is None or TC_CONFIG_NAME in names:
+                self.tc = config_cache.get(
+                    os.path.join(dir_name, TC_CONFIG_NAME), ToolConfigFile
+                )
 
-            # If there's a TC file, we don't look for an EC file.
-            return
+                # If there's a TC file, we don't look for an EC file.
+                return
         except OSError:
             pass
 
+        if names is not None and ec_name not in names:
+            return
         try:
-            self.ec = EditorConfigFile(os.path.join(dir_name, ec_name))
+            self.ec = config_cache.get(
+                os.path.join(dir_name, ec_name), EditorConfigFile
+            )
             return
         except OSError:
             pass
 
+    @classmethod
+    def cached(cls, dir_name, ec_name=EC_CONFIG_NAME):
+        """Return the ConfigFile for ``dir_name`` if it can be made
+        without loading anything.
+
+        Returns:
+            ConfigFile: The same as ``ConfigFile(dir_name, ec_name)``, or
+            None if a config file is not in the cache or has changed.
+        """
+        config = cls.__new__(cls)
+        config.dir_name = dir_name
+        config.tc = None
+        config.ec = None
+
+        try:
+            config.tc = config_cache.cached(
+                os.path.join(dir_name, TC_CONFIG_NAME), ToolConfigFile
+            )
+            return config if config.tc is not None else None
+        except OSError:
+            pass
+
+        try:
+            config.ec = config_cache.cached(
+                os.path.join(dir_name, ec_name), EditorConfigFile
+            )
+            return config if config.ec is not None else None
+        except OSError:
+            return config  # No config file
+
     @property
     def is_root(self):
         if self.tc:
@@ -97,16 +235,18 @@ class ConfigFile(object):
         else:
             return False
 
-    def settings_for(self, target_filename):
+    def settings_for(self, target_filename, normalized=None):
         """Return the settings for target_path, which may or may not exist.
 
         Args:
             target_path (str): Absolute path
+            normalized (str): ``normalize_target(target_path)``, if the
+                caller already has it
         """
         if self.tc:
-            return self.tc.settings_for(target_filename)
+            return self.tc.settings_for(target_filename, normalized)
         elif self.ec:
-            return self.ec.settings_for(target_filename)
+            return self.ec.settings_for(target_filename, normalized)
         else:
             return {}
 
@@ -122,16 +262,41 @@ def dirs_for(filename):
         path = newpath
 
 
-def find_root_dir(filename):
-    """Find the project root directory for ``filename``."""
-    last_dir = None
+def config_chain(filename, ec_name=EC_CONFIG_NAME):
+    """Load the config files that apply to ``filename``.
+
+    Walks up from the directory containing ``filename``, stopping at the
+    first directory whose config file is a root file.
+
+    Args:
+        filename (str): Absolute path to the file of interest
+        ec_name (str): The name of EditorConfig files
+
+    Returns:
+        list: A :class:`ConfigFile` for each directory, nearest first.
+        The last one is for the project root directory.
+    """
+    if trace.active:
+        with trace.span("walk", path=os.path.dirname(filename)) as span:
+            chain = _walk(filename, ec_name)
+            span.attributes["configs"] = len(chain)
+        return chain
+    return _walk(filename, ec_name)
+
+
+def _walk(filename, ec_name):
+    chain = []
     for d in dirs_for(filename):
-        last_dir = d
-        config = ConfigFile(d)
+        config = ConfigFile(d, ec_name)
+        chain.append(config)
         if config.is_root:
-            return d
+            break
+    return chain
 
-    return last_dir
+
+def find_root_dir(filename, ec_name=EC_CONFIG_NAME):
+    """Find the project root directory for ``filename``."""
+    return config_chain(filename, ec_name)[-1].dir_name
 
 
 def get_filenames(path, filename):
@@ -0,0 +1,283 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Persistent on-disk cache of parsed config files.
+
+Every ``toolconfig`` process otherwise starts cold, and must parse every
+config file and translate every glob again.  A :class:`DiskCache` stores
+loaded :class:`~toolconfig_core.config_file.ToolConfigFile` and
+:class:`~toolconfig_core.ecpy.ini.EditorConfigFile` objects, including
+the regex sources of their translated globs, in one file per config file.
+Entries are validated by the config file's path and ``stat()`` fields and
+by :data:`FORMAT_VERSION`.  A file modified less than
+:data:`~toolconfig_core.cache.RACY_NS` before it was loaded is not
+stored: a same-size rewrite within the same timestamp tick would leave
+its ``stat()`` fields unchanged, and the stale entry would be trusted.
+
+The cache is off by default.  :func:`enable` attaches a DiskCache to
+:data:`toolconfig_core.cache.config_cache`, so that in-memory misses are
+filled from disk.  Entries are written to a temporary file and renamed
+into place, so concurrent processes never see partial entries.
+
+Entries are pickles, so the cache directory must only be writable by
+the user.  It is created with mode 0700.  If it already exists but is
+owned by another user, or is writable by its group or by everyone, the
+cache turns itself off rather than unpickle anything from it.
+"""
+
+import hashlib
+import os
+import pickle
+import stat
+import tempfile
+import time
+
+from toolconfig_core import VERSION
+from toolconfig_core.cache import RACY_NS, config_cache
+
+#: Version of the on-disk format.  Bump when the cached classes change.
+FORMAT_VERSION = 4
+
+#: Default maximum total size of a cache directory
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+#: Environment variable that overrides the default cache directory
+CACHE_DIR_ENV = "TOOLCONFIG_CACHE_DIR"
+
+_SUFFIX = ".pickle"
+
+
+def default_cache_dir():
+    """Return the default cache directory.
+
+    This is ``$TOOLCONFIG_CACHE_DIR`` if set, otherwise
+    ``$XDG_CACHE_HOME/toolconfig``, otherwise ``~/.cache/toolconfig``.
+    """
+    if os.environ.get(CACHE_DIR_ENV):
+        return os.environ[CACHE_DIR_ENV]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "toolconfig")
+
+
+def _loader_name(loader):
+    return f"{loader.__module__}.{loader.__qualname__}"
+
+
+class DiskCache(object):
+    """A directory of cached, parsed config files.
+
+    Args:
+        directory (str): Where to keep the cache; created if necessary.
+            Default :func:`default_cache_dir`.
+        max_bytes (int): Maximum total size of the entries.  When a write
+            takes the cache over this size, the least-recently-used entries
+            are deleted.
+
+    Attributes:
+        enabled (bool): False once the directory has been found to be
+            unsafe.  A disabled cache just calls the loader.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self._verified = False
+        self._size = None  # Estimated total size of the entries, if known
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    def _entry_path(self, path):
+        digest = hashlib.sha256(os.fsencode(path)).hexdigest()
+        return os.path.join(self.directory, digest + _SUFFIX)
+
+    def verify(self):
+        """Check that only this user can write to the directory.
+
+        Returns:
+            bool: False if the directory is unsafe, in which case the cache
+            is turned off.  True if it is safe or does not exist yet.
+        """
+        if self._verified or not self.enabled:
+            return self.enabled
+        try:
+            st = os.stat(self.directory)
+        except FileNotFoundError:
+            return True  # _write() will create it, then check again
+        except OSError:
+            self.enabled = False
+            return False
+        if hasattr(os, "getuid") and (  # No owner or mode bits on Windows
+            st.st_uid != os.getuid() or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+        ):
+            self.enabled = False
+            return False
+        self._verified = True
+        return True
+
+    def _entries(self):
+        """Yield ``os.DirEntry`` for each entry file"""
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(_SUFFIX) and entry.is_file():
+                        yield entry
+        except FileNotFoundError:
+            return
+
+    def load(self, path, loader, signature):
+        """Return ``loader(path)``, from the cache if possible.
+
+        Args:
+            path (str): Absolute path of the config file
+            loader (callable): Loads the config file on a miss
+            signature (tuple): The file's current
+                :func:`toolconfig_core.cache.file_signature`
+
+        Raises:
+            Whatever ``loader`` raises.  Problems with the cache itself
+            are never raised; they just count as misses.
+        """
+        if not self.verify():
+            return loader(path)
+        key = (FORMAT_VERSION, VERSION, path, signature, _loader_name(loader))
+        entry_path = self._entry_path(path)
+        try:
+            with open(entry_path, "rb") as f:
+                stored_key, value = pickle.load(f)
+            if stored_key == key:
+                self.hits += 1
+                os.utime(entry_path)  # Mark as recently used
+                return value
+        except FileNotFoundError:
+            pass
+        except Exception:
+            self.errors += 1  # Corrupt or stale-format entry; replace it
+
+        self.misses += 1
+        value = loader(path)
+        if time.time_ns() - signature[0] > RACY_NS:
+            self._write(entry_path, (key, value))
+        return value
+
+    def _write(self, entry_path, data):
+        """Atomically write an entry, then trim the cache if necessary.
+
+        The total size is only listed on the first write, and kept up to
+        date from then on, so writing many entries does not rescan the
+        directory each time.  Entries other processes write are not
+        counted until the next :meth:`trim`.
+        """
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            if not self.verify():
+                return
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.directory, prefix=".tmp-", suffix=".partial"
+            )
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    size = f.tell()
+                os.replace(tmp_path, entry_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self.writes += 1
+            if self._size is None:
+                self.trim()
+            else:
+                # Overestimates if an older entry was replaced; trim() corrects
+                self._size += size
+                if self._size > self.max_bytes:
+                    self.trim()
+        except Exception:  # E.g., an unpicklable value
+            self.errors += 1
+
+    def trim(self, max_bytes=None):
+        """Delete least-recently-used entries until the cache fits.
+
+        Args:
+            max_bytes (int): Size to trim to.  Default ``self.max_bytes``.
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        entries = []
+        total = 0
+        for entry in self._entries():
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, entry.path))
+            total += st.st_size
+        if total > max_bytes:
+            entries.sort()
+            for _, size, entry_path in entries:
+                try:
+                    os.unlink(entry_path)
+                except FileNotFoundError:
+                    pass  # Another process got there first
+                total -= size
+                if total <= max_bytes:
+                    break
+        self._size = total
+
+    def clear(self):
+        """Delete all entries.
+
+        Returns:
+            int: The number of entries deleted
+        """
+        count = 0
+        for entry in self._entries():
+            try:
+                os.unlink(entry.path)
+                count += 1
+            except FileNotFoundError:
+                pass
+        self._size = None
+        return count
+
+    def stats(self):
+        """Return a dict describing the cache's contents and activity"""
+        entries = 0
+        total = 0
+        for entry in self._entries():
+            try:
+                total += entry.stat().st_size
+                entries += 1
+            except OSError:
+                pass
+        return {
+            "directory": self.directory,
+            "enabled": self.verify(),
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "errors": self.errors,
+        }
+
+
+def enable(directory=None, max_bytes=DEFAULT_MAX_BYTES, cache=config_cache):
+    """Back an in-memory :class:`~toolconfig_core.cache.ConfigCache` with
+    a :class:`DiskCache`.
+
+    Returns:
+        DiskCache: the newly-attached cache
+    """
+    cache.persistent = DiskCache(directory, max_bytes)
+    return cache.persistent
+
+
+def disable(cache=config_cache):
+    """Detach the on-disk cache, if any, from ``cache``"""
+    cache.persistent = None
@@ -7,12 +7,36 @@ __all__ = ['get_properties', 'EditorConfigError', 'exceptions']
 
 __version__ = join_version(VERSION)
 
+# Imported on first use (PEP 562), so that importing a submodule such as
+# ``ecpy.ini`` does not also import the handler.
+_LAZY = {
+    'EditorConfigHandler': 'toolconfig_core.ecpy.handler',
+    'EditorConfigError': 'toolconfig_core.ecpy.exceptions',
+    'ParsingError': 'toolconfig_core.ecpy.exceptions',
+    'PathError': 'toolconfig_core.ecpy.exceptions',
+    'VersionError': 'toolconfig_core.ecpy.exceptions',
+}
+
 
 def get_properties(filename):
     """Locate and parse EditorConfig files for the given filename"""
+    from toolconfig_core.ecpy.handler import EditorConfigHandler
+
     handler = EditorConfigHandler(filename)
     return handler.get_configurations()
 
 
-from toolconfig_core.ecpy.handler import EditorConfigHandler
-from toolconfig_core.ecpy.exceptions import *
+def __getattr__(name):
+    from importlib import import_module
+
+    if name == 'exceptions':
+        return import_module('toolconfig_core.ecpy.exceptions')
+    if name in _LAZY:
+        value = getattr(import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | {'exceptions'})
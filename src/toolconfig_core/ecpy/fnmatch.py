@@ -4,7 +4,9 @@ fnmatch(FILENAME, PATTERN) matches according to the local convention.
 fnmatchcase(FILENAME, PATTERN) always takes case in account.
 
 The functions operate by translating the pattern into a regular
-expression.  They cache the compiled regular expressions for speed.
+expression.  They cache the compiled regular expressions for speed, in
+a bounded LRU cache whose size and statistics are available through
+set_cache_size() and cache_stats().
 
 The function translate(PATTERN) returns a regular expression
 corresponding to PATTERN.  (It does not compile it.)
@@ -15,15 +17,131 @@ Licensed under PSF License (see LICENSE.PSF file).
 
 Changes to original fnmatch module:
 - translate function supports ``*`` and ``**`` similarly to fnmatch C library
+- PatternSet matches a name against many patterns in one regex scan
+- classify identifies patterns that can be matched by hash lookup
 """
 
 import os
 import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
 
+from toolconfig_core import stats, trace
 
-__all__ = ["fnmatch", "fnmatchcase", "translate"]
 
-_cache = {}
+__all__ = ["fnmatch", "fnmatchcase", "translate", "classify", "PatternSet",
+           "cache_stats", "set_cache_size", "clear_cache"]
+
+#: Default number of compiled patterns kept by cached_translate()
+DEFAULT_CACHE_SIZE = 1024
+
+
+class TranslationCache(object):
+    """Bounded, thread-safe LRU cache of translated, compiled patterns.
+
+    Concurrent misses on the same pattern may each translate it, but only
+    the first result is stored, and every caller gets that result.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compile_time = 0.0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, pat):
+        return pat in self._data
+
+    def get(self, pat):
+        """Return (compiled regex, numeric groups) for PATTERN"""
+        with self._lock:
+            entry = self._data.get(pat)
+            if entry is not None:
+                self._data.move_to_end(pat)
+                self.hits += 1
+                if stats.enabled:
+                    stats.count('fnmatch.cache_hits')
+                return entry
+            self.misses += 1
+
+        start = time.perf_counter()
+        if trace.active:
+            with trace.span('translate', pattern=pat):
+                res, num_groups = translate(pat)
+                entry = re.compile(res), num_groups
+        else:
+            res, num_groups = translate(pat)
+            entry = re.compile(res), num_groups
+        elapsed = time.perf_counter() - start
+        if stats.enabled:
+            stats.count('fnmatch.cache_misses')
+            stats.count('fnmatch.compiles')
+            stats.add_time('fnmatch.compile', elapsed)
+
+        with self._lock:
+            self.compile_time += elapsed
+            existing = self._data.get(pat)
+            if existing is not None:
+                return existing
+            self._data[pat] = entry
+            self._evict()
+        return entry
+
+    def _evict(self):
+        """Drop LRU entries until within maxsize.  Caller holds the lock."""
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def resize(self, maxsize):
+        """Change the maximum number of patterns, evicting if necessary"""
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        """Forget all patterns and reset the statistics"""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+            self.compile_time = 0.0
+
+    def stats(self):
+        """Return a dict of the cache's size and statistics"""
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'compile_time': self.compile_time,
+            }
+
+
+_cache = TranslationCache()
+
+
+def cache_stats():
+    """Return the statistics of the cached_translate() cache as a dict"""
+    return _cache.stats()
+
+
+def set_cache_size(maxsize):
+    """Set the number of patterns the cached_translate() cache holds"""
+    _cache.resize(maxsize)
+
+
+def clear_cache():
+    """Empty the cached_translate() cache"""
+    _cache.clear()
 
 LEFT_BRACE = re.compile(
     r"""
@@ -80,16 +198,16 @@ def fnmatch(name, pat):
     If you don't want this, use fnmatchcase(FILENAME, PATTERN).
     """
 
-    name = os.path.normpath(name).replace(os.sep, "/")
-    return fnmatchcase(name, pat)
+    return fnmatchcase(normalize(name), pat)
+
+
+def normalize(name):
+    """Normalize FILENAME the way fnmatch() does before matching"""
+    return os.path.normpath(name).replace(os.sep, "/")
 
 
 def cached_translate(pat):
-    if not pat in _cache:
-        res, num_groups = translate(pat)
-        regex = re.compile(res)
-        _cache[pat] = regex, num_groups
-    return _cache[pat]
+    return _cache.get(pat)
 
 
 def fnmatchcase(name, pat):
@@ -103,18 +221,46 @@ def fnmatchcase(name, pat):
     match = regex.match(name)
     if not match:
         return False
-    pattern_matched = True
-    for (num, (min_num, max_num)) in zip(match.groups(), num_groups):
-        if num[0] == '0' or not (min_num <= int(num) <= max_num):
-            pattern_matched = False
-            break
-    return pattern_matched
+    return _in_ranges(match, num_groups)
+
+
+class NumericRange(namedtuple('NumericRange', ['name', 'min', 'max'])):
+    """An immutable ``{min..max}`` range from a pattern.
+
+    NAME is the name of the regex group that captures the number.
+    """
+
+    __slots__ = ()
+
+    def contains(self, num):
+        """Return True if the captured string NUM is in the range.
+
+        Numbers with leading zeros never match.
+        """
+        return num[0] != '0' and self.min <= int(num) <= self.max
+
+
+def _in_ranges(match, num_groups):
+    """Check the numbers captured in MATCH against their NumericRanges.
+
+    A range inside a brace alternative that was not taken captures
+    nothing, and does not constrain the match.
+    """
+    for num_range in num_groups:
+        num = match.group(num_range.name)
+        if num is not None and not num_range.contains(num):
+            return False
+    return True
 
 
-def translate(pat, nested=False):
+def translate(pat, nested=False, group_prefix='r', first_group=0):
     """Translate a shell PATTERN to a regular expression.
 
     There is no way to quote meta-characters.
+
+    Returns a tuple of the regex and a tuple of NumericRange, one for each
+    ``{a..b}`` in the pattern.  Each number is captured by a named group,
+    GROUP_PREFIX followed by the range's index plus FIRST_GROUP.
     """
 
     index, length = 0, len(pat)  # Current index and length of pattern
@@ -180,11 +326,17 @@ def translate(pat, nested=False):
             if not has_comma and pos < length:
                 num_range = NUMERIC_RANGE.match(pat[index:pos])
                 if num_range:
-                    numeric_groups.append(map(int, num_range.groups()))
-                    result += r"([+-]?\d+)"
+                    group_name = '%s%d' % (group_prefix,
+                                           first_group + len(numeric_groups))
+                    min_num, max_num = map(int, num_range.groups())
+                    numeric_groups.append(
+                        NumericRange(group_name, min_num, max_num))
+                    result += r"(?P<%s>[+-]?\d+)" % group_name
                 else:
-                    inner_result, inner_groups = translate(pat[index:pos],
-                                                           nested=True)
+                    inner_result, inner_groups = translate(
+                        pat[index:pos], nested=True,
+                        group_prefix=group_prefix,
+                        first_group=first_group + len(numeric_groups))
                     result += '\\{%s\\}' % (inner_result,)
                     numeric_groups += inner_groups
                 index = pos + 1
@@ -220,4 +372,179 @@ def translate(pat, nested=False):
             is_escaped = False
     if not nested:
         result = r'(?s)%s\Z' % result
-    return result, numeric_groups
+    return result, tuple(numeric_groups)
+
+
+#: Pattern classes reported by classify()
+MATCH_ALL = 'match-all'         # matches any basename
+LITERAL = 'literal'             # basename is one of a set of names
+EXTENSION = 'extension'         # basename ends with one of a set of suffixes
+GENERAL = 'general'             # anything else; needs a regex
+
+# Characters that make a glob more than a literal name
+_GLOB_SPECIAL = frozenset('*?[]{},\\/')
+
+
+def _expand_braces(pat):
+    """Expand a single level of {a,b,c} in PAT, if there is exactly one.
+
+    Returns a list of alternatives, or None if PAT has nested, unbalanced
+    or comma-free braces.
+    """
+    if '{' not in pat and '}' not in pat:
+        return [pat]
+    start = pat.find('{')
+    end = pat.find('}')
+    if (start == -1 or end < start or pat.count('{') != 1 or
+            pat.count('}') != 1):
+        return None
+    inner = pat[start + 1:end]
+    if ',' not in inner:
+        return None     # {single} and {a..b} mean something else
+    prefix, suffix = pat[:start], pat[end + 1:]
+    return [prefix + alt + suffix for alt in inner.split(',')]
+
+
+def classify(pat):
+    """Classify an fnmatch() pattern so it can be matched without a regex.
+
+    Only patterns that match a file's basename in any directory, i.e.,
+    that start with ``**/`` and have no other ``/``, are classified
+    as anything other than GENERAL.  Such a pattern matches a name that
+    contains a ``/`` and whose last component:
+
+    - MATCH_ALL: is anything (``*``)
+    - LITERAL: is one of KEYS (``Makefile``, ``{Makefile,GNUmakefile}``)
+    - EXTENSION: ends with one of KEYS, each starting with ``.``
+      (``*.py``, ``{*.c,*.h}``, ``*.{c,h}``, ``*.tar.gz``)
+
+    Returns:
+        tuple: (class, KEYS), where KEYS is a frozenset.
+    """
+    if not pat.startswith('**/'):
+        return GENERAL, frozenset()
+    base = pat[3:]
+    if base in ('*', '**'):
+        return MATCH_ALL, frozenset()
+
+    alternatives = _expand_braces(base)
+    if not alternatives:
+        return GENERAL, frozenset()
+
+    literals = set()
+    extensions = set()
+    for alt in alternatives:
+        if alt.startswith('*') and alt[1:2] == '.':
+            extensions.add(alt[1:])
+            alt = alt[1:]
+        else:
+            literals.add(alt)
+        if not alt or _GLOB_SPECIAL.intersection(alt):
+            return GENERAL, frozenset()
+
+    if literals and extensions:
+        return GENERAL, frozenset()
+    if literals:
+        return LITERAL, frozenset(literals)
+    return EXTENSION, frozenset(extensions)
+
+
+class PatternSet(object):
+    """A list of patterns that are all tested against a name at once.
+
+    Patterns are classified with classify() when the set is created.
+    Basename patterns (``*``, ``*.py``, ``Makefile``, ...) are put in
+    dict indexes keyed by basename and by extension, so they are matched
+    with hash lookups.
+
+    The remaining, general patterns are translated into one regex in which
+    each pattern is an optional lookahead at the start of the name, with a
+    named group around it.  One ``match()`` therefore reports every
+    general pattern that matches, and the numeric ranges of just those
+    patterns are then checked.
+
+    The results are the same as calling fnmatchcase() with each pattern
+    in turn.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = tuple(patterns)
+        if trace.active:
+            with trace.span('translate', patterns=len(self.patterns)):
+                self._build()
+        else:
+            self._build()
+
+    def _build(self):
+        self._match_all = []
+        self._by_name = {}
+        self._by_extension = {}
+        self._general = []  # (index, group name, numeric ranges)
+        parts = []
+        for index, pat in enumerate(self.patterns):
+            kind, keys = classify(pat)
+            if kind == MATCH_ALL:
+                self._match_all.append(index)
+                continue
+            elif kind != GENERAL:
+                table = self._by_name if kind == LITERAL else \
+                    self._by_extension
+                for key in keys:
+                    table.setdefault(key, []).append(index)
+                continue
+
+            group_name = 'p%d' % index
+            res, num_groups = translate(pat, nested=True,
+                                        group_prefix=group_name + '_')
+            self._general.append((index, group_name, num_groups))
+            parts.append('(?:(?=(?P<%s>%s\\Z))|)' % (group_name, res))
+
+        self._regex = None
+        if parts:
+            if stats.enabled:
+                stats.count('fnmatch.compiles')
+            try:
+                with stats.timer('fnmatch.compile'):
+                    self._regex = re.compile('(?s)' + ''.join(parts))
+            except re.error:
+                # Report the bad pattern the same way fnmatchcase() would,
+                # when it is reached.
+                pass
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def fnmatch(self, name):
+        """Return the indices of the patterns FILENAME matches, in order.
+
+        FILENAME is normalized as in fnmatch().
+        """
+        return self.fnmatchcase(normalize(name))
+
+    def fnmatchcase(self, name):
+        """Return the indices of the patterns FILENAME matches, in order."""
+        matches = []
+
+        slash = name.rfind('/')
+        if slash != -1:
+            matches.extend(self._match_all)
+            base = name[slash + 1:]
+            if self._by_name:
+                matches.extend(self._by_name.get(base, ()))
+            if self._by_extension:
+                dot = base.find('.')
+                while dot != -1:
+                    matches.extend(self._by_extension.get(base[dot:], ()))
+                    dot = base.find('.', dot + 1)
+
+        if self._regex is not None:
+            match = self._regex.match(name)
+            for index, group_name, num_groups in self._general:
+                if (match.group(group_name) is not None and
+                        _in_ranges(match, num_groups)):
+                    matches.append(index)
+        elif self._general:
+            matches.extend(index for index, _, _ in self._general
+                           if fnmatchcase(name, self.patterns[index]))
+
+        return sorted(set(matches))
@@ -40,6 +40,8 @@ class EditorConfigHandler(object):
 
     """
 
+    __slots__ = ('filepath', 'conf_filename', 'version', 'options')
+
     def __init__(self, filepath, conf_filename='.editorconfig',
                  version=VERSION):
         """Create EditorConfigHandler for matching given filepath"""
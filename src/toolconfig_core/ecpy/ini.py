@@ -10,23 +10,24 @@ Changes to original ConfigParser:
 - Octothorpe can be used for comments (not just at beginning of line)
 - Only track INI options in sections that match target filename
 - Stop parsing files with when ``root = true`` is found
-- Add EditorConfigFile
+- Add EditorConfigFile, which parses a file once into a table of sections
+- Intern option names and values, and use ``__slots__``, to save memory
+- Read and decode each file at once, and match each line with one regex
 
 """
 
-import posixpath
 import re
-from codecs import open
-from collections import OrderedDict
-from os import sep
-from os.path import dirname, exists, normpath
+from sys import intern
+from collections import OrderedDict, namedtuple
+from types import MappingProxyType
 
-from toolconfig_core.ecpy.compat import u
+from toolconfig_core import stats, trace
 from toolconfig_core.ecpy.exceptions import ParsingError
 from toolconfig_core.ecpy.fnmatch import fnmatch
+from toolconfig_core.ecpy.matcher import GlobSet, anchor_glob
 
 
-__all__ = ["ParsingError", "EditorConfigParser"]
+__all__ = ["ParsingError", "EditorConfigParser", "EditorConfigFile"]
 
 MAX_SECTION_LENGTH = 4096
 MAX_PROPERTY_LENGTH= 50
@@ -40,6 +41,8 @@ class EditorConfigParser(object):
     Based on RawConfigParser from ConfigParser.py in Python 2.6.
     """
 
+    __slots__ = ('filename', 'options', 'root_file')
+
     # Regular expressions for parsing section headers and options.
     # Allow ``]`` and escaped ``;`` and ``#`` characters in section headers
     SECTCRE = re.compile(
@@ -80,6 +83,39 @@ class EditorConfigParser(object):
 
         """, re.VERBOSE
     )
+    # Either of the above, so each line is matched once.  A line that
+    # matches SECTCRE is a section header, whether or not it matches OPTCRE.
+    LINECRE = re.compile(
+        r"""
+
+        \s *                                # Optional whitespace
+        (?:
+            \[                              # Opening square brace
+            (?P<header>                     # One or more characters excluding
+                ( [^\#;] | \\\# | \\; ) +   # unescaped # and ; characters
+            )
+            \]                              # Closing square brace
+        |
+            (?P<option>                     # One or more characters excluding
+                [^:=\s]                     # : a = characters (and first
+                [^:=] *                     # must not be whitespace)
+            )
+            \s *                            # Optional whitespace
+            (?P<vi>
+                [:=]                        # Single = or : character
+            )
+            \s *                            # Optional whitespace
+            (?P<value>
+                . *                         # One or more characters
+            )
+            $
+        )
+
+        """, re.VERBOSE
+    )
+    # A comment at the end of a value: ';' and '#' are comment delimiters
+    # only if preceded by a spacing character
+    COMMENTCRE = re.compile('(.*?) [;#]')
 
     def __init__(self, filename):
         self.filename = filename
@@ -88,25 +124,19 @@ class EditorConfigParser(object):
 
     def matches_filename(self, config_filename, glob):
         """Return True if section glob matches filename"""
-        config_dirname = normpath(dirname(config_filename)).replace(sep, '/')
-        glob = glob.replace("\\#", "#")
-        glob = glob.replace("\\;", ";")
-        if '/' in glob:
-            if glob.find('/') == 0:
-                glob = glob[1:]
-            glob = posixpath.join(config_dirname, glob)
-        else:
-            glob = posixpath.join('**/', glob)
-        return fnmatch(self.filename, glob)
+        return fnmatch(self.filename, anchor_glob(config_filename, glob))
 
     def read(self, ec_filename):
         """Read and parse single EditorConfig file"""
         try:
-            fp = open(ec_filename, encoding='utf-8')
+            fp = open(ec_filename, 'rb')
         except IOError:
             return
-        self._read(fp, ec_filename)
-        fp.close()
+        if stats.enabled:
+            stats.count('files.opened')
+            stats.count('ec.parsed')
+        with fp, stats.timer('ec.parse'):
+            self._read(fp, ec_filename)
 
     def _read(self, fp, fpname):
         """Parse a sectioned setup file.
@@ -117,65 +147,60 @@ class EditorConfigParser(object):
         Continuations are represented by an embedded newline then
         leading whitespace.  Blank lines, lines beginning with a '#',
         and just about everything else are ignored.
+
+        The whole file is read and decoded at once, then split into lines
+        at the same line boundaries as ``codecs`` readline() uses.
         """
+        text = fp.read()
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        if text.startswith('\ufeff'):
+            text = text[1:]  # Strip UTF-8 BOM
+
+        match_line = self.LINECRE.match
         in_section = False
-        matching_section = False
-        optname = None
-        lineno = 0
+        section_options = None
         e = None                                  # None, or an exception
-        while True:
-            line = fp.readline()
-            if not line:
-                break
-            if lineno == 0 and line.startswith(u('\ufeff')):
-                line = line[1:]  # Strip UTF-8 BOM
-            lineno = lineno + 1
+        for lineno, line in enumerate(text.splitlines(True), 1):
             # comment or blank line?
-            if line.strip() == '' or line[0] in '#;':
+            if line[0] in '#;' or line.isspace():
+                continue
+            mo = match_line(line)
+            if mo is None:
+                # a non-fatal parsing error occurred.  set up the
+                # exception but keep going. the exception will be
+                # raised at the end of the file and will contain a
+                # list of all bogus lines
+                if not e:
+                    e = ParsingError(fpname)
+                e.append(lineno, repr(line))
                 continue
-            # a section header or option header?
+            sectname = mo.group('header')
+            # is it a section header?
+            if sectname is not None:
+                if len(sectname) > MAX_SECTION_LENGTH:
+                    continue
+                in_section = True
+                section_options = self._start_section(fpname, sectname)
+            # an option line
             else:
-                # is it a section header?
-                mo = self.SECTCRE.match(line)
-                if mo:
-                    sectname = mo.group('header')
-                    if len(sectname) > MAX_SECTION_LENGTH:
-                        continue
-                    in_section = True
-                    matching_section = self.matches_filename(fpname, sectname)
-                    # So sections can't start with a continuation line
-                    optname = None
-                # an option line?
-                else:
-                    mo = self.OPTCRE.match(line)
-                    if mo:
-                        optname, vi, optval = mo.group('option', 'vi', 'value')
-                        if ';' in optval or '#' in optval:
-                            # ';' and '#' are comment delimiters only if
-                            # preceeded by a spacing character
-                            m = re.search('(.*?) [;#]', optval)
-                            if m:
-                                optval = m.group(1)
-                        optval = optval.strip()
-                        # allow empty values
-                        if optval == '""':
-                            optval = ''
-                        optname = self.optionxform(optname.rstrip())
-                        if (len(optname) > MAX_PROPERTY_LENGTH or
-                            len(optval) > MAX_VALUE_LENGTH):
-                            continue
-                        if not in_section and optname == 'root':
-                            self.root_file = (optval.lower() == 'true')
-                        if matching_section:
-                            self.options[optname] = optval
-                    else:
-                        # a non-fatal parsing error occurred.  set up the
-                        # exception but keep going. the exception will be
-                        # raised at the end of the file and will contain a
-                        # list of all bogus lines
-                        if not e:
-                            e = ParsingError(fpname)
-                        e.append(lineno, repr(line))
+                optname, optval = mo.group('option', 'value')
+                if ';' in optval or '#' in optval:
+                    m = self.COMMENTCRE.search(optval)
+                    if m:
+                        optval = m.group(1)
+                optval = optval.strip()
+                # allow empty values
+                if optval == '""':
+                    optval = ''
+                optname = self.optionxform(optname.rstrip())
+                if (len(optname) > MAX_PROPERTY_LENGTH or
+                    len(optval) > MAX_VALUE_LENGTH):
+                    continue
+                if not in_section and optname == 'root':
+                    self.root_file = (optval.lower() == 'true')
+                if section_options is not None:
+                    section_options[intern(optname)] = intern(optval)
         # if any parsing errors occurred, raise an exception
         if e:
             raise e
@@ -183,30 +208,85 @@ class EditorConfigParser(object):
     def optionxform(self, optionstr):
         return optionstr.lower()
 
+    def _start_section(self, fpname, sectname):
+        """Return the dict to store the options of a section in, or None
+        to ignore them"""
+        if self.matches_filename(fpname, sectname):
+            return self.options
+        return None
+
+
+#: One section of an EditorConfigFile: the section name as written, the
+#: anchored fnmatch pattern it becomes, and a read-only mapping of its options
+Section = namedtuple('Section', ['glob', 'pattern', 'options'])
+
+
 class EditorConfigFile(EditorConfigParser):
     """A .editorconfig file.
 
+    The file is parsed once, when the instance is created, into
+    ``sections``, a tuple of :data:`Section` in file order.  After that,
+    ``settings_for()`` only matches globs, all at once using
+    ``globs``, and does not touch the disk.
+
     Args:
         ec_filename: The full path to the EditorConfig file to read
 
     Raises:
         OSError: if the file doesn't exist
+        ParsingError: if the file can't be parsed
     """
 
+    __slots__ = ('file_exists', 'ec_filename', 'sections', 'globs',
+                 '_sections')
+
     def __init__(self, ec_filename):
         placeholder_filename = "\0"
         super().__init__(placeholder_filename)
         self.file_exists = False
         self.ec_filename = ec_filename
+        if trace.active:
+            with trace.span('load_ec', path=ec_filename) as span:
+                self._load(ec_filename)
+                span.attributes['sections'] = len(self.sections)
+        else:
+            self._load(ec_filename)
+
+    def _load(self, ec_filename):
+        self._sections = []
 
         self.read(ec_filename)
 
-    def _read(self, *args):
-        """Record the fact that the file exists.
+        self.sections = tuple(self._sections)
+        self.globs = GlobSet(ec_filename, (s.glob for s in self.sections))
+        del self._sections
+
+    def _start_section(self, fpname, sectname):
+        """Start a new section, regardless of which files it matches."""
+        options = {}
+        self._sections.append(Section(sectname,
+                                      anchor_glob(fpname, sectname),
+                                      MappingProxyType(options)))
+        return options
+
+    def __getstate__(self):
+        """Make the file picklable, e.g., for the on-disk cache."""
+        state = {name: getattr(self, name)
+                 for name in EditorConfigParser.__slots__ + self.__slots__
+                 if hasattr(self, name)}
+        state['sections'] = tuple(s._replace(options=dict(s.options))
+                                  for s in self.sections)
+        return state
+
+    def __setstate__(self, state):
+        state['sections'] = tuple(
+            s._replace(options=MappingProxyType(s.options))
+            for s in state['sections'])
+        for name, value in state.items():
+            setattr(self, name, value)
 
-        Do this here so that, after a settings_for() call, we know
-        for sure whether the file existed at read time.
-        """
+    def _read(self, *args):
+        """Record the fact that the file exists."""
         super()._read(*args)
         self.file_exists = True
 
@@ -221,22 +301,30 @@ class EditorConfigFile(EditorConfigParser):
         if not self.file_exists:
             raise OSError(f"File {ec_filename} doesn't exist")
 
-    def settings_for(self, target_path):
+    def settings_for(self, target_path, normalized=None):
         """Return the settings for target_path, which may or may not exist.
 
         Args:
             target_path (str): Absolute path
+            normalized (str): ``normalize_target(target_path)``, if the
+                caller already has it
 
-        Raises:
-            OSError: If the EditorConfig file passed to __init__() does not exist.
+        Returns:
+            dict: the options of every matching section, merged in file
+            order.  A new dict is returned on every call.
         """
-        self.filename = target_path
-
-        # Reset before reading --- start fresh with each call.
-        self.options = OrderedDict()
-        self.root_file = False
-        self.file_exists = False
-
-        self.read(self.ec_filename)
-
-        return self.options
+        options = {}
+        if trace.active:
+            with trace.span('match', path=target_path,
+                            config=self.ec_filename,
+                            sections=len(self.globs)) as span:
+                indices = self.globs.matching(target_path, normalized)
+                span.attributes['matched'] = len(indices)
+        else:
+            indices = self.globs.matching(target_path, normalized)
+        if stats.enabled:
+            stats.count('match.attempted', len(self.globs))
+            stats.count('match.succeeded', len(indices))
+        for index in indices:
+            options.update(self.sections[index].options)
+        return options
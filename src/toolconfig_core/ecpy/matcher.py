@@ -0,0 +1,81 @@
+"""Matching the section globs of a config file against target paths
+
+Shared by EditorConfig and ToolConfig files.  Each glob is anchored to
+its config file's directory once, when the file is loaded, and all the
+globs of a file are matched together by a PatternSet.  Targets are
+normalized once per lookup with normalize_target(), not once per glob.
+
+Licensed under PSF License (see LICENSE.PSF file).
+
+"""
+
+import posixpath
+from os import sep
+from os.path import dirname, normpath
+
+from toolconfig_core.ecpy.fnmatch import PatternSet, normalize
+
+
+__all__ = ["anchor_glob", "normalize_target", "GlobSet"]
+
+
+def anchor_glob(config_path, glob):
+    """Turn a glob in a config file into a pattern for full paths.
+
+    Args:
+        config_path (str): absolute path to the config file
+        glob (str): glob
+
+    Returns:
+        str: A pattern for :func:`toolconfig_core.ecpy.fnmatch.fnmatch`
+        that matches what ``glob`` matches, anchored in the same
+        directory as ``config_path``.
+    """
+    config_dirname = normpath(dirname(config_path)).replace(sep, '/')
+    glob = glob.replace("\\#", "#")
+    glob = glob.replace("\\;", ";")
+    if '/' in glob:
+        if glob.find('/') == 0:
+            glob = glob[1:]
+        glob = posixpath.join(config_dirname, glob)
+    else:
+        glob = posixpath.join('**/', glob)
+    return glob
+
+
+def normalize_target(target_path):
+    """Normalize a target path for matching against anchored globs"""
+    return normalize(target_path)
+
+
+class GlobSet(object):
+    """All the globs in a config file, matched against a target at once.
+
+    Args:
+        config_path (str): absolute path to the config file
+        globs (iterable): the globs, in file order
+    """
+
+    def __init__(self, config_path, globs):
+        self.globs = tuple(globs)
+        self.patterns = PatternSet(anchor_glob(config_path, g)
+                                   for g in self.globs)
+
+    def __len__(self):
+        return len(self.globs)
+
+    def matching(self, target_path, normalized=None):
+        """Find the globs that match a target.
+
+        Args:
+            target_path (str): absolute path to the target file
+            normalized (str): ``normalize_target(target_path)``, if the
+                caller already has it
+
+        Returns:
+            list: The indices in ``globs`` of the globs that match
+            ``target_path``, in order.
+        """
+        if normalized is None:
+            normalized = normalize(target_path)
+        return self.patterns.fnmatchcase(normalized)
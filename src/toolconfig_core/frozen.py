@@ -0,0 +1,55 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Deeply read-only copies of settings values.
+
+Parsed config files are cached and shared by every lookup in the
+process, so the arrays and tables in their values must not be changed
+through any one result.  :func:`freeze` turns lists into tuples and dicts
+into :class:`FrozenDict`, all the way down; :func:`thaw` makes mutable
+copies again.  Both kinds of frozen value encode to the same JSON and
+TOML as what they were made from.
+"""
+
+
+class FrozenDict(dict):
+    """A read-only dict.  ``dict(frozen)`` makes a mutable copy."""
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict.__repr__(self)})"
+
+
+def freeze(value):
+    """Return ``value`` with every list and dict in it made read-only"""
+    if type(value) is list or type(value) is tuple:
+        return tuple(map(freeze, value))
+    if isinstance(value, dict) and not isinstance(value, FrozenDict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    return value
+
+
+def is_frozen(value):
+    """Return whether ``value`` is an array or table made by :func:`freeze`"""
+    return type(value) is tuple or isinstance(value, FrozenDict)
+
+
+def thaw(value):
+    """Return a mutable copy of a :func:`freeze` result, or ``value`` itself
+    if it has no arrays or tables"""
+    if type(value) is tuple:
+        return [thaw(item) for item in value]
+    if isinstance(value, FrozenDict):
+        return {key: thaw(item) for key, item in value.items()}
+    return value
@@ -5,14 +5,17 @@
 """
 Glob-related routines.
 
+The matching itself lives in :mod:`toolconfig_core.ecpy.matcher`, which
+is shared with the EditorConfig parser.
+
 Modified from editorconfig-core-py.
 """
 
-import posixpath
-from os import sep
-from os.path import dirname, normpath
-
+from toolconfig_core import stats
 from toolconfig_core.ecpy.fnmatch import fnmatch
+from toolconfig_core.ecpy.matcher import GlobSet, anchor_glob, normalize_target
+
+__all__ = ["GlobSet", "anchor_glob", "matches_filename", "normalize_target"]
 
 
 def matches_filename(config_path, glob, target_path):
@@ -28,13 +31,8 @@ def matches_filename(config_path, glob, target_path):
         directory as ``config_path``.
 
     """
-    config_dirname = normpath(dirname(config_path)).replace(sep, "/")
-    glob = glob.replace("\\#", "#")
-    glob = glob.replace("\\;", ";")
-    if "/" in glob:
-        if glob.find("/") == 0:
-            glob = glob[1:]
-        glob = posixpath.join(config_dirname, glob)
-    else:
-        glob = posixpath.join("**/", glob)
-    return fnmatch(target_path, glob)
+    matched = fnmatch(target_path, anchor_glob(config_path, glob))
+    if stats.enabled:
+        stats.count("match.attempted")
+        stats.count("match.succeeded", matched)
+    return matched
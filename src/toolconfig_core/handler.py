@@ -8,10 +8,12 @@ Licensed under Simplified BSD License (see LICENSE file).
 """
 
 import os
+from sys import intern
 
-from toolconfig_core import EC_CONFIG_NAME
-from toolconfig_core.config_file import ConfigFile, dirs_for, find_root_dir
+from toolconfig_core import EC_CONFIG_NAME, trace
+from toolconfig_core.config_file import config_chain
 from toolconfig_core.exceptions import PathError
+from toolconfig_core.glob import normalize_target
 
 
 class ToolConfigHandler(object):
@@ -22,16 +24,35 @@ class ToolConfigHandler(object):
     ``get_options`` which returns the ToolConfig options for
     the ``abs_path`` specified to the constructor.
 
+    Config files are found by a single upward walk from ``abs_path``,
+    done on first use of ``get_options``, ``chain`` or ``root_dir``.
+    The walk's results are reused by all three.
+
     """
 
+    __slots__ = ("abs_path", "ec_name", "_chain")
+
     def __init__(self, abs_path, ec_name=EC_CONFIG_NAME):
         """Create ToolConfigHandler for matching given abs_path"""
         if not os.path.isabs(abs_path):
             raise PathError("Input file must be a full path name.")
 
         self.abs_path = abs_path
-        self.root_dir = find_root_dir(abs_path)
         self.ec_name = ec_name
+        self._chain = None
+
+    @property
+    def chain(self):
+        """The ``ConfigFile`` of each directory from ``abs_path``'s up to
+        the project root, nearest first"""
+        if self._chain is None:
+            self._chain = config_chain(self.abs_path, self.ec_name)
+        return self._chain
+
+    @property
+    def root_dir(self):
+        """The project root directory"""
+        return self.chain[-1].dir_name
 
     def get_options(self):
         """
@@ -44,19 +65,30 @@ class ToolConfigHandler(object):
 
         """
 
+        return self.options_from(self.chain, self.abs_path)
+
+    @classmethod
+    def options_from(cls, chain, abs_path):
+        """Return the options for ``abs_path`` given by the config files
+        in ``chain``, as returned by
+        :func:`toolconfig_core.config_file.config_chain`."""
+        if trace.active:
+            with trace.span("merge", path=abs_path, configs=len(chain)) as span:
+                result = cls._merge(chain, abs_path)
+                span.attributes["options"] = len(result)
+            return result
+        return cls._merge(chain, abs_path)
+
+    @classmethod
+    def _merge(cls, chain, abs_path):
         result = {}
+        normalized = normalize_target(abs_path)
 
-        # Attempt to find and parse every config file up to the root
-        for d in dirs_for(self.abs_path):
-            parser = ConfigFile(d, self.ec_name)
-            options = parser.settings_for(self.abs_path)
-            result.update(options)
-
-            # Stop parsing if parsed file has a ``root = true`` option
-            if parser.is_root:
-                break
+        # Apply every config file up to the root
+        for config in chain:
+            result.update(config.settings_for(abs_path, normalized))
 
-        self.preprocess_values(result)
+        cls.preprocess_values(result)
 
         return result
 
@@ -69,7 +101,8 @@ class ToolConfigHandler(object):
     def preprocess_values(opts):
         """Preprocess option values for consumption by plugins"""
 
-        # Lowercase option value for certain options
+        # Lowercase option value for certain options.  Interning keeps the
+        # parsed files' shared copy rather than a new string per result.
         for name in [
             "end_of_line",
             "indent_style",
@@ -79,7 +112,7 @@ class ToolConfigHandler(object):
             "charset",
         ]:
             if name in opts:
-                opts[name] = opts[name].lower()
+                opts[name] = intern(opts[name].lower())
 
         # Set indent_size to "tab" if indent_size is unspecified and
         # indent_style is set to "tab".
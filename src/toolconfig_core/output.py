@@ -0,0 +1,293 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Write results in the CLI's output formats.
+
+Each :class:`Writer` writes one ``(path, settings)`` record at a time, so
+results can be written as they are produced rather than collected into
+one document first.  Many paths usually share the same settings, so the
+encoding of a settings dict is remembered and reused both for the same
+dict object and for equal dicts of simple values.
+
+Formats:
+
+``toml``
+    One table per path, the same as ``tomli_w.dumps()`` of all results
+``json``
+    One object mapping each path to its settings
+``ndjson``
+    One ``{"path": ..., "settings": {...}}`` object per line
+``tsv``
+    One ``path<TAB>key<TAB>value`` line per setting.  Values are written
+    as JSON, so the string ``"4"`` and the number ``4`` differ.  In paths
+    and keys, tabs, newlines and backslashes are escaped as ``\\t``,
+    ``\\n`` and ``\\\\``.
+``grouped``
+    JSON with each distinct settings written once, as a
+    :class:`~toolconfig_core.settings_classes.SettingsClass`:
+    ``{"paths": {path: class ID}, "classes": {class ID: settings}}``
+``grouped-by-class``
+    JSON listing the paths of each class:
+    ``{"classes": {class ID: {"settings": settings, "paths": [path]}}}``
+"""
+
+import abc
+import json
+import re
+
+#: Names of the output formats
+FORMATS = ("toml", "json", "ndjson", "tsv", "grouped", "grouped-by-class")
+
+#: Formats of independent lines, which may repeat a path.  The others are
+#: one document with each path as a key.
+LINE_FORMATS = ("ndjson", "tsv")
+
+_SCALARS = (str, int, float, bool)
+
+_json_encode = json.JSONEncoder(default=str).encode
+
+_TOML_BARE_KEY = re.compile(r"[A-Za-z0-9_-]+\Z")
+_TOML_NEEDS_ESCAPE = re.compile(r'[\x00-\x1f\x7f"\\]')
+
+
+class EncodingMemo(object):
+    """Remember the encodings of settings dicts.
+
+    An encoding is reused for the same dict object, or for an equal dict
+    whose values are all hashable (compared by type as well as value).
+    Both tables are emptied when they reach ``max_entries``, to bound
+    memory use.
+
+    Args:
+        encode (callable): Encodes a settings dict to a str
+        max_entries (int): Most encodings to remember
+    """
+
+    def __init__(self, encode, max_entries=4096):
+        self.encode = encode
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._by_id = {}  # id -> (settings, text); holds settings so ids are unique
+        self._by_content = {}
+
+    def __call__(self, settings):
+        entry = self._by_id.get(id(settings))
+        if entry is not None and entry[0] is settings:
+            self.hits += 1
+            return entry[1]
+
+        try:
+            key = (tuple(settings.items()), tuple(map(type, settings.values())))
+            text = self._by_content.get(key)
+        except TypeError:  # Unhashable value
+            key = text = None
+
+        if text is None:
+            self.misses += 1
+            text = self.encode(settings)
+            if key is not None:
+                if len(self._by_content) >= self.max_entries:
+                    self._by_content.clear()
+                self._by_content[key] = text
+        else:
+            self.hits += 1
+
+        if len(self._by_id) >= self.max_entries:
+            self._by_id.clear()
+        self._by_id[id(settings)] = (settings, text)
+        return text
+
+
+class Writer(abc.ABC):
+    """Abstract base class of writers.  Subclasses implement :meth:`write`.
+
+    Call :meth:`write` for each result, then :meth:`close`.
+
+    Args:
+        out: Text file to write to
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.count = 0
+
+    @abc.abstractmethod
+    def write(self, path, settings):
+        """Write the settings for one path"""
+
+    def write_all(self, results):
+        """Write each ``(path, settings)`` in ``results``"""
+        for path, settings in results:
+            self.write(path, settings)
+
+    def close(self):
+        """Finish the output.  Does not close ``out``."""
+
+    def flush(self):
+        self.out.flush()
+
+
+class NdjsonWriter(Writer):
+    def __init__(self, out):
+        super().__init__(out)
+        self.memo = EncodingMemo(_json_encode)
+
+    def write(self, path, settings):
+        self.out.write(
+            f'{{"path": {_json_encode(path)}, "settings": {self.memo(settings)}}}\n'
+        )
+        self.count += 1
+
+
+class JsonWriter(Writer):
+    def __init__(self, out):
+        super().__init__(out)
+        self.memo = EncodingMemo(_json_encode)
+
+    def write(self, path, settings):
+        self.out.write(
+            f'{"," if self.count else "{"}\n{_json_encode(path)}: {self.memo(settings)}'
+        )
+        self.count += 1
+
+    def close(self):
+        self.out.write("\n}\n" if self.count else "{}\n")
+
+
+def _tsv_escape(text):
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def _tsv_encode(settings):
+    """Return the key and value columns of each row, for one path.  JSON
+    never contains a raw tab or newline, so values need no escaping."""
+    return [
+        _tsv_escape(str(key)) + "\t" + _json_encode(value)
+        for key, value in settings.items()
+    ]
+
+
+class TsvWriter(Writer):
+    def __init__(self, out):
+        super().__init__(out)
+        self.memo = EncodingMemo(_tsv_encode)
+
+    def write(self, path, settings):
+        rows = self.memo(settings)
+        if rows:
+            prefix = _tsv_escape(path) + "\t"
+            self.out.write("".join(prefix + row + "\n" for row in rows))
+        self.count += 1
+
+
+class TomlWriter(Writer):
+    """Writes the same text as ``tomli_w.dumps()`` of all the results,
+    followed by a newline."""
+
+    def __init__(self, out):
+        import tomli_w  # Not needed by the other formats
+
+        super().__init__(out)
+        self.dumps = tomli_w.dumps
+        self.memo = EncodingMemo(tomli_w.dumps)
+
+    def write(self, path, settings):
+        if self.count:
+            self.out.write("\n")
+        if all(isinstance(value, _SCALARS) for value in settings.values()):
+            # The table header, then the body, which does not depend on path
+            self.out.write(self._header(path) + self.memo(settings))
+        else:
+            # Sub-tables' headers include the path
+            self.out.write(self.dumps({path: settings}))
+        self.count += 1
+
+    def close(self):
+        self.out.write("\n")
+
+    def _header(self, path):
+        if _TOML_BARE_KEY.match(path):
+            return f"[{path}]\n"
+        if not _TOML_NEEDS_ESCAPE.search(path):
+            return f'["{path}"]\n'
+        return self.dumps({path: {}})
+
+
+class GroupedWriter(Writer):
+    """Writes the ``grouped`` format, or ``grouped-by-class`` if
+    ``by_class``.
+
+    Paths are written as they come in the ``grouped`` format.  Classes,
+    and in ``grouped-by-class`` everything, are written by :meth:`close`.
+
+    Args:
+        out: Text file to write to
+        classes (SettingsClasses): The table to find classes in, e.g., the
+            one results were resolved with.  Only the classes of paths
+            written are output.
+        by_class (bool): Write each class's paths rather than each path's
+            class
+    """
+
+    def __init__(self, out, classes=None, by_class=False):
+        from toolconfig_core.settings_classes import SettingsClasses
+
+        super().__init__(out)
+        self.classes = SettingsClasses() if classes is None else classes
+        self.by_class = by_class
+        self._members = {}  # class ID -> (class, [paths])
+
+    def write(self, path, settings):
+        settings_class = self.classes.intern(settings)
+        members = self._members.get(settings_class.id)
+        if members is None:
+            members = self._members[settings_class.id] = (settings_class, [])
+        if self.by_class:
+            members[1].append(path)
+        else:
+            start = ",\n" if self.count else '{"paths": {\n'
+            self.out.write(
+                f"{start}{_json_encode(path)}: {_json_encode(settings_class.id)}"
+            )
+        self.count += 1
+
+    def close(self):
+        write = self.out.write
+        if self.by_class:
+            write('{"classes": {')
+            for i, (id, (settings_class, paths)) in enumerate(self._members.items()):
+                write(
+                    f'{"," if i else ""}\n{_json_encode(id)}:'
+                    f' {{"settings": {_json_encode(settings_class)},'
+                    f' "paths": {_json_encode(paths)}}}'
+                )
+        else:
+            write('\n},\n"classes": {' if self.count else '{"paths": {},\n"classes": {')
+            for i, (id, (settings_class, _)) in enumerate(self._members.items()):
+                write(
+                    f'{"," if i else ""}\n{_json_encode(id)}:'
+                    f" {_json_encode(settings_class)}"
+                )
+        write("\n}}\n" if self._members else "}}\n")
+
+
+_WRITERS = {
+    "toml": TomlWriter,
+    "json": JsonWriter,
+    "ndjson": NdjsonWriter,
+    "tsv": TsvWriter,
+}
+
+
+def make_writer(format, out, classes=None):
+    """Return a :class:`Writer` for ``format``, one of :data:`FORMATS`.
+
+    ``classes`` is passed to :class:`GroupedWriter` for the grouped formats.
+    """
+    if format == "grouped":
+        return GroupedWriter(out, classes)
+    if format == "grouped-by-class":
+        return GroupedWriter(out, classes, by_class=True)
+    return _WRITERS[format](out)
@@ -0,0 +1,139 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Resolve options for many files using a pool of processes.
+
+Matching targets against globs is CPU-bound, so one process can only use
+one core.  The functions here split the work into shards by directory
+and hand them to a :class:`concurrent.futures.ProcessPoolExecutor`.
+Config files already parsed in this process are sent to the workers with
+the shards, rather than being parsed again.  Results are merged in sorted
+order of path, so the output does not depend on the number of jobs.
+
+Use these through the ``jobs`` argument of
+:func:`toolconfig_core.resolve.resolve_many` and
+:func:`toolconfig_core.resolve.resolve_tree`.
+"""
+
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from toolconfig_core.handler import ToolConfigHandler
+from toolconfig_core.resolve import DirectoryTrie, resolve_dir
+
+#: Shards to make per job.  More shards even out the load; fewer cost
+#: less in overhead.
+SHARDS_PER_JOB = 4
+
+
+def job_count(jobs):
+    """Return the number of processes to use for ``jobs``, which may be
+    ``None`` or 0 for one per CPU."""
+    if not jobs:
+        return os.cpu_count() or 1
+    return max(1, jobs)
+
+
+def _sorted(results):
+    return {k: results[k] for k in sorted(results.keys())}
+
+
+def _balance(groups, count):
+    """Split ``groups``, a list of ``(weight, item)``, into at most
+    ``count`` lists of items of about equal total weight."""
+    shards = [(0, i, []) for i in range(min(count, len(groups)))]
+    for weight, item in sorted(groups, key=lambda g: -g[0]):
+        total, i, items = heapq.heappop(shards)
+        items.append(item)
+        heapq.heappush(shards, (total + weight, i, items))
+    return [items for _, _, items in sorted(shards, key=lambda s: s[1])]
+
+
+def _resolve_chains(shard):
+    """Worker: ``shard`` is a list of ``(chain, paths)``"""
+    return [
+        (path, ToolConfigHandler.options_from(chain, path))
+        for chain, paths in shard
+        for path in paths
+    ]
+
+
+def _resolve_subtrees(shard, ec_name):
+    """Worker: ``shard`` is a list of ``(dir_name, parent_chain)``"""
+    trie = DirectoryTrie(ec_name)
+    results = {}
+    for dir_name, parent_chain in shard:
+        trie.add(os.path.dirname(dir_name), parent_chain)
+        pending = [dir_name]
+        while pending:
+            pending.extend(resolve_dir(pending.pop(), trie, results))
+    return list(results.items())
+
+
+def _run(worker, shards, jobs, *args):
+    results = {}
+    with ProcessPoolExecutor(max_workers=min(jobs, len(shards))) as executor:
+        futures = [executor.submit(worker, shard, *args) for shard in shards]
+        for future in futures:
+            results.update(future.result())
+    return results
+
+
+def resolve_groups(by_dir, trie, jobs):
+    """Get the options for paths grouped by directory.
+
+    The chain of each directory is loaded in this process, then the
+    matching is shared out.
+
+    Args:
+        by_dir (dict): Absolute paths, keyed by their directory
+        trie (DirectoryTrie): Chains to use and extend
+        jobs (int): Number of processes, or ``None`` for one per CPU
+
+    Returns:
+        dict: Options for each path, in sorted order of path.
+    """
+    jobs = job_count(jobs)
+    groups = [
+        (len(paths), (trie.chain(dir_name), paths))
+        for dir_name, paths in sorted(by_dir.items())
+    ]
+    if jobs == 1 or len(groups) < 2:
+        return _sorted(dict(_resolve_chains([group for _, group in groups])))
+
+    shards = _balance(groups, jobs * SHARDS_PER_JOB)
+    return _sorted(_run(_resolve_chains, shards, jobs))
+
+
+def resolve_tree(top, ec_name, trie, jobs):
+    """Get the options for every file below ``top``.
+
+    The top of the tree is walked breadth-first in this process until
+    there are enough subdirectories to share out.  Each worker then walks
+    some of those subtrees, starting from the chains of their parents.
+
+    Args:
+        top (str): Absolute path of the directory to walk
+        ec_name (str): The name of EditorConfig files
+        trie (DirectoryTrie): Chains to use and extend
+        jobs (int): Number of processes, or ``None`` for one per CPU
+
+    Returns:
+        dict: Options for each file, in sorted order of path.
+    """
+    jobs = job_count(jobs)
+    top = os.path.normpath(top)
+    results = {}
+    frontier = resolve_dir(top, trie, results, top)
+    while frontier and (jobs == 1 or len(frontier) < jobs * SHARDS_PER_JOB):
+        frontier = [
+            subdir for d in sorted(frontier) for subdir in resolve_dir(d, trie, results)
+        ]
+
+    if frontier:
+        subtrees = [(1, (d, trie.chain(os.path.dirname(d)))) for d in sorted(frontier)]
+        shards = _balance(subtrees, jobs * SHARDS_PER_JOB)
+        results.update(_run(_resolve_subtrees, shards, jobs, ec_name))
+    return _sorted(results)
@@ -0,0 +1,259 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Resolve the options for many files at once.
+
+Files in the same project share most of their config files.  Rather
+than walking up from each file separately, as :class:`ToolConfigHandler`
+does, :func:`resolve_many` groups the files by directory and builds each
+directory's config chain from its parent's, so each ancestor directory
+is visited once per batch.  :func:`resolve_tree` does the same for every
+file below a directory, walking down from it.
+
+Both can also hash-cons their results into shared
+:class:`~toolconfig_core.settings_classes.SettingsClass` objects, so a
+large result set holds one dict per distinct settings.
+"""
+
+import os
+
+from toolconfig_core import EC_CONFIG_NAME, trace
+from toolconfig_core.config_file import ConfigFile
+from toolconfig_core.exceptions import PathError
+from toolconfig_core.handler import ToolConfigHandler
+
+
+class DirectoryTrie(object):
+    """The config chains of a set of directories.
+
+    Each directory is a node holding its chain: its own :class:`ConfigFile`
+    followed by its parent node's chain, up to the project root.
+    A directory's config file is therefore loaded at most once, no matter
+    how many descendants are looked up.
+
+    Args:
+        ec_name (str): The name of EditorConfig files
+    """
+
+    def __init__(self, ec_name=EC_CONFIG_NAME):
+        self.ec_name = ec_name
+        self._chains = {}
+
+    def __len__(self):
+        return len(self._chains)
+
+    def __contains__(self, dir_name):
+        return dir_name in self._chains
+
+    def add(self, dir_name, chain):
+        """Record ``chain`` as the chain for ``dir_name``, e.g., one
+        computed by another process."""
+        self._chains[dir_name] = chain
+
+    def chain(self, dir_name):
+        """Return the chain for ``dir_name``.
+
+        Returns:
+            tuple: A :class:`ConfigFile` for each directory from
+            ``dir_name`` up to the project root, nearest first.  This is
+            the same list :func:`toolconfig_core.config_file.config_chain`
+            returns for a file in ``dir_name``.
+        """
+        chain = self._chains.get(dir_name)
+        if chain is not None:
+            return chain
+        if trace.active:
+            with trace.span("walk", path=dir_name) as span:
+                chain = self._walk(dir_name)
+                span.attributes["configs"] = len(chain)
+            return chain
+        return self._walk(dir_name)
+
+    def _walk(self, dir_name):
+        # Walk up until we reach the root or a directory we already know
+        pending = []
+        chain = ()
+        d = dir_name
+        while True:
+            config = ConfigFile(d, self.ec_name)
+            pending.append((d, config))
+            parent = os.path.dirname(d)
+            if config.is_root or parent == d:
+                break
+            if parent in self._chains:
+                chain = self._chains[parent]
+                break
+            d = parent
+
+        # Add nodes for the new directories, top down
+        for d, config in reversed(pending):
+            chain = (config,) + chain
+            self._chains[d] = chain
+        return chain
+
+    def add_child(self, dir_name, names=None):
+        """Return the chain for ``dir_name``, whose parent directory's chain
+        is already known.
+
+        Only ``dir_name``'s own config file is loaded.
+
+        Args:
+            dir_name (str): The directory
+            names (set): As for :class:`ConfigFile`
+        """
+        chain = self._chains.get(dir_name)
+        if chain is not None:
+            return chain
+        if trace.active:
+            with trace.span("walk", path=dir_name) as span:
+                chain = self._add_child(dir_name, names)
+                span.attributes["configs"] = len(chain)
+            return chain
+        return self._add_child(dir_name, names)
+
+    def _add_child(self, dir_name, names):
+        config = ConfigFile(dir_name, self.ec_name, names)
+        if config.is_root:
+            chain = (config,)
+        else:
+            chain = (config,) + self._chains[os.path.dirname(dir_name)]
+        self._chains[dir_name] = chain
+        return chain
+
+
+def resolve_many(paths, ec_name=EC_CONFIG_NAME, trie=None, jobs=1, classes=None):
+    """Get the options for each of ``paths``.
+
+    The result for each path is the same as
+    ``ToolConfigHandler(path, ec_name).get_options()``.
+
+    Args:
+        paths (iterable): Absolute paths of the files of interest
+        ec_name (str): The name of EditorConfig files
+        trie (DirectoryTrie): Chains to reuse, e.g., from an earlier batch.
+            Must have the same ``ec_name``.
+        jobs (int): Number of processes to use, or ``None`` for one per
+            CPU.  See :mod:`toolconfig_core.parallel`.
+        classes (SettingsClasses): If given, each path's options are the
+            :class:`~toolconfig_core.settings_classes.SettingsClass`
+            from this table that is equal to them.
+
+    Returns:
+        dict: Options for each path, in sorted order of path.
+
+    Raises:
+        toolconfig_core.exceptions.PathError: if any path is not absolute
+        toolconfig_core.exceptions.ParsingError: if a config file is invalid
+    """
+    if trie is None:
+        trie = DirectoryTrie(ec_name)
+
+    by_dir = {}
+    for path in paths:
+        if not os.path.isabs(path):
+            raise PathError("Input file must be a full path name.")
+        by_dir.setdefault(os.path.dirname(path), []).append(path)
+
+    if jobs != 1:
+        from toolconfig_core import parallel
+
+        results = parallel.resolve_groups(by_dir, trie, jobs)
+        return results if classes is None else classes.intern_all(results)
+
+    results = {}
+    for dir_name, targets in by_dir.items():
+        chain = trie.chain(dir_name)
+        for path in targets:
+            options = ToolConfigHandler.options_from(chain, path)
+            results[path] = options if classes is None else classes.intern(options)
+
+    return {k: results[k] for k in sorted(results.keys())}
+
+
+def resolve_tree(top, ec_name=EC_CONFIG_NAME, trie=None, jobs=1, classes=None):
+    """Get the options for every file below ``top``.
+
+    The tree is walked top down.  Each directory's chain is its parent's
+    plus its own config file, and the config files present are known from
+    the directory listing, so each config file is loaded once and missing
+    ones are never looked for.  Symbolic links to directories are not
+    followed, and unreadable subdirectories are skipped.
+
+    The result for each file is the same as
+    ``ToolConfigHandler(path, ec_name).get_options()``.
+
+    Args:
+        top (str): Absolute path of the directory to walk
+        ec_name (str): The name of EditorConfig files
+        trie (DirectoryTrie): As for :func:`resolve_many`
+        jobs (int): As for :func:`resolve_many`
+        classes (SettingsClasses): As for :func:`resolve_many`
+
+    Returns:
+        dict: Options for each file, in sorted order of path.
+
+    Raises:
+        toolconfig_core.exceptions.PathError: if ``top`` is not absolute
+        toolconfig_core.exceptions.ParsingError: if a config file is invalid
+        OSError: if ``top`` cannot be read
+    """
+    if not os.path.isabs(top):
+        raise PathError("Input directory must be a full path name.")
+    if trie is None:
+        trie = DirectoryTrie(ec_name)
+    if jobs != 1:
+        from toolconfig_core import parallel
+
+        results = parallel.resolve_tree(top, ec_name, trie, jobs)
+        return results if classes is None else classes.intern_all(results)
+
+    top = os.path.normpath(top)
+    results = {}
+    pending = [top]
+    while pending:
+        pending.extend(resolve_dir(pending.pop(), trie, results, top, classes))
+
+    return {k: results[k] for k in sorted(results.keys())}
+
+
+def resolve_dir(dir_name, trie, results, top=None, classes=None):
+    """Get the options for the files in one directory.
+
+    This is one step of :func:`resolve_tree`.  The chain of the parent of
+    ``dir_name`` must be in ``trie`` unless ``dir_name`` is ``top``.
+
+    Args:
+        dir_name (str): Absolute, normalized path of the directory
+        trie (DirectoryTrie): Chains known so far
+        results (dict): Updated with the options of each file
+        top (str): The directory the walk started from.  Errors reading it
+            are raised; errors reading others are ignored.
+        classes (SettingsClasses): As for :func:`resolve_many`
+
+    Returns:
+        list: The paths of the subdirectories of ``dir_name`` to visit
+    """
+    try:
+        with os.scandir(dir_name) as it:
+            entries = list(it)
+    except OSError:
+        if dir_name == top:
+            raise
+        return []
+
+    if os.path.dirname(dir_name) in trie:
+        chain = trie.add_child(dir_name, {entry.name for entry in entries})
+    else:
+        chain = trie.chain(dir_name)
+
+    subdirs = []
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry.path)
+        elif not entry.is_dir():
+            options = ToolConfigHandler.options_from(chain, entry.path)
+            if classes is not None:
+                options = classes.intern(options)
+            results[entry.path] = options
+    return subdirs
@@ -0,0 +1,281 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Long-running resolver daemon and its client.
+
+``toolconfig serve`` keeps one process, and therefore the parsed-config
+cache, warm, and answers requests on a Unix domain socket.
+``toolconfig --connect`` sends its paths to that process, and falls back
+to resolving them itself if no daemon is listening.
+
+Each message, in both directions, is a 4-byte big-endian length followed
+by that many bytes of UTF-8 JSON.  A request is::
+
+    {"paths": ["/abs/path", ...], "ec_name": ".editorconfig"}
+
+(``ec_name`` is optional).  The response is either
+``{"results": {path: options, ...}}``, in sorted order of path, or
+``{"error": {"type": "PathError", "message": "..."}}``.  Errors parsing
+config files, including EditorConfig files and their globs, have type
+``ParsingError``.  A client may send any number of requests on one
+connection.
+"""
+
+import configparser
+import json
+import os
+import re
+import signal
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import tempfile
+import threading
+
+from toolconfig_core import EC_CONFIG_NAME
+from toolconfig_core.exceptions import ParsingError, PathError, ToolConfigError
+from toolconfig_core.resolve import resolve_many
+
+#: Environment variable that overrides the default socket path
+SOCKET_ENV = "TOOLCONFIG_SOCKET"
+
+#: Largest message either side will accept
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+_HEADER = struct.Struct(">I")
+
+_ERRORS = {"PathError": PathError, "ParsingError": ParsingError}
+
+
+def default_socket_path():
+    """Return the default socket path.
+
+    This is ``$TOOLCONFIG_SOCKET`` if set, otherwise ``toolconfig.sock``
+    in ``$XDG_RUNTIME_DIR``, otherwise ``toolconfig.sock`` in a private
+    per-user directory in the temp directory.
+
+    Raises:
+        OSError: if the private directory cannot be created, or exists but
+            is not a directory that only the user can access.  Otherwise
+            another user could listen on the socket first.
+    """
+    if os.environ.get(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "toolconfig.sock")
+    return os.path.join(_private_dir(), "toolconfig.sock")
+
+
+def _private_dir():
+    """Return ``toolconfig-UID`` in the temp directory, making it if need be"""
+    path = os.path.join(tempfile.gettempdir(), f"toolconfig-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)  # Not stat(): a symlink could point anywhere
+    if (
+        not stat.S_ISDIR(st.st_mode)
+        or st.st_uid != os.getuid()
+        or st.st_mode & (stat.S_IRWXG | stat.S_IRWXO)
+    ):
+        raise OSError(f"{path} must be a directory that only you can access")
+    return path
+
+
+def _recv_exactly(sock, size):
+    """Read ``size`` bytes, or return None on a clean EOF before any data"""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1024 * 1024))
+        if not chunk:
+            if remaining == size:
+                return None
+            raise ConnectionError("Connection closed mid-message")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_message(sock, obj):
+    """Send ``obj`` as a length-prefixed JSON message"""
+    data = json.dumps(obj, default=str).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def recv_message(sock):
+    """Receive a length-prefixed JSON message.
+
+    Returns:
+        The decoded message, or None if the peer closed the connection.
+    """
+    header = _recv_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > MAX_MESSAGE_SIZE:
+        raise ConnectionError(f"Message of {size} bytes is too large")
+    data = _recv_exactly(sock, size)
+    if data is None:
+        raise ConnectionError("Connection closed mid-message")
+    return json.loads(data.decode("utf-8"))
+
+
+def handle_request(request):
+    """Answer one decoded request.
+
+    Returns:
+        dict: The response to send
+    """
+    try:
+        if not isinstance(request, dict) or not isinstance(request.get("paths"), list):
+            raise ToolConfigError("Request must be an object with a 'paths' list")
+        ec_name = request.get("ec_name") or EC_CONFIG_NAME
+        return {"results": resolve_many(request["paths"], ec_name)}
+    except Exception as e:  # Report every error rather than drop the connection
+        if isinstance(e, (configparser.Error, re.error)):
+            # E.g., a malformed .editorconfig or a bad section glob
+            error_type = "ParsingError"
+        else:
+            error_type = type(e).__name__
+        return {"error": {"type": error_type, "message": str(e)}}
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                request = recv_message(self.request)
+            except (ConnectionError, ValueError):
+                return
+            if request is None:
+                return
+            send_message(self.request, handle_request(request))
+
+
+class ResolverServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Answer resolution requests on a Unix socket, one thread per client.
+
+    All clients share the process-wide
+    :data:`toolconfig_core.cache.config_cache`.
+
+    Args:
+        socket_path (str): Where to listen.  A stale socket file left by a
+            dead server is replaced.
+
+    Raises:
+        OSError: if another server is already listening on ``socket_path``
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        if os.path.exists(socket_path):
+            if _is_listening(socket_path):
+                raise OSError(f"A server is already listening on {socket_path}")
+            os.unlink(socket_path)
+        super().__init__(socket_path, _RequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def _is_listening(socket_path):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+
+
+def serve(socket_path=None):
+    """Run a :class:`ResolverServer` until interrupted or terminated.
+
+    The socket file is removed on exit.
+    """
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with ResolverServer(socket_path or default_socket_path()) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+class Client(object):
+    """A connection to a :class:`ResolverServer`.
+
+    Args:
+        socket_path (str): The server's socket.  Default
+            :func:`default_socket_path`.
+        timeout (float): Seconds to wait for the server
+
+    Raises:
+        OSError: if no server is listening
+    """
+
+    def __init__(self, socket_path=None, timeout=30.0):
+        self.socket_path = socket_path or default_socket_path()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(self.socket_path)
+        except OSError:
+            self.sock.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.sock.close()
+
+    def resolve_many(self, paths, ec_name=EC_CONFIG_NAME):
+        """Ask the server for the options of each of ``paths``.
+
+        Returns:
+            dict: As :func:`toolconfig_core.resolve.resolve_many`, except
+            that values TOML can express but JSON cannot, such as dates,
+            are strings.
+
+        Raises:
+            OSError: if the connection fails
+            toolconfig_core.exceptions.ToolConfigError: if the server
+                reports an error
+        """
+        send_message(self.sock, {"paths": [str(p) for p in paths], "ec_name": ec_name})
+        response = recv_message(self.sock)
+        if response is None:
+            raise ConnectionError("Server closed the connection")
+        if "error" in response:
+            error = response["error"]
+            raise _ERRORS.get(error.get("type"), ToolConfigError)(error.get("message"))
+        return response["results"]
+
+
+def resolve_many_via_server(paths, ec_name=EC_CONFIG_NAME, socket_path=None):
+    """Resolve ``paths`` using a running server if there is one.
+
+    Falls back to :func:`toolconfig_core.resolve.resolve_many` in this
+    process if no server is listening.
+    """
+    paths = list(paths)
+    try:
+        client = Client(socket_path)
+    except (OSError, AttributeError):  # AttributeError: no AF_UNIX
+        return resolve_many(paths, ec_name)
+    with client:
+        return client.resolve_many(paths, ec_name)
@@ -0,0 +1,130 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Share identical results as read-only settings classes.
+
+However many files a project has, they usually fall into a few dozen
+groups with the same settings.  :class:`SettingsClasses` hash-conses
+results: the first result with given settings becomes a
+:class:`SettingsClass`, and every equal result after it is replaced by
+that same object.  Results then take memory, and output that groups
+paths by class takes space, in proportion to the number of distinct
+settings rather than the number of files.
+
+Each class has an ID that is a hash of its settings, so the same
+settings have the same ID in every run and every process.
+"""
+
+import hashlib
+import json
+import threading
+
+from toolconfig_core.frozen import FrozenDict, freeze
+
+#: Number of hex digits of a :class:`SettingsClass` ID
+ID_LENGTH = 12
+
+
+class SettingsClass(FrozenDict):
+    """The settings shared by a group of paths: a read-only dict.
+
+    Arrays and tables in its values are read-only too: tuples and
+    :class:`~toolconfig_core.frozen.FrozenDict`.  Use
+    :func:`toolconfig_core.frozen.thaw` for a mutable copy.
+
+    Attributes:
+        id (str): Identifies the settings.  See :class:`SettingsClasses`.
+    """
+
+    __slots__ = ("id",)
+
+    def __init__(self, settings, id):
+        dict.__init__(self, {key: freeze(value) for key, value in settings.items()})
+        self.id = id
+
+    def __reduce__(self):
+        return (SettingsClass, (dict(self), self.id))
+
+    def __repr__(self):
+        return f"SettingsClass({dict.__repr__(self)}, {self.id!r})"
+
+
+def _typed(value):
+    """Encode a value JSON cannot, keeping its type"""
+    return {type(value).__name__: str(value)}
+
+
+def canonical(settings):
+    """Return a string that is the same for equal settings, whatever
+    their order, and different for values of different types"""
+    return json.dumps(settings, sort_keys=True, separators=(",", ":"), default=_typed)
+
+
+class SettingsClasses(object):
+    """A table of :class:`SettingsClass`, for hash-consing results.
+
+    Settings are equal if they have the same keys and equal values of the
+    same types, in any order.  A class keeps the key order of the first
+    settings it was made from.
+
+    An ID is the first :data:`ID_LENGTH` hex digits of the SHA-1 of the
+    :func:`canonical` settings.  In the unlikely event that two classes
+    of one table collide, the second gets a longer ID.
+
+    Safe to use from several threads.
+    """
+
+    def __init__(self):
+        self._by_key = {}
+        self._by_id = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        """Iterate over the classes in the order they were made"""
+        return iter(list(self._by_id.values()))
+
+    def __getitem__(self, id):
+        return self._by_id[id]
+
+    def intern(self, settings):
+        """Return the :class:`SettingsClass` equal to ``settings``, making
+        it if there is none yet"""
+        if type(settings) is SettingsClass and self._by_id.get(settings.id) is settings:
+            return settings
+
+        values = settings.values()
+        types = tuple(map(type, values))
+        try:
+            if tuple in types:  # Frozen array; must match the same list
+                raise TypeError
+            key = frozenset(zip(settings, values, types))
+        except TypeError:  # Unhashable value, e.g., a list
+            key = canonical(settings)
+
+        found = self._by_key.get(key)
+        if found is not None:
+            return found
+
+        text = canonical(settings) if type(key) is frozenset else key
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            found = self._by_key.get(key)
+            if found is not None:
+                return found
+            length = ID_LENGTH
+            while digest[:length] in self._by_id:
+                length += 1
+            found = SettingsClass(settings, digest[:length])
+            self._by_id[found.id] = found
+            self._by_key[key] = found
+        return found
+
+    def intern_all(self, results):
+        """Return ``results``, a dict of settings by path, with each
+        settings replaced by its :class:`SettingsClass`"""
+        intern = self.intern
+        return {path: intern(settings) for path, settings in results.items()}
@@ -0,0 +1,146 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Counters and timers for the resolver's hot paths.
+
+Collection is off by default.  Instrumented code checks :data:`enabled`
+before counting, so the cost while it is off is one attribute lookup::
+
+    if stats.enabled:
+        stats.count("config_file.created")
+
+and times a block with :func:`timer`, which returns a shared do-nothing
+context manager while collection is off::
+
+    with stats.timer("tc.parse"):
+        ...
+
+Call :func:`enable`, do the work, then read the results with
+:func:`snapshot`, or print them with :func:`report`.  ``toolconfig
+--stats`` does this for one run.  Only the current process is counted,
+so work done by ``--jobs`` worker processes is not included.
+
+Counters:
+
+``config_file.created``
+    :class:`~toolconfig_core.config_file.ConfigFile` instances built
+``files.opened``
+    Config files opened for parsing
+``tc.parsed``, ``ec.parsed``
+    ToolConfig and EditorConfig files parsed
+``fnmatch.cache_hits``, ``fnmatch.cache_misses``
+    ``cached_translate()`` lookups
+``fnmatch.compiles``
+    Regular expressions compiled from globs, including the combined
+    regex of each ``PatternSet``
+``match.attempted``, ``match.succeeded``
+    Sections whose globs were tested against a path, and that matched
+
+Timers: ``tc.parse``, ``ec.parse`` and ``fnmatch.compile``.
+"""
+
+import threading
+import time
+from contextlib import nullcontext
+
+#: Whether counts and times are being collected.  Use :func:`enable` and
+#: :func:`disable` to change it.
+enabled = False
+
+_lock = threading.Lock()
+_counters = {}
+_timers = {}  # name -> [calls, seconds]
+_NULL_TIMER = nullcontext()
+
+
+def enable():
+    """Start collecting.  Counts so far are kept; see :func:`reset`."""
+    global enabled
+    enabled = True
+
+
+def disable():
+    """Stop collecting.  Counts so far are kept."""
+    global enabled
+    enabled = False
+
+
+def reset():
+    """Forget all counts and times"""
+    with _lock:
+        _counters.clear()
+        _timers.clear()
+
+
+def count(name, n=1):
+    """Add ``n`` to the counter ``name``.  Counts even if collection is
+    off, so callers check :data:`enabled` first."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def add_time(name, seconds):
+    """Add one call taking ``seconds`` to the timer ``name``"""
+    with _lock:
+        entry = _timers.get(name)
+        if entry is None:
+            _timers[name] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+
+class _Timer(object):
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        add_time(self.name, time.perf_counter() - self.start)
+
+
+def timer(name):
+    """Return a context manager that adds the time its block takes to the
+    timer ``name``, or that does nothing if collection is off"""
+    return _Timer(name) if enabled else _NULL_TIMER
+
+
+def snapshot():
+    """Return the counts and times collected so far.
+
+    Returns:
+        dict: ``{"counters": {name: count}, "timers": {name: {"calls":
+        calls, "seconds": seconds}}}``, with names in sorted order
+    """
+    with _lock:
+        return {
+            "counters": {name: _counters[name] for name in sorted(_counters)},
+            "timers": {
+                name: {"calls": _timers[name][0], "seconds": _timers[name][1]}
+                for name in sorted(_timers)
+            },
+        }
+
+
+def report(data=None):
+    """Return a human-readable summary of ``data``, a :func:`snapshot`
+    (by default, the current one)"""
+    if data is None:
+        data = snapshot()
+    names = list(data["counters"]) + list(data["timers"])
+    width = max((len(name) for name in names), default=0)
+    lines = ["toolconfig stats:"]
+    for name, value in data["counters"].items():
+        lines.append(f"  {name:<{width}}  {value:10d}")
+    for name, entry in data["timers"].items():
+        lines.append(
+            f"  {name:<{width}}  {entry['seconds'] * 1e3:10.3f} ms"
+            f" in {entry['calls']} calls"
+        )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,95 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Resolve a stream of paths, e.g., ``git ls-files -z | toolconfig -0 --stdin``.
+
+Paths are read and resolved a batch at a time, and results are produced
+in the order the paths arrive, so memory use does not grow with the
+number of paths and consumers can start before the input ends.
+"""
+
+import os
+
+from toolconfig_core import EC_CONFIG_NAME
+from toolconfig_core.handler import ToolConfigHandler
+from toolconfig_core.resolve import DirectoryTrie
+
+#: Most bytes of input to read at once
+CHUNK_SIZE = 64 * 1024
+
+
+def read_paths(stream, separator=b"\n", chunk_size=CHUNK_SIZE):
+    """Yield lists of the paths in ``stream``.
+
+    Each list holds the complete paths that one read returned.  Reads
+    return whatever input is available rather than waiting for a full
+    chunk, so a caller that flushes its output after each list never
+    holds output back while waiting for input.
+
+    Args:
+        stream: Binary file to read
+        separator (bytes): What ends each path, e.g., ``b"\\0"``.  With
+            ``b"\\n"``, a ``"\\r"`` before it is removed too, for CRLF
+            input.
+        chunk_size (int): Most bytes to read at once
+
+    Yields:
+        list: Paths, as str.  Empty paths are skipped.
+    """
+    read = getattr(stream, "read1", None) or stream.read
+    crlf = separator == b"\n"
+    pending = b""
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        parts = (pending + chunk).split(separator)
+        pending = parts.pop()
+        if crlf:
+            parts = [part[:-1] if part.endswith(b"\r") else part for part in parts]
+        batch = [os.fsdecode(part) for part in parts if part]
+        if batch:
+            yield batch
+    if crlf and pending.endswith(b"\r"):
+        pending = pending[:-1]
+    if pending:
+        yield [os.fsdecode(pending)]
+
+
+def resolve_batches(batches, ec_name=EC_CONFIG_NAME, trie=None, unique=False):
+    """Resolve each batch of paths from :func:`read_paths`.
+
+    Relative paths are taken relative to the current directory.  Config
+    chains are shared across batches.
+
+    Args:
+        batches (iterable): Lists of paths
+        ec_name (str): The name of EditorConfig files
+        trie (DirectoryTrie): As for
+            :func:`toolconfig_core.resolve.resolve_many`
+        unique (bool): Skip paths already given, e.g., for an output
+            format that is one document keyed by path.  Remembers every
+            path, so memory use grows with the input.
+
+    Yields:
+        list: ``(path, options)`` for each path in the batch, in input
+        order.  ``path`` is as given.
+
+    Raises:
+        toolconfig_core.exceptions.ParsingError: if a config file is invalid
+    """
+    if trie is None:
+        trie = DirectoryTrie(ec_name)
+    seen = set() if unique else None
+    for batch in batches:
+        results = []
+        for path in batch:
+            if seen is not None:
+                if path in seen:
+                    continue
+                seen.add(path)
+            abs_path = os.path.abspath(path)
+            chain = trie.chain(os.path.dirname(abs_path))
+            results.append((path, ToolConfigHandler.options_from(chain, abs_path)))
+        yield results
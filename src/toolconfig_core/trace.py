@@ -0,0 +1,140 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Tracing hooks for the stages of a lookup.
+
+Register a pair of callbacks with :func:`add_hook`, and each stage of
+work is reported to them as a :class:`Span`: ``start(span)`` when the
+stage begins and ``end(span)`` when it finishes, successfully or not.
+For example, to forward spans to OpenTelemetry::
+
+    def start(span):
+        span.otel = tracer.start_span(span.stage)
+
+    def end(span):
+        span.otel.set_attributes(span.attributes)
+        span.otel.end()
+
+    trace.add_hook(start, end)
+
+Stages, and the attributes of their spans:
+
+``walk``
+    Finding the config files that apply to a directory.  ``path``, and
+    ``configs``, the length of the resulting chain.  Includes loading
+    those files.
+``load_tc``, ``load_ec``
+    Parsing a ToolConfig or EditorConfig file.  ``path``, and
+    ``sections``, the number of sections.
+``translate``
+    Turning globs into a compiled regex.  ``pattern`` for a single glob,
+    or ``patterns`` for the number of globs of a config file.
+``match``
+    Matching a path against one config file's section globs.  ``path``,
+    ``config``, the config file's path, ``sections`` and ``matched``.
+``merge``
+    Merging the matching settings of a chain.  ``path``, ``configs`` and
+    ``options``, the number of options in the result.
+
+Spans of the same thread nest: a ``walk`` span contains the ``load_tc``
+and ``load_ec`` spans of the files it loads, for example.  Only lookups
+in the current process are traced, not those of ``--jobs`` worker
+processes.
+
+While no hook is registered, :data:`active` is False and instrumented
+code skips creating spans altogether.  Callbacks run synchronously in
+the thread doing the work, and exceptions they raise are not caught.
+"""
+
+import threading
+import time
+
+#: Whether any hook is registered.  Instrumented code checks this before
+#: calling :func:`span`.
+active = False
+
+# Replaced rather than modified, so a span can keep the tuple it started with
+_hooks = ()
+_lock = threading.Lock()
+
+
+class Span(object):
+    """One stage of work.
+
+    Hooks may set attributes of their own on a span, e.g., to keep track
+    of a span in another tracing system.
+
+    Attributes:
+        stage (str): The name of the stage
+        attributes (dict): Details of the work.  Some are only added by
+            the time ``end`` is called.
+        start_time (float): ``time.perf_counter()`` at the start
+        end_time (float): ``time.perf_counter()`` at the end, or None
+        error (BaseException): What the stage raised, or None
+    """
+
+    def __init__(self, stage, attributes):
+        self.stage = stage
+        self.attributes = attributes
+        self.start_time = None
+        self.end_time = None
+        self.error = None
+        self._hooks = _hooks
+
+    @property
+    def duration(self):
+        """Seconds the stage took, or None if it has not ended"""
+        if self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        for start, _ in self._hooks:
+            if start is not None:
+                start(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_time = time.perf_counter()
+        self.error = exc
+        for _, end in reversed(self._hooks):
+            if end is not None:
+                end(self)
+        return False
+
+    def __repr__(self):
+        return f"Span({self.stage!r}, {self.attributes!r})"
+
+
+def add_hook(start=None, end=None):
+    """Call ``start(span)`` and ``end(span)`` for each :class:`Span`.
+
+    Hooks are called in the order they were added, and ``end`` hooks in
+    the reverse order.
+
+    Returns:
+        object: A handle for :func:`remove_hook`
+    """
+    global _hooks, active
+    handle = (start, end)
+    with _lock:
+        _hooks = _hooks + (handle,)
+        active = True
+    return handle
+
+
+def remove_hook(handle):
+    """Stop calling a hook added by :func:`add_hook`.  Spans already
+    started still call its ``end``."""
+    global _hooks, active
+    with _lock:
+        _hooks = tuple(hook for hook in _hooks if hook is not handle)
+        active = bool(_hooks)
+
+
+def span(stage, **attributes):
+    """Return a :class:`Span` to use as a context manager around the work
+    of ``stage``.  Only call this if :data:`active`."""
+    return Span(stage, attributes)
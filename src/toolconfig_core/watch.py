@@ -0,0 +1,334 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+
+"""Watch config files for changes so cached copies can be trusted.
+
+Without a watcher, :class:`toolconfig_core.cache.ConfigCache` calls
+``stat()`` on every lookup to check that a cached file is still current.
+A watcher tells the cache when files change instead, so that lookups of
+unchanged files, including files that do not exist, need no syscalls.
+
+A watcher keeps a *generation* number for each directory it watches,
+and bumps it whenever a file of interest in that directory is created,
+modified, deleted or renamed.  The cache records the generation it saw
+before checking a file, and trusts its entry only while the generation
+is unchanged, so a change that races with a lookup is never lost.
+
+:class:`InotifyWatcher` uses Linux inotify through ctypes.
+:class:`PollingWatcher` works anywhere, but only notices changes at its
+polling interval.  :func:`enable` picks the best one available.
+"""
+
+import abc
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+
+from toolconfig_core.cache import config_cache, file_signature
+
+# inotify constants, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+_WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class Watcher(abc.ABC):
+    """Abstract base class of watchers.  Subclasses implement
+    :meth:`generation`, and :meth:`close` if they need cleaning up.
+
+    Args:
+        callback (callable): Called with the path of each file of interest
+            that changes, e.g., to drop it from a cache.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.events = 0
+        self._lock = threading.Lock()
+        self._generations = {}  # dir -> int
+        self._names = {}  # dir -> set of basenames of interest
+        self._next_generation = 1
+
+    @abc.abstractmethod
+    def generation(self, path):
+        """Start watching ``path``, if necessary, and return the current
+        generation of its directory.
+
+        Returns:
+            int: The generation, or None if ``path`` cannot be watched and
+            must be checked with ``stat()``, e.g., once the watcher is
+            closed.
+        """
+
+    def _bump(self, dir_name):
+        """Give ``dir_name`` a new generation.  Caller holds the lock."""
+        if dir_name in self._generations:
+            self._generations[dir_name] = self._next_generation
+            self._next_generation += 1
+
+    def _bump_all(self):
+        """Give every directory a new generation.  Caller holds the lock."""
+        for dir_name in self._generations:
+            self._bump(dir_name)
+
+    def _changed(self, path):
+        self.events += 1
+        if self.callback is not None:
+            self.callback(path)
+
+    def close(self):
+        """Stop watching."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class InotifyWatcher(Watcher):
+    """Watch directories using Linux inotify.
+
+    Each directory containing a file of interest gets one inotify watch.
+    Events are read by a background thread.
+
+    Raises:
+        OSError: if inotify is unavailable
+    """
+
+    def __init__(self, callback=None):
+        super().__init__(callback)
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._wds = {}  # wd -> dir
+        self._dirs = {}  # dir -> wd
+        self._unwatchable = set()
+        self._wake_r, self._wake_w = os.pipe()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="toolconfig-inotify", daemon=True
+        )
+        self._thread.start()
+
+    def generation(self, path):
+        dir_name, name = os.path.split(path)
+        with self._lock:
+            if self._closed:
+                return None  # Events are no longer read
+            if dir_name in self._dirs:
+                self._names[dir_name].add(name)
+                return self._generations[dir_name]
+            if dir_name in self._unwatchable:
+                return None
+
+            wd = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(dir_name), _WATCH_MASK
+            )
+            if wd < 0:
+                # E.g., ENOENT, or ENOSPC when out of watches.  Don't
+                # retry: fall back to stat() for this directory.
+                self._unwatchable.add(dir_name)
+                return None
+            self._wds[wd] = dir_name
+            self._dirs[dir_name] = wd
+            self._names[dir_name] = {name}
+            self._generations[dir_name] = self._next_generation
+            self._next_generation += 1
+            return self._generations[dir_name]
+
+    def _forget(self, dir_name, dropped=False):
+        """Stop trusting ``dir_name`` and directories below it, and remove
+        their watches, except that of ``dir_name`` if the kernel has
+        ``dropped`` it already.  Caller holds the lock."""
+        prefix = dir_name.rstrip(os.sep) + os.sep
+        for d in [d for d in self._dirs if d == dir_name or d.startswith(prefix)]:
+            wd = self._dirs.pop(d)
+            del self._wds[wd]
+            del self._generations[d]
+            for name in self._names.pop(d):
+                self._changed(os.path.join(d, name))
+            if not (dropped and d == dir_name):
+                self._libc.inotify_rm_watch(self._fd, wd)
+        self._unwatchable = {
+            d for d in self._unwatchable if not (d == dir_name or d.startswith(prefix))
+        }
+
+    def _handle(self, wd, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            self._bump_all()
+            for d, names in self._names.items():
+                for n in names:
+                    self._changed(os.path.join(d, n))
+            return
+
+        dir_name = self._wds.get(wd)
+        if dir_name is None:
+            return
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+            # A moved directory keeps its watch until it is removed
+            self._forget(dir_name, dropped=not mask & IN_MOVE_SELF)
+            return
+
+        path = os.path.join(dir_name, name)
+        if mask & IN_MOVED_FROM and path in self._dirs:
+            self._forget(path)  # A watched subdirectory was renamed away
+        if name in self._names[dir_name]:
+            self._bump(dir_name)
+            self._changed(path)
+
+    def _run(self):
+        while True:
+            readable, _, _ = select.select([self._fd, self._wake_r], [], [])
+            if self._wake_r in readable:
+                return
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                return
+            with self._lock:
+                offset = 0
+                while offset + _EVENT.size <= len(data):
+                    wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                    offset += _EVENT.size
+                    name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                    offset += length
+                    self._handle(wd, mask, name)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        os.write(self._wake_w, b"x")
+        self._thread.join()
+        os.close(self._fd)
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+
+class PollingWatcher(Watcher):
+    """Watch files by calling ``stat()`` on them periodically.
+
+    Changes are noticed within ``interval`` seconds, so lookups may see a
+    stale copy of a file for up to that long.
+
+    Args:
+        callback (callable): As for :class:`Watcher`
+        interval (float): Seconds between polls
+    """
+
+    def __init__(self, callback=None, interval=1.0):
+        super().__init__(callback)
+        self.interval = interval
+        self._signatures = {}  # path -> signature or None if missing
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="toolconfig-poll", daemon=True
+        )
+        self._thread.start()
+
+    @staticmethod
+    def _signature(path):
+        try:
+            return file_signature(os.stat(path))
+        except OSError:
+            return None
+
+    def generation(self, path):
+        dir_name, name = os.path.split(path)
+        with self._lock:
+            if self._stop.is_set():
+                return None
+            if path not in self._signatures:
+                # Take the baseline before the caller looks at the file
+                self._signatures[path] = self._signature(path)
+                self._names.setdefault(dir_name, set()).add(name)
+                if dir_name not in self._generations:
+                    self._generations[dir_name] = self._next_generation
+                    self._next_generation += 1
+            return self._generations[dir_name]
+
+    def poll(self):
+        """Check every watched file once."""
+        with self._lock:
+            paths = list(self._signatures.items())
+        for path, old in paths:
+            new = self._signature(path)
+            if new != old:
+                with self._lock:
+                    self._signatures[path] = new
+                    self._bump(os.path.dirname(path))
+                self._changed(path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def enable(cache=config_cache, polling_interval=1.0):
+    """Attach a watcher to ``cache``.
+
+    Uses :class:`InotifyWatcher` if possible, otherwise
+    :class:`PollingWatcher`.
+
+    Returns:
+        Watcher: the new watcher
+    """
+    disable(cache)
+    try:
+        watcher = InotifyWatcher(cache.invalidate)
+    except (OSError, AttributeError):
+        watcher = PollingWatcher(cache.invalidate, polling_interval)
+    cache.watcher = watcher
+    return watcher
+
+
+def disable(cache=config_cache):
+    """Detach and stop the watcher of ``cache``, if any."""
+    watcher = cache.watcher
+    cache.watcher = None
+    if watcher is not None:
+        watcher.close()
@@ -5,6 +5,30 @@
 
 import pytest
 
+from toolconfig_core import EC_CONFIG_NAME, TC_CONFIG_NAME
+
+#: Nested ToolConfig and EditorConfig files, for tests that resolve many
+#: paths.  ``from conftest import NESTED_TREE``
+NESTED_TREE = {
+    TC_CONFIG_NAME: "root=true\n['*']\nkey='top'\n['*.txt']\ntxt='yes'\n",
+    "a": {
+        EC_CONFIG_NAME: "[*]\nindent_style=TAB\n",
+        "b": {"c": {TC_CONFIG_NAME: "['*.py']\npy='yes'\n"}},
+    },
+    "other": {EC_CONFIG_NAME: "root=true\n[*]\nkey=other\n"},
+}
+
+#: Paths, relative to the root of NESTED_TREE, under each of its configs
+NESTED_TARGETS = (
+    "file",
+    "file.txt",
+    "a/file.txt",
+    "a/b/file.py",
+    "a/b/c/file.py",
+    "a/b/c/file.txt",
+    "other/file.txt",
+)
+
 
 class TempTree(object):
     def __init__(self, path):
@@ -36,3 +60,26 @@ class TempTree(object):
 @pytest.fixture
 def tmp_tree(tmp_path):
     return TempTree(tmp_path)
+
+
+@pytest.fixture
+def project(tmp_tree):
+    """A tmp_tree with a root ToolConfig file, one of whose globs needs
+    ``**``, and an EditorConfig file in ``src``"""
+    tmp_tree.make(
+        {
+            TC_CONFIG_NAME: "root=true\n['*.py']\na=1\n['src/**/x*.py']\nb=2\n",
+            "src": {EC_CONFIG_NAME: "[*.txt]\nc=3\n", "sub": {}, "x.py": ""},
+        }
+    )
+    return tmp_tree
+
+
+@pytest.fixture(autouse=True)
+def clear_config_cache():
+    """Don't let parsed config files leak between tests."""
+    from toolconfig_core import cache
+
+    cache.clear()
+    yield
+    cache.clear()
@@ -0,0 +1,93 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Tests of toolconfig_core.aio"""
+
+import asyncio
+import threading
+from unittest import mock
+
+import pytest
+from conftest import NESTED_TARGETS, NESTED_TREE
+
+import toolconfig_core.aio
+from toolconfig_core import TC_CONFIG_NAME
+from toolconfig_core.aio import AsyncResolver
+from toolconfig_core.exceptions import ParsingError, PathError
+from toolconfig_core.handler import ToolConfigHandler
+from toolconfig_core.resolve import resolve_many
+
+
+def _run(coro_fn):
+    """Run ``coro_fn(resolver)`` with a fresh AsyncResolver"""
+
+    async def main():
+        async with AsyncResolver() as resolver:
+            return await coro_fn(resolver)
+
+    return asyncio.run(main())
+
+
+def test_same_as_sync(tmp_tree):
+    tmp_tree.make(NESTED_TREE)
+    paths = [str(tmp_tree.root / t) for t in NESTED_TARGETS]
+    results = _run(lambda r: r.resolve_many(reversed(paths)))
+    assert list(results.items()) == list(resolve_many(paths).items())
+
+
+def test_module_functions(tmp_tree):
+    tmp_tree.make(NESTED_TREE)
+    path = str(tmp_tree.root / "a" / "b" / "c" / "file.py")
+    result = asyncio.run(toolconfig_core.aio.resolve(path))
+    assert result == ToolConfigHandler(path).get_options()
+    results = asyncio.run(toolconfig_core.aio.resolve_many([path]))
+    assert results == {path: result}
+
+
+def test_concurrent_loads_deduplicated(tmp_tree):
+    tmp_tree.make(NESTED_TREE)
+    path = str(tmp_tree.root / "a" / "b" / "c" / "file.py")
+
+    async def many(resolver):
+        return await asyncio.gather(*(resolver.resolve(path) for _ in range(20)))
+
+    async def main():
+        async with AsyncResolver() as resolver:
+            results = await many(resolver)
+            return resolver.loads, results
+
+    loads, results = asyncio.run(main())
+    # root, a, a/b/c.  a/b has no config file, so needs no load.
+    assert loads == 3
+    assert all(r == results[0] for r in results)
+
+
+def test_cache_hits_stay_on_loop(tmp_tree):
+    tmp_tree.make(NESTED_TREE)
+    paths = [str(tmp_tree.root / t) for t in NESTED_TARGETS]
+    resolve_many(paths)  # Fill the cache
+
+    async def main():
+        async with AsyncResolver() as resolver:
+            loop_thread = threading.current_thread()
+            with mock.patch.object(
+                resolver, "_load", side_effect=AssertionError("thread hop")
+            ):
+                await resolver.resolve_many(paths)
+            assert threading.current_thread() is loop_thread
+            return resolver.loads
+
+    assert asyncio.run(main()) == 0
+
+
+def test_parsing_error(tmp_tree):
+    tmp_tree.make(NESTED_TREE)
+    (tmp_tree.root / "a" / "b" / TC_CONFIG_NAME).write_text("not toml")
+    paths = [str(tmp_tree.root / t) for t in NESTED_TARGETS]
+    with pytest.raises(ParsingError):
+        _run(lambda r: r.resolve_many(paths))
+
+
+def test_nonabsolute():
+    with pytest.raises(PathError):
+        _run(lambda r: r.resolve("relative"))
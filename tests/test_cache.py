@@ -0,0 +1,242 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Tests of toolconfig_core.cache"""
+
+import os
+import time
+
+import pytest
+
+from toolconfig_core import EC_CONFIG_NAME, TC_CONFIG_NAME, cache
+from toolconfig_core.cache import ConfigCache, DirectoryProbeCache
+from toolconfig_core.config_file import ConfigFile, ToolConfigFile
+from toolconfig_core.handler import ToolConfigHandler
+from toolconfig_core.resolve import resolve_many
+
+
+class CountingLoader(object):
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        with open(path) as f:
+            return f.read()
+
+
+def test_hit(tmp_path):
+    p = tmp_path / "file"
+    p.write_text("x")
+    c = ConfigCache()
+    loader = CountingLoader()
+    assert c.get(p, loader) == "x"
+    assert c.get(p, loader) == "x"
+    assert loader.calls == 1
+    assert (c.hits, c.misses) == (1, 1)
+    assert p in c
+
+
+def test_modified_file_is_reloaded(tmp_path):
+    p = tmp_path / "file"
+    p.write_text("x")
+    c = ConfigCache()
+    loader = CountingLoader()
+    c.get(p, loader)
+    p.write_text("yy")
+    assert c.get(p, loader) == "yy"
+    assert loader.calls == 2
+
+
+def test_same_size_rewrite_is_reloaded(tmp_path):
+    p = tmp_path / "file"
+    p.write_text("x")
+    c = ConfigCache()
+    loader = CountingLoader()
+    c.get(p, loader)
+    p.write_text("y")
+    st = os.stat(p)
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    assert c.get(p, loader) == "y"
+
+
+def test_deleted_file(tmp_path):
+    p = tmp_path / "file"
+    p.write_text("x")
+    c = ConfigCache()
+    c.get(p, CountingLoader())
+    p.unlink()
+    with pytest.raises(OSError):
+        c.get(p, CountingLoader())
+    assert p not in c
+
+
+def test_loader_errors_are_not_cached(tmp_path):
+    p = tmp_path / "file"
+    p.write_text("x")
+    c = ConfigCache()
+
+    def bad_loader(path):
+        raise ValueError(path)
+
+    with pytest.raises(ValueError):
+        c.get(p, bad_loader)
+    assert len(c) == 0
+
+
+def test_lru_entry_limit(tmp_path):
+    c = ConfigCache(max_entries=2)
+    paths = []
+    for name in "abc":
+        paths.append(tmp_path / name)
+        paths[-1].write_text(name)
+    for p in paths[:2]:
+        c.get(p, CountingLoader())
+    c.get(paths[0], CountingLoader())  # Make "b" the LRU entry
+    c.get(paths[2], CountingLoader())
+    assert paths[0] in c
+    assert paths[1] not in c
+    assert paths[2] in c
+    assert c.evictions == 1
+
+
+def test_byte_limit(tmp_path):
+    c = ConfigCache(max_bytes=10)
+    small = tmp_path / "small"
+    small.write_text("x" * 6)
+    big = tmp_path / "big"
+    big.write_text("x" * 11)
+    other = tmp_path / "other"
+    other.write_text("x" * 6)
+
+    c.get(small, CountingLoader())
+    c.get(big, CountingLoader())
+    assert big not in c  # Too big to ever cache
+    c.get(other, CountingLoader())
+    assert small not in c
+    assert other in c
+    assert c.total_bytes == 6
+
+
+def test_set_limits(tmp_path):
+    c = ConfigCache()
+    for name in "abc":
+        (tmp_path / name).write_text(name)
+        c.get(tmp_path / name, CountingLoader())
+    c.set_limits(max_entries=1)
+    assert len(c) == 1
+    assert (tmp_path / "c") in c
+
+
+def test_invalidate_and_clear(tmp_path):
+    p = tmp_path / "file"
+    p.write_text("x")
+    c = ConfigCache()
+    c.get(p, CountingLoader())
+    assert c.invalidate(p)
+    assert not c.invalidate(p)
+    c.get(p, CountingLoader())
+    c.clear()
+    assert len(c) == 0
+    assert c.total_bytes == 0
+
+
+def test_configfile_shares_parsed_files(tmp_path):
+    (tmp_path / TC_CONFIG_NAME).write_text("root=true\n['*']\nkey='v'\n")
+    c1 = ConfigFile(tmp_path)
+    c2 = ConfigFile(tmp_path)
+    assert isinstance(c1.tc, ToolConfigFile)
+    assert c1.tc is c2.tc
+    assert cache.config_cache.hits == 1
+
+    cache.invalidate(tmp_path / TC_CONFIG_NAME)
+    assert ConfigFile(tmp_path).tc is not c1.tc
+
+
+def test_results_do_not_share_nested_values(tmp_path):
+    (tmp_path / TC_CONFIG_NAME).write_text(
+        "root=true\n['*']\nlist=[1, [2]]\ntable={k='v', sub={n=1}}\n"
+    )
+    path = str(tmp_path / "x")
+    options = ToolConfigHandler(path).get_options()
+    options["list"].append(3)
+    options["list"][1].append(4)
+    options["table"]["k"] = "changed"
+    options["table"]["sub"]["n"] = 2
+
+    expected = {"list": [1, [2]], "table": {"k": "v", "sub": {"n": 1}}}
+    assert ToolConfigHandler(path).get_options() == expected
+    assert resolve_many([path]) == {path: expected}
+    assert cache.config_cache.hits >= 2  # Served from the same parsed file
+
+
+def _age(path):
+    """Make ``path`` old enough for its probe to be remembered"""
+    old = time.time() - 60
+    os.utime(path, (old, old))
+
+
+NAMES = (TC_CONFIG_NAME, EC_CONFIG_NAME)
+
+
+def test_probe_remembers_missing(tmp_path):
+    _age(tmp_path)
+    probes = DirectoryProbeCache()
+    assert probes.present(str(tmp_path), NAMES) == frozenset()
+    assert probes.present(str(tmp_path), NAMES) == frozenset()
+    assert (probes.hits, probes.misses) == (1, 1)
+    # Two lookups each time, for 1 + 2 + 1 syscalls
+    assert probes.lookups_avoided == 4
+    assert probes.syscalls == 4
+    assert probes.syscalls_saved == 0
+
+    for _ in range(10):
+        probes.present(str(tmp_path), NAMES)
+    assert probes.syscalls_saved == 10
+
+
+def test_probe_sees_new_file(tmp_path):
+    _age(tmp_path)
+    probes = DirectoryProbeCache()
+    assert probes.present(str(tmp_path), NAMES) == frozenset()
+    (tmp_path / EC_CONFIG_NAME).write_text("")
+    _age(tmp_path)  # A new mtime, but still old enough to be remembered
+    assert probes.present(str(tmp_path), NAMES) == {EC_CONFIG_NAME}
+    assert probes.present(str(tmp_path), NAMES) == {EC_CONFIG_NAME}
+    assert (probes.hits, probes.misses) == (1, 2)
+
+
+def test_probe_recent_directory_not_remembered(tmp_path):
+    probes = DirectoryProbeCache()
+    probes.present(str(tmp_path), NAMES)
+    probes.present(str(tmp_path), NAMES)
+    assert probes.hits == 0
+    assert len(probes) == 0
+
+
+def test_probe_new_names(tmp_path):
+    (tmp_path / TC_CONFIG_NAME).write_text("")
+    _age(tmp_path)
+    probes = DirectoryProbeCache()
+    assert probes.present(str(tmp_path), NAMES) == {TC_CONFIG_NAME}
+    assert probes.syscalls == 1 + 2
+
+    # Only the name not asked about before is looked up
+    assert probes.present(str(tmp_path), (TC_CONFIG_NAME, "other")) == {TC_CONFIG_NAME}
+    assert probes.syscalls == 3 + 1 + 1
+    assert probes.misses == 2
+
+
+def test_probe_missing_directory(tmp_path):
+    probes = DirectoryProbeCache()
+    assert probes.present(str(tmp_path / "nope"), NAMES) == frozenset()
+    assert probes.syscalls_saved == 1
+
+
+def test_configfile_uses_probes(tmp_tree):
+    tmp_tree.make({"sub": {"x": ""}})
+    _age(tmp_tree.root / "sub")
+    sub = str(tmp_tree.root / "sub")
+    ConfigFile(sub)
+    ConfigFile(sub)
+    assert cache.dir_probes.hits == 1
@@ -3,6 +3,9 @@
 # SPDX-License-Identifier: BSD-2-Clause
 """Tests of toolconfig_core.config_file.ConfigFile"""
 
+import pickle
+import sys
+
 import pytest
 
 from toolconfig_core.config_file import ConfigFile
@@ -97,3 +100,58 @@ answer = ec
 
     config = c.settings_for(tmp_path / "some_file")
     assert config == {"answer": "ec"}
+
+
+def test_tcfile_sections_are_shared_and_read_only(tmp_path):
+    (tmp_path / ".toolconfig.toml").write_text(
+        "['*']\nindent_style = 'space'\n['*.txt']\nindent_style = 'space'\n"
+    )
+    c = ConfigFile(tmp_path)
+    with pytest.raises(TypeError):
+        c.tc.sections[0][1]["indent_style"] = "tab"
+    with pytest.raises(TypeError):
+        c.tc.config["*"]["indent_style"] = "tab"
+    assert c.tc.config["*"] is c.tc.sections[0][1]
+    with pytest.raises(AttributeError):
+        c.extra = True
+
+    first = c.settings_for(str(tmp_path / "a"))
+    second = c.settings_for(str(tmp_path / "b.txt"))
+    first["indent_style"] = "tab"
+    assert c.settings_for(str(tmp_path / "a")) == {"indent_style": "space"}
+
+    # Names and values are interned
+    (key,) = second
+    assert key is sys.intern("indent_style")
+    assert second[key] is c.tc.sections[0][1]["indent_style"]
+
+
+def test_tcfile_pickle(tmp_path):
+    (tmp_path / ".toolconfig.toml").write_text("root = true\n['*']\nkey = 1\n")
+    tc = pickle.loads(pickle.dumps(ConfigFile(tmp_path))).tc
+    assert tc.is_root
+    assert tc.settings_for(str(tmp_path / "a")) == {"key": 1}
+    with pytest.raises(TypeError):
+        tc.sections[0][1]["key"] = 2
+    assert list(tc.config) == ["root", "*"]
+    assert tc.config["*"] is tc.sections[0][1]
+
+
+def test_tcfile_nested_values_are_frozen(tmp_path):
+    (tmp_path / ".toolconfig.toml").write_text(
+        "['*']\nlist = [1, {a = [2]}]\ntable = {sub = {n = 1}}\n"
+    )
+    tc = ConfigFile(tmp_path).tc
+    section = tc.sections[0][1]
+    assert section["list"] == (1, {"a": (2,)})
+    with pytest.raises(TypeError):
+        section["list"][1]["a"] = ()
+    with pytest.raises(TypeError):
+        section["table"]["sub"]["n"] = 2
+
+    # Results get mutable copies, also after pickling
+    for config in (tc, pickle.loads(pickle.dumps(tc))):
+        result = config.settings_for(str(tmp_path / "x"))
+        assert result == {"list": [1, {"a": [2]}], "table": {"sub": {"n": 1}}}
+        result["list"][1]["a"].append(3)
+        assert config.sections[0][1]["list"][1]["a"] == (2,)
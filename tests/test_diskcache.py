@@ -0,0 +1,238 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Tests of toolconfig_core.diskcache"""
+
+import os
+import threading
+import time
+
+import pytest
+import tomli
+from cli_test_helpers import shell
+
+from toolconfig_core import EC_CONFIG_NAME, TC_CONFIG_NAME, diskcache
+from toolconfig_core.cache import ConfigCache, config_cache, file_signature
+from toolconfig_core.config_file import ToolConfigFile
+from toolconfig_core.diskcache import DiskCache
+from toolconfig_core.ecpy.ini import EditorConfigFile
+
+
+class CountingLoader(object):
+    def __init__(self, cls):
+        self.cls = cls
+        self.calls = 0
+        self.__module__ = cls.__module__
+        self.__qualname__ = cls.__qualname__
+
+    def __call__(self, path):
+        self.calls += 1
+        return self.cls(path)
+
+
+def _age(path):
+    """Make ``path`` old enough to be stored"""
+    old = time.time() - 60
+    os.utime(path, (old, old))
+
+
+def load(disk, path, loader):
+    return disk.load(str(path), loader, file_signature(os.stat(path)))
+
+
+@pytest.fixture
+def tc_file(tmp_path):
+    p = tmp_path / "project" / TC_CONFIG_NAME
+    p.parent.mkdir()
+    p.write_text("root=true\n['*.py']\nkey='py'\n['file{1..3}']\nnum=1\n")
+    _age(p)
+    return p
+
+
+def test_roundtrip_tc(tmp_path, tc_file):
+    loader = CountingLoader(ToolConfigFile)
+    load(DiskCache(tmp_path / "cache"), tc_file, loader)
+
+    # A new DiskCache, as in a new process, reads the stored copy
+    disk = DiskCache(tmp_path / "cache")
+    tc = load(disk, tc_file, loader)
+    assert loader.calls == 1
+    assert disk.hits == 1
+    assert tc.is_root
+    assert tc.settings_for(str(tc_file.parent / "a.py")) == {"key": "py"}
+    assert tc.settings_for(str(tc_file.parent / "file2")) == {"num": 1}
+
+
+def test_roundtrip_ec(tmp_path):
+    p = tmp_path / EC_CONFIG_NAME
+    p.write_text("root=true\n[*.py]\nkey=py\n")
+    _age(p)
+    loader = CountingLoader(EditorConfigFile)
+    load(DiskCache(tmp_path / "cache"), p, loader)
+    ec = load(DiskCache(tmp_path / "cache"), p, loader)
+    assert loader.calls == 1
+    assert ec.root_file
+    assert ec.settings_for(str(tmp_path / "a.py")) == {"key": "py"}
+    with pytest.raises(TypeError):
+        ec.sections[0].options["key"] = "changed"
+
+
+def test_changed_file_is_reloaded(tmp_path, tc_file):
+    loader = CountingLoader(ToolConfigFile)
+    disk = DiskCache(tmp_path / "cache")
+    load(disk, tc_file, loader)
+    tc_file.write_text("['*']\nkey='all'\n")
+    tc = load(disk, tc_file, loader)
+    assert loader.calls == 2
+    assert tc.settings_for(str(tc_file.parent / "x")) == {"key": "all"}
+
+
+def test_recently_modified_file_not_stored(tmp_path, tc_file):
+    now = time.time()
+    os.utime(tc_file, (now, now))
+    loader = CountingLoader(ToolConfigFile)
+    disk = DiskCache(tmp_path / "cache")
+    load(disk, tc_file, loader)
+    assert disk.writes == 0
+
+    # A same-size rewrite in the same tick keeps the stat() fields
+    tc_file.write_text(tc_file.read_text().replace("'py'", "'PY'"))
+    os.utime(tc_file, (now, now))
+    tc = load(disk, tc_file, loader)
+    assert loader.calls == 2
+    assert tc.settings_for(str(tc_file.parent / "a.py")) == {"key": "PY"}
+
+    _age(tc_file)
+    load(disk, tc_file, loader)
+    assert disk.writes == 1
+
+
+def test_corrupt_entry(tmp_path, tc_file):
+    loader = CountingLoader(ToolConfigFile)
+    disk = DiskCache(tmp_path / "cache")
+    load(disk, tc_file, loader)
+    for entry in os.listdir(disk.directory):
+        (tmp_path / "cache" / entry).write_bytes(b"garbage")
+    load(disk, tc_file, loader)
+    assert loader.calls == 2
+    assert disk.errors == 1
+    load(disk, tc_file, loader)
+    assert loader.calls == 2
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_unsafe_directory(tmp_path, tc_file):
+    loader = CountingLoader(ToolConfigFile)
+    load(DiskCache(tmp_path / "cache"), tc_file, loader)
+    os.chmod(tmp_path / "cache", 0o777)
+
+    # A planted entry would run code when unpickled
+    disk = DiskCache(tmp_path / "cache")
+    entry = disk._entry_path(str(tc_file))
+    with open(entry, "wb") as f:
+        f.write(b"cos\nsystem\n(S'exit 1'\ntR.")
+    tc = load(disk, tc_file, loader)
+    assert loader.calls == 2
+    assert tc.is_root
+    assert not disk.enabled
+    assert disk.stats()["enabled"] is False
+    assert (disk.hits, disk.misses, disk.writes, disk.errors) == (0, 0, 0, 0)
+
+    result = shell(f"toolconfig cache --cache-dir {disk.directory} warm {tc_file}")
+    assert result.exit_code == 1
+    assert "not using" in result.stderr
+
+
+def test_trim_clear_stats(tmp_path):
+    disk = DiskCache(tmp_path / "cache")
+    for i in range(5):
+        p = tmp_path / str(i) / TC_CONFIG_NAME
+        p.parent.mkdir()
+        p.write_text(f"['*']\nkey={i}\n")
+        _age(p)
+        load(disk, p, ToolConfigFile)
+    stats = disk.stats()
+    assert stats["entries"] == 5
+    assert stats["writes"] == 5
+
+    disk.trim(stats["bytes"] // 2)
+    remaining = disk.stats()["entries"]
+    assert 0 < remaining < 5
+    assert disk.clear() == remaining
+    assert disk.stats()["entries"] == 0
+
+
+def test_unpicklable_value(tmp_path, tc_file):
+    disk = DiskCache(tmp_path / "cache")
+    lock = threading.Lock()  # Pickling raises TypeError
+    assert load(disk, tc_file, lambda path: lock) is lock
+    assert disk.errors == 1
+    assert disk.stats()["entries"] == 0
+
+
+def test_trim_keeps_running_size(tmp_path, monkeypatch):
+    disk = DiskCache(tmp_path / "cache")
+    trims = []
+    trim = disk.trim
+    monkeypatch.setattr(disk, "trim", lambda: trims.append(trim()))
+    paths = []
+    for i in range(20):
+        p = tmp_path / str(i) / TC_CONFIG_NAME
+        p.parent.mkdir()
+        p.write_text(f"['*']\nkey={i}\n")
+        _age(p)
+        paths.append(p)
+    for p in paths[:5]:
+        load(disk, p, ToolConfigFile)
+    assert len(trims) == 1  # Only the first write lists the directory
+
+    disk.max_bytes = disk.stats()["bytes"]
+    for p in paths[5:]:
+        load(disk, p, ToolConfigFile)
+    stats = disk.stats()
+    assert stats["bytes"] <= disk.max_bytes
+    assert stats["entries"] >= 4
+    assert len(trims) == 16
+
+
+def test_attached_to_config_cache(tmp_path, tc_file):
+    memory = ConfigCache()
+    disk = diskcache.enable(tmp_path / "cache", cache=memory)
+    try:
+        memory.get(tc_file, ToolConfigFile)
+        assert disk.writes == 1
+        memory.clear()
+        memory.get(tc_file, ToolConfigFile)
+        assert disk.hits == 1
+    finally:
+        diskcache.disable(memory)
+    assert memory.persistent is None
+    assert config_cache.persistent is None
+
+
+def test_default_cache_dir(monkeypatch):
+    monkeypatch.delenv(diskcache.CACHE_DIR_ENV, raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", "/xdg")
+    assert diskcache.default_cache_dir() == os.path.join("/xdg", "toolconfig")
+    monkeypatch.setenv(diskcache.CACHE_DIR_ENV, "/elsewhere")
+    assert diskcache.default_cache_dir() == "/elsewhere"
+
+
+def test_cli(tmp_path, tc_file):
+    cache_dir = tmp_path / "cache"
+    result = shell(f"toolconfig cache --cache-dir {cache_dir} warm {tc_file.parent}")
+    assert result.exit_code == 0
+    assert "Cached 1 new" in result.stdout
+
+    result = shell(f"toolconfig cache --cache-dir {cache_dir} stats")
+    assert result.exit_code == 0
+    assert tomli.loads(result.stdout)["entries"] == 1
+
+    target = tc_file.parent / "a.py"
+    result = shell(f"{diskcache.CACHE_DIR_ENV}={cache_dir} toolconfig --cache {target}")
+    assert result.exit_code == 0
+    assert tomli.loads(result.stdout) == {str(target): {"key": "py"}}
+
+    result = shell(f"toolconfig cache --cache-dir {cache_dir} clear")
+    assert result.exit_code == 0
+    assert "Removed 1" in result.stdout
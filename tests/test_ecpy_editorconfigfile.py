@@ -3,8 +3,11 @@
 # SPDX-License-Identifier: BSD-2-Clause
 """Tests of toolconfig_core.ecpy.ini.EditorConfigFile"""
 
+import sys
+
 import pytest
 
+from toolconfig_core.ecpy.exceptions import ParsingError
 from toolconfig_core.ecpy.ini import EditorConfigFile
 
 
@@ -37,3 +40,108 @@ answer = 42
 
     config = ec.settings_for(tmp_path / "some_file")
     assert config == {"answer": "42"}
+
+
+TRICKY_ECFILE = """\ufeffroot = TRUE
+; comment
+[*]
+indent_style = space
+key = a ; trailing comment
+other = x#not a comment
+
+[*.{py,txt}]
+key = py
+empty = ""
+
+[sub/*.txt]
+key = sub
+indent_style = tab
+
+[file{1..3}.txt]
+numbered = yes
+
+[*]
+key = last
+"""
+
+
+@pytest.mark.parametrize(
+    "relpath",
+    ("foo", "foo.py", "foo.txt", "sub/foo.txt", "a/sub/foo.txt", "file2.txt"),
+)
+def test_same_as_parser(tmp_path, relpath):
+    from toolconfig_core.ecpy.ini import EditorConfigParser
+
+    p = tmp_path / ".editorconfig"
+    p.write_text(TRICKY_ECFILE, encoding="utf-8")
+    target = str(tmp_path / relpath)
+
+    parser = EditorConfigParser(target)
+    parser.read(str(p))
+    ec = EditorConfigFile(str(p))
+
+    assert ec.root_file == parser.root_file
+    result = ec.settings_for(target)
+    assert list(result.items()) == list(parser.options.items())
+
+
+def test_parsed_once(tmp_path):
+    p = tmp_path / ".editorconfig"
+    p.write_text("[*]\nkey = value\n[*.txt]\nkey = txt\n")
+    ec = EditorConfigFile(p)
+    p.unlink()
+
+    # No I/O after construction
+    assert ec.settings_for(tmp_path / "foo") == {"key": "value"}
+    assert ec.settings_for(tmp_path / "foo.txt") == {"key": "txt"}
+    assert [s.glob for s in ec.sections] == ["*", "*.txt"]
+    assert not ec.root_file
+
+
+def test_sections_are_read_only(tmp_path):
+    p = tmp_path / ".editorconfig"
+    p.write_text("[*]\nkey = value\n")
+    ec = EditorConfigFile(p)
+    with pytest.raises(TypeError):
+        ec.sections[0].options["key"] = "changed"
+    ec.settings_for(tmp_path / "foo")["key"] = "changed"
+    assert ec.settings_for(tmp_path / "foo") == {"key": "value"}
+
+
+def test_interned(tmp_path):
+    p = tmp_path / ".editorconfig"
+    p.write_text("[*]\nindent_style = space\n[*.txt]\nindent_style = space\n")
+    ec = EditorConfigFile(p)
+    first, second = (s.options for s in ec.sections)
+    (key,) = first
+    assert key is sys.intern("indent_style")
+    assert first[key] is second[key]
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n", "\r"])
+def test_line_endings(tmp_path, newline):
+    p = tmp_path / ".editorconfig"
+    text = '\ufeffroot = true\n[*]\nkey = value ; comment\n\n# c\n[*.txt]\nkey=""'
+    p.write_bytes(text.replace("\n", newline).encode("utf-8"))
+    ec = EditorConfigFile(p)
+    assert ec.root_file
+    assert ec.settings_for(tmp_path / "foo") == {"key": "value"}
+    assert ec.settings_for(tmp_path / "foo.txt") == {"key": ""}
+
+
+def test_parsing_error_lines(tmp_path):
+    p = tmp_path / ".editorconfig"
+    p.write_text("[*]\nkey = value\nbogus\r\n\nalso bogus\n")
+    with pytest.raises(ParsingError) as info:
+        EditorConfigFile(p)
+    assert info.value.errors == [(3, repr("bogus\r\n")), (5, repr("also bogus\n"))]
+
+
+def test_length_limits(tmp_path):
+    p = tmp_path / ".editorconfig"
+    p.write_text(
+        "[*]\nok = 1\n" + "k" * 51 + " = 1\nlong = " + "v" * 256 + "\n"
+        "[" + "x" * 4097 + "]\nok = 2\n"
+    )
+    ec = EditorConfigFile(p)
+    assert ec.settings_for(tmp_path / "foo") == {"ok": "2"}
@@ -0,0 +1,136 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Tests of toolconfig_core.ecpy.fnmatch"""
+
+import threading
+
+import pytest
+
+from toolconfig_core.ecpy.fnmatch import (
+    DEFAULT_CACHE_SIZE,
+    EXTENSION,
+    GENERAL,
+    LITERAL,
+    MATCH_ALL,
+    NumericRange,
+    PatternSet,
+    TranslationCache,
+    cache_stats,
+    classify,
+    clear_cache,
+    fnmatchcase,
+    set_cache_size,
+    translate,
+)
+
+
+@pytest.mark.parametrize(
+    "pat,expected",
+    (
+        ("**/*", (MATCH_ALL, set())),
+        ("**/**", (MATCH_ALL, set())),
+        ("**/Makefile", (LITERAL, {"Makefile"})),
+        ("**/{Makefile,GNUmakefile}", (LITERAL, {"Makefile", "GNUmakefile"})),
+        ("**/*.py", (EXTENSION, {".py"})),
+        ("**/*.tar.gz", (EXTENSION, {".tar.gz"})),
+        ("**/{*.c,*.h}", (EXTENSION, {".c", ".h"})),
+        ("**/*.{c,h}", (EXTENSION, {".c", ".h"})),
+        ("/foo/*.py", (GENERAL, set())),
+        ("**/*rc", (GENERAL, set())),
+        ("**/{*.c,Makefile}", (GENERAL, set())),
+        ("**/{*.c}", (GENERAL, set())),
+        ("**/file{1..3}.txt", (GENERAL, set())),
+        ("**/[ab].py", (GENERAL, set())),
+        ("**/a?.py", (GENERAL, set())),
+        ("**/{a,{b,c}}", (GENERAL, set())),
+        ("**/x\\*", (GENERAL, set())),
+    ),
+)
+def test_classify(pat, expected):
+    assert classify(pat) == expected
+
+
+def test_patternset_invalid_regex():
+    # "[(/]" is copied into the regex verbatim, so it fails to compile.
+    # Building the set succeeds; matching fails like fnmatchcase() does.
+    ps = PatternSet(["**/*.py", "/foo/[(/]"])
+    with pytest.raises(Exception):
+        fnmatchcase("/foo/x", "/foo/[(/]")
+    with pytest.raises(Exception):
+        ps.fnmatchcase("/foo/x.py")
+
+
+def test_translation_cache_bounded():
+    cache = TranslationCache(maxsize=2)
+    for pat in ("a", "b", "a", "c"):
+        cache.get(pat)
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 3, 1)
+    assert stats["compile_time"] > 0
+
+    cache.resize(1)
+    assert len(cache) == 1
+    cache.clear()
+    assert cache.stats()["misses"] == 0
+
+
+def test_translation_cache_concurrent():
+    cache = TranslationCache()
+    results = []
+
+    def worker():
+        for i in range(50):
+            results.append((i, cache.get("**/*.ext%d" % i)))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(cache) == 50
+    for i, entry in results:
+        assert entry is cache.get("**/*.ext%d" % i)
+
+
+def test_module_cache_api():
+    clear_cache()
+    fnmatchcase("/foo.py", "**/*.py")
+    fnmatchcase("/bar.py", "**/*.py")
+    stats = cache_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    set_cache_size(DEFAULT_CACHE_SIZE)
+
+
+def test_numeric_range_reuse():
+    # Ranges are stored in the translation cache, so must survive reuse.
+    clear_cache()
+    pat = "**/file{1..10}.txt"
+    for _ in range(3):
+        assert fnmatchcase("/file5.txt", pat)
+        assert not fnmatchcase("/file11.txt", pat)
+        assert not fnmatchcase("/file05.txt", pat)
+        assert fnmatchcase("/file+5.txt", pat)
+        assert not fnmatchcase("/file-5.txt", pat)
+
+
+def test_numeric_ranges_translate():
+    pat = "{-3..3}/x{1..2}y"
+    res, num_groups = translate(pat, nested=True)
+    assert num_groups == (NumericRange("r0", -3, 3), NumericRange("r1", 1, 2))
+    assert fnmatchcase("-2/x2y", pat)
+    assert not fnmatchcase("-2/x3y", pat)
+    assert not fnmatchcase("-4/x2y", pat)
+
+
+def test_numeric_range_in_untaken_alternative():
+    pat = "{a,b{1..3}}"
+    assert fnmatchcase("a", pat)
+    assert fnmatchcase("b2", pat)
+    assert not fnmatchcase("b4", pat)
+    assert PatternSet([pat]).fnmatchcase("a") == [0]
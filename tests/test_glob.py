@@ -5,7 +5,7 @@
 
 import pytest
 
-from toolconfig_core.glob import matches_filename
+from toolconfig_core.glob import GlobSet, matches_filename, normalize_target
 
 
 @pytest.mark.parametrize(
@@ -21,3 +21,93 @@ from toolconfig_core.glob import matches_filename
 )
 def test_matches(config_path, glob, target_path):
     assert matches_filename(config_path, glob, target_path)
+
+
+GLOBS = (
+    "*",
+    "*.txt",
+    "*.{c,h}",
+    "{*.c,*.h}",
+    "Makefile",
+    "/foo/*.txt",
+    "bat/**",
+    "**/baz.txt",
+    "[bf]oo.txt",
+    "[!b]*.txt",
+    "a?c",
+    "\\#hash",
+    "semi\\;colon",
+    "{single}",
+    "[a/b]",
+    "**",
+    "*.tar.gz",
+    "*.",
+    "{Makefile,GNUmakefile}",
+    "{*.c,Makefile}",
+    "{*.c,}",
+    "{*,*.c}",
+    "*.{txt,gz}",
+    ".editorconfig",
+    "*rc",
+)
+
+TARGETS = (
+    "/foo",
+    "/foo.txt",
+    "/foo/bar.txt",
+    "/foo/bar/bat/baz.txt",
+    "/x.c",
+    "/x/y.h",
+    "/Makefile",
+    "/sub/Makefile",
+    "/abc",
+    "/#hash",
+    "/semi;colon",
+    "/{single}",
+    "/",
+    "/x.tar.gz",
+    "/x/.tar.gz",
+    "/.txt",
+    "/a/weird.",
+    "/a/GNUmakefile",
+    "/a/.editorconfig",
+    "/a/.bashrc",
+    "/a/b.c/d",
+    "/line\nbreak.txt",
+)
+
+
+@pytest.mark.parametrize("target_path", TARGETS)
+def test_globset_same_as_matches_filename(target_path):
+    config_path = "/.toolconfig.toml"
+    globset = GlobSet(config_path, GLOBS)
+    expected = [
+        i
+        for i, glob in enumerate(GLOBS)
+        if matches_filename(config_path, glob, target_path)
+    ]
+    assert globset.matching(target_path) == expected
+
+
+@pytest.mark.parametrize(
+    "target_path,expected",
+    (
+        ("/file5.txt", [0, 1]),
+        ("/file15.txt", [0]),
+        ("/file05.txt", [0]),
+        ("/file-1.txt", [0]),
+        ("/file5.c", []),
+    ),
+)
+def test_globset_numeric_ranges(target_path, expected):
+    globset = GlobSet("/.toolconfig.toml", ("*.txt", "file{1..10}.txt"))
+    assert globset.matching(target_path) == expected
+
+
+def test_globset_prenormalized():
+    globset = GlobSet("/foo/.editorconfig", ("*.txt", "/bar/*.txt"))
+    target = "/foo/./bar//baz.txt"
+    normalized = normalize_target(target)
+    assert normalized == "/foo/bar/baz.txt"
+    assert globset.matching(target) == [0, 1]
+    assert globset.matching(target, normalized) == [0, 1]
@@ -121,3 +121,31 @@ key = "value2"
     c = ToolConfigHandler(tmp_tree.root / "dir" / "foo.txt").get_options()
     # The later value should win since both match.
     assert c == {"key": "value2"}
+
+
+def test_single_walk(tmp_tree, monkeypatch):
+    import toolconfig_core.config_file
+
+    tmp_tree.make(
+        {
+            TC_CONFIG_NAME: "root=true\n['*']\nkey='top'\n",
+            "a": {"b": {EC_CONFIG_NAME: "[*]\nkey2=b\n"}},
+        }
+    )
+
+    loaded = []
+
+    class CountingConfigFile(toolconfig_core.config_file.ConfigFile):
+        def __init__(self, dir_name, *args, **kwargs):
+            loaded.append(dir_name)
+            super().__init__(dir_name, *args, **kwargs)
+
+    monkeypatch.setattr(toolconfig_core.config_file, "ConfigFile", CountingConfigFile)
+
+    handler = ToolConfigHandler(str(tmp_tree.root / "a" / "b" / "file"))
+    assert loaded == []  # Nothing loaded until needed
+
+    assert handler.get_options() == {"key2": "b", "key": "top"}
+    assert handler.root_dir == str(tmp_tree.root)
+    assert len(loaded) == 3
+    assert len(set(loaded)) == 3
@@ -0,0 +1,162 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Tests of toolconfig(1)"""
+
+import json
+import subprocess
+import sys
+
+import tomli
+from cli_test_helpers import shell
+
+from toolconfig_core import TC_CONFIG_NAME
+
+
+def test_version():
+    result = shell("toolconfig --version")
+    assert result.exit_code == 0
+    assert result.stdout
+
+
+def test_multiple_paths(tmp_tree):
+    tmp_tree.make(
+        {
+            TC_CONFIG_NAME: "root=true\n['*']\nkey='all'\n['*.txt']\ntxt='yes'\n",
+            "dir": {"file.txt": ""},
+        }
+    )
+    first = tmp_tree.root / "dir" / "file.txt"
+    second = tmp_tree.root / "a"
+    result = shell(f"toolconfig {first} {second}")
+    assert result.exit_code == 0
+
+    output = tomli.loads(result.stdout)
+    assert list(output.keys()) == sorted([str(first), str(second)])
+    assert output[str(first)] == {"key": "all", "txt": "yes"}
+    assert output[str(second)] == {"key": "all"}
+
+
+def test_tree(tmp_tree):
+    tmp_tree.make(
+        {
+            TC_CONFIG_NAME: "root=true\n['*']\nkey='all'\n['*.txt']\ntxt='yes'\n",
+            "dir": {"file.txt": "", "sub": {"x": ""}},
+        }
+    )
+    result = shell(f"toolconfig --tree {tmp_tree.root / 'dir'}")
+    assert result.exit_code == 0
+
+    output = tomli.loads(result.stdout)
+    assert output == {
+        str(tmp_tree.root / "dir" / "file.txt"): {"key": "all", "txt": "yes"},
+        str(tmp_tree.root / "dir" / "sub" / "x"): {"key": "all"},
+    }
+
+
+def test_no_paths():
+    result = shell("toolconfig")
+    assert result.exit_code != 0
+
+
+def test_stdin(tmp_tree):
+    tmp_tree.make({TC_CONFIG_NAME: "root=true\n['*']\nkey='all'\n['*.txt']\ntxt=1\n"})
+    paths = [str(tmp_tree.root / "b.txt"), str(tmp_tree.root / "a")]
+    for args, data in (
+        (["--stdin"], "\n".join(paths) + "\n"),
+        (["--stdin", "-0"], "\0".join(paths)),
+    ):
+        result = subprocess.run(
+            ["toolconfig"] + args,
+            input=data.encode(),
+            stdout=subprocess.PIPE,
+            check=True,
+        )
+        lines = result.stdout.decode().splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"path": paths[0], "settings": {"key": "all", "txt": 1}},
+            {"path": paths[1], "settings": {"key": "all"}},
+        ]
+
+
+def test_stdin_repeated_paths(tmp_tree):
+    tmp_tree.make({TC_CONFIG_NAME: "root=true\n['*']\nkey='all'\n"})
+    path = str(tmp_tree.root / "a")
+    data = f"{path}\r\n{path}\r\n".encode()
+    for format, parse in (("toml", tomli.loads), ("json", json.loads)):
+        result = subprocess.run(
+            ["toolconfig", "--stdin", "--format", format],
+            input=data,
+            stdout=subprocess.PIPE,
+            check=True,
+        )
+        assert parse(result.stdout.decode()) == {path: {"key": "all"}}
+
+    result = subprocess.run(
+        ["toolconfig", "--stdin"], input=data, stdout=subprocess.PIPE, check=True
+    )
+    assert len(result.stdout.decode().splitlines()) == 2
+
+
+def test_null_requires_stdin():
+    result = shell("toolconfig -0 /a")
+    assert result.exit_code != 0
+
+
+def test_format(tmp_tree):
+    tmp_tree.make({TC_CONFIG_NAME: "root=true\n['*']\nkey='all'\n"})
+    path = str(tmp_tree.root / "x")
+    result = shell(f"toolconfig --format json {path}")
+    assert result.exit_code == 0
+    assert json.loads(result.stdout) == {path: {"key": "all"}}
+
+
+def test_grouped_format(tmp_tree):
+    tmp_tree.make(
+        {TC_CONFIG_NAME: "root=true\n['*.py']\nkey='py'\n", "a.py": "", "b.py": ""}
+    )
+    result = shell(f"toolconfig --format grouped --tree {tmp_tree.root}")
+    assert result.exit_code == 0
+    output = json.loads(result.stdout)
+    assert len(output["paths"]) == 3
+    assert len(output["classes"]) == 2
+    py = output["paths"][str(tmp_tree.root / "a.py")]
+    assert output["paths"][str(tmp_tree.root / "b.py")] == py
+    assert output["classes"][py] == {"key": "py"}
+
+
+def test_key_order_same_on_every_path(tmp_tree):
+    """Equal settings with keys in different orders keep their own orders"""
+    tmp_tree.make(
+        {
+            TC_CONFIG_NAME: "root=true\n['*.txt']\nb=2\n['*']\na=1\n",
+            "sub": {TC_CONFIG_NAME: "['*']\na=1\nb=2\n"},
+        }
+    )
+    paths = f"{tmp_tree.root / 'x.txt'} {tmp_tree.root / 'sub' / 'y'}"
+    fast = shell(f"toolconfig {paths}")
+    assert fast.exit_code == 0
+    assert shell(f"toolconfig --format toml {paths}").stdout == fast.stdout
+    assert shell(f"toolconfig --stats {paths}").stdout == fast.stdout
+
+
+def test_lazy_imports(tmp_tree):
+    """Just paths must not pay for modules only some options need"""
+    tmp_tree.make({TC_CONFIG_NAME: "root=true\n['*']\nkey='all'\n"})
+    code = (
+        "import sys\n"
+        "from toolconfig_core.__main__ import main\n"
+        f"main([{str(tmp_tree.root / 'x')!r}])\n"
+        "heavy = ('argparse', 'pickle', 'toolconfig_core.diskcache',\n"
+        "         'toolconfig_core.ecpy.handler', 'toolconfig_core.stream')\n"
+        "print(sorted(m for m in heavy if m in sys.modules), file=sys.stderr)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    assert tomli.loads(result.stdout) == {str(tmp_tree.root / "x"): {"key": "all"}}
+    assert result.stderr.strip() == "[]"
@@ -0,0 +1,153 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Tests of toolconfig_core.output"""
+
+import io
+import json
+import re
+
+import pytest
+import tomli_w
+
+from toolconfig_core.output import FORMATS, EncodingMemo, Writer, make_writer
+
+SHARED = {"indent": 4, "style": "tab"}
+RESULTS = {
+    "/a b/x.py": SHARED,
+    "/c/y.py": dict(SHARED),
+    "/c/z": {},
+    "/d/\tweird\n": {"flag": True, "nums": [1, 2], "sub": {"k": "v\\"}},
+    "/e": SHARED,
+}
+
+
+def _write(format, results=RESULTS):
+    out = io.StringIO()
+    writer = make_writer(format, out)
+    writer.write_all(results.items())
+    writer.close()
+    return out.getvalue()
+
+
+def test_toml_same_as_tomli_w():
+    assert _write("toml") == tomli_w.dumps(RESULTS) + "\n"
+    assert _write("toml", {}) == "\n"
+
+
+def test_json():
+    assert json.loads(_write("json")) == RESULTS
+    assert json.loads(_write("json", {})) == {}
+
+
+def test_ndjson():
+    lines = _write("ndjson").splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"path": path, "settings": settings} for path, settings in RESULTS.items()
+    ]
+
+
+def test_tsv():
+    assert _write("tsv").splitlines() == [
+        "/a b/x.py\tindent\t4",
+        '/a b/x.py\tstyle\t"tab"',
+        "/c/y.py\tindent\t4",
+        '/c/y.py\tstyle\t"tab"',
+        "/d/\\tweird\\n\tflag\ttrue",
+        "/d/\\tweird\\n\tnums\t[1, 2]",
+        '/d/\\tweird\\n\tsub\t{"k": "v\\\\"}',
+        "/e\tindent\t4",
+        '/e\tstyle\t"tab"',
+    ]
+
+
+def _tsv_unescape(text):
+    return re.sub(r"\\(.)", lambda m: {"t": "\t", "n": "\n"}.get(m[1], m[1]), text)
+
+
+def test_tsv_round_trip():
+    results = dict(RESULTS)
+    results["/f\\g\tkey"] = {"num": "4", "4": 4, "json": '{"a": 1}', "\t": "\\n"}
+    parsed = {}
+    for line in _write("tsv", results).splitlines():
+        path, key, value = line.split("\t")
+        settings = parsed.setdefault(_tsv_unescape(path), {})
+        settings[_tsv_unescape(key)] = json.loads(value)
+    assert parsed == {path: settings for path, settings in results.items() if settings}
+
+
+# grouped-by-class cannot write anything until it has every path
+@pytest.mark.parametrize("format", [f for f in FORMATS if f != "grouped-by-class"])
+def test_flush(format):
+    out = io.StringIO()
+    writer = make_writer(format, out)
+    writer.write("/x", SHARED)
+    writer.flush()
+    assert "/x" in out.getvalue()
+
+
+def test_grouped():
+    output = json.loads(_write("grouped"))
+    assert set(output) == {"paths", "classes"}
+    assert list(output["paths"]) == list(RESULTS)
+    assert len(output["classes"]) == 3
+    for path, settings in RESULTS.items():
+        assert output["classes"][output["paths"][path]] == settings
+    assert json.loads(_write("grouped", {})) == {"paths": {}, "classes": {}}
+
+
+def test_grouped_by_class():
+    output = json.loads(_write("grouped-by-class"))
+    assert [entry["paths"] for entry in output["classes"].values()] == [
+        ["/a b/x.py", "/c/y.py", "/e"],
+        ["/c/z"],
+        ["/d/\tweird\n"],
+    ]
+    assert json.loads(_write("grouped")) == {
+        "paths": {
+            path: id
+            for id, entry in output["classes"].items()
+            for path in entry["paths"]
+        },
+        "classes": {id: entry["settings"] for id, entry in output["classes"].items()},
+    }
+    assert json.loads(_write("grouped-by-class", {})) == {"classes": {}}
+
+
+def test_memo_reuse():
+    calls = []
+
+    def encode(settings):
+        calls.append(settings)
+        return json.dumps(settings)
+
+    memo = EncodingMemo(encode)
+    assert memo(SHARED) == memo(SHARED) == memo(dict(SHARED))
+    assert len(calls) == 1
+
+    # Equal but differently-typed values are encoded separately
+    assert memo({"a": 1}) != memo({"a": True})
+
+    # Unhashable values are encoded for each new dict
+    nested = {"a": [1]}
+    memo(nested)
+    memo(nested)
+    memo({"a": [1]})
+    assert memo.misses == 5
+    assert memo.hits == 3
+
+
+def test_memo_bounded():
+    memo = EncodingMemo(json.dumps, max_entries=2)
+    for i in range(10):
+        memo({"i": i})
+    assert len(memo._by_id) <= 2
+    assert len(memo._by_content) <= 2
+
+
+def test_writer_is_abstract():
+    class Incomplete(Writer):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(io.StringIO())
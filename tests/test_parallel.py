@@ -0,0 +1,61 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Tests of toolconfig_core.parallel"""
+
+import pytest
+from conftest import NESTED_TREE
+
+from toolconfig_core import TC_CONFIG_NAME
+from toolconfig_core.exceptions import ParsingError
+from toolconfig_core.parallel import _balance, job_count
+from toolconfig_core.resolve import resolve_many, resolve_tree
+
+
+def _make(tmp_tree):
+    tmp_tree.make(NESTED_TREE)
+    tmp_tree.make(
+        {
+            f"{d}/{sub}/file{i}.{ext}": ""
+            for d in ("a", "a/b", "a/b/c", "other", "plain")
+            for sub in ("x", "y", "z")
+            for i in range(3)
+            for ext in ("py", "txt")
+        }
+    )
+
+
+@pytest.mark.parametrize("jobs", [2, 3, None])
+def test_tree_same_as_serial(tmp_tree, jobs):
+    _make(tmp_tree)
+    expected = resolve_tree(str(tmp_tree.root))
+    results = resolve_tree(str(tmp_tree.root), jobs=jobs)
+    assert list(results.items()) == list(expected.items())
+
+
+def test_many_same_as_serial(tmp_tree):
+    _make(tmp_tree)
+    paths = list(resolve_tree(str(tmp_tree.root)).keys())
+    paths.append(str(tmp_tree.root / "does" / "not" / "exist"))
+    expected = resolve_many(paths)
+    results = resolve_many(reversed(paths), jobs=2)
+    assert list(results.items()) == list(expected.items())
+
+
+def test_parsing_error_raised(tmp_tree):
+    _make(tmp_tree)
+    (tmp_tree.root / "plain" / "y" / TC_CONFIG_NAME).write_text("not toml")
+    with pytest.raises(ParsingError):
+        resolve_tree(str(tmp_tree.root), jobs=2)
+
+
+def test_balance():
+    shards = _balance([(1, "b"), (5, "a"), (4, "c"), (2, "d")], 2)
+    assert sorted(sorted(s) for s in shards) == [["a", "b"], ["c", "d"]]
+    assert _balance([(1, "a")], 4) == [["a"]]
+
+
+def test_job_count():
+    assert job_count(3) == 3
+    assert job_count(0) >= 1
+    assert job_count(None) == job_count(0)
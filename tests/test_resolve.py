@@ -0,0 +1,125 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Tests of toolconfig_core.resolve"""
+
+import os
+
+import pytest
+from conftest import NESTED_TARGETS, NESTED_TREE
+
+import toolconfig_core.resolve
+from toolconfig_core import EC_CONFIG_NAME, TC_CONFIG_NAME
+from toolconfig_core.config_file import ConfigFile
+from toolconfig_core.exceptions import PathError
+from toolconfig_core.handler import ToolConfigHandler
+from toolconfig_core.resolve import DirectoryTrie, resolve_many, resolve_tree
+
+
+@pytest.fixture
+def counted_loads(monkeypatch):
+    loaded = []
+
+    class CountingConfigFile(ConfigFile):
+        def __init__(self, dir_name, *args, **kwargs):
+            loaded.append(dir_name)
+            super().__init__(dir_name, *args, **kwargs)
+
+    monkeypatch.setattr(toolconfig_core.resolve, "ConfigFile", CountingConfigFile)
+    return loaded
+
+
+def test_same_as_handler(tmp_tree):
+    tmp_tree.make(NESTED_TREE)
+    paths = [str(tmp_tree.root / t) for t in NESTED_TARGETS]
+    results = resolve_many(paths)
+    for path in paths:
+        assert results[path] == ToolConfigHandler(path).get_options()
+
+
+def test_sorted(tmp_tree):
+    tmp_tree.make(NESTED_TREE)
+    paths = [str(tmp_tree.root / t) for t in reversed(NESTED_TARGETS)]
+    assert list(resolve_many(paths).keys()) == sorted(paths)
+
+
+def test_each_dir_loaded_once(tmp_tree, counted_loads):
+    tmp_tree.make(NESTED_TREE)
+    paths = [str(tmp_tree.root / t) for t in NESTED_TARGETS]
+    resolve_many(paths)
+    assert len(counted_loads) == len(set(counted_loads))
+    # root, a, a/b, a/b/c, other
+    assert len(counted_loads) == 5
+
+
+def test_trie_reuse(tmp_tree, counted_loads):
+    tmp_tree.make(NESTED_TREE)
+    trie = DirectoryTrie()
+    resolve_many([str(tmp_tree.root / "a" / "b" / "c" / "file")], trie=trie)
+    assert len(counted_loads) == 4
+    resolve_many([str(tmp_tree.root / "a" / "file")], trie=trie)
+    assert len(counted_loads) == 4
+
+    chain = trie.chain(str(tmp_tree.root / "a" / "b"))
+    assert [c.dir_name for c in chain] == [
+        str(tmp_tree.root / "a" / "b"),
+        str(tmp_tree.root / "a"),
+        str(tmp_tree.root),
+    ]
+
+
+def test_nonabsolute_target():
+    with pytest.raises(PathError):
+        resolve_many(["/ok", "not-an-absolute-path"])
+
+
+def _make_targets(tmp_tree):
+    tmp_tree.make(NESTED_TREE)
+    tmp_tree.make({t: "" for t in NESTED_TARGETS})
+
+
+def test_tree_same_as_handler(tmp_tree):
+    _make_targets(tmp_tree)
+    results = resolve_tree(str(tmp_tree.root))
+    expected = sorted(
+        os.path.join(d, f) for d, _, files in os.walk(str(tmp_tree.root)) for f in files
+    )
+    assert list(results.keys()) == expected
+    for path in expected:
+        assert results[path] == ToolConfigHandler(path).get_options()
+
+
+def test_tree_each_dir_loaded_once(tmp_tree, counted_loads):
+    _make_targets(tmp_tree)
+    resolve_tree(str(tmp_tree.root))
+    assert sorted(counted_loads) == sorted(
+        str(tmp_tree.root / d) for d in ("", "a", "a/b", "a/b/c", "other")
+    )
+
+
+def test_tree_subdirectory(tmp_tree):
+    _make_targets(tmp_tree)
+    results = resolve_tree(str(tmp_tree.root / "a" / "b") + os.sep)
+    path = str(tmp_tree.root / "a" / "b" / "c" / "file.txt")
+    assert list(results.keys()) == [
+        str(tmp_tree.root / "a" / "b" / "c" / TC_CONFIG_NAME),
+        str(tmp_tree.root / "a" / "b" / "c" / "file.py"),
+        path,
+        str(tmp_tree.root / "a" / "b" / "file.py"),
+    ]
+    assert results[path] == ToolConfigHandler(path).get_options()
+
+
+def test_tree_symlinked_dir_not_followed(tmp_tree):
+    _make_targets(tmp_tree)
+    os.symlink(str(tmp_tree.root / "a"), str(tmp_tree.root / "other" / "link"))
+    results = resolve_tree(str(tmp_tree.root / "other"))
+    assert list(results.keys()) == [
+        str(tmp_tree.root / "other" / EC_CONFIG_NAME),
+        str(tmp_tree.root / "other" / "file.txt"),
+    ]
+
+
+def test_tree_nonabsolute():
+    with pytest.raises(PathError):
+        resolve_tree("not-an-absolute-path")
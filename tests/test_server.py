@@ -0,0 +1,178 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Tests of toolconfig_core.server"""
+
+import os
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+import tomli
+from cli_test_helpers import shell
+
+from toolconfig_core import TC_CONFIG_NAME
+from toolconfig_core.exceptions import ParsingError, PathError
+
+server = pytest.importorskip("toolconfig_core.server")
+
+
+TREE = {
+    TC_CONFIG_NAME: "root=true\n['*']\nkey='all'\n['*.txt']\ntxt='yes'\n",
+    "dir": {"file.txt": ""},
+}
+
+
+@pytest.fixture
+def running_server(tmp_path):
+    socket_path = str(tmp_path / "sock")
+    srv = server.ResolverServer(socket_path)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+    thread.join()
+
+
+def test_resolve(tmp_tree, running_server):
+    tmp_tree.make(TREE)
+    paths = [str(tmp_tree.root / "dir" / "file.txt"), str(tmp_tree.root / "a")]
+    with server.Client(running_server.socket_path) as client:
+        results = client.resolve_many(paths)
+        assert list(results.keys()) == sorted(paths)
+        assert results[paths[0]] == {"key": "all", "txt": "yes"}
+
+        # Several requests per connection
+        assert client.resolve_many(paths[1:]) == {paths[1]: {"key": "all"}}
+
+
+def test_concurrent_clients(tmp_tree, running_server):
+    tmp_tree.make(TREE)
+    path = str(tmp_tree.root / "dir" / "file.txt")
+    errors = []
+
+    def worker():
+        try:
+            with server.Client(running_server.socket_path) as client:
+                for _ in range(20):
+                    assert client.resolve_many([path])[path]["txt"] == "yes"
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+
+def test_errors(tmp_tree, running_server):
+    tmp_tree.make({TC_CONFIG_NAME: "root=true\n[[[oops\n"})
+    with server.Client(running_server.socket_path) as client:
+        with pytest.raises(PathError):
+            client.resolve_many(["relative"])
+        with pytest.raises(ParsingError):
+            client.resolve_many([str(tmp_tree.root / "file")])
+
+
+def test_editorconfig_errors(tmp_tree, running_server):
+    tmp_tree.make({".editorconfig": "root = true\n[*]\nnot an option\n"})
+    path = str(tmp_tree.root / "file")
+    with server.Client(running_server.socket_path) as client:
+        with pytest.raises(ParsingError, match="not an option"):
+            client.resolve_many([path])
+        # The connection survives the error
+        with pytest.raises(ParsingError):
+            client.resolve_many([path])
+
+
+def test_bad_request(running_server):
+    assert "error" in server.handle_request({"nopaths": 1})
+    assert "error" in server.handle_request([])
+
+
+def test_default_socket_path(tmp_path, monkeypatch):
+    monkeypatch.delenv(server.SOCKET_ENV, raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    private = tmp_path / f"toolconfig-{os.getuid()}"
+    assert server.default_socket_path() == str(private / "toolconfig.sock")
+    assert stat.S_IMODE(os.lstat(private).st_mode) == 0o700
+
+    # Another user could have made it, or could still write to it
+    private.chmod(0o777)
+    with pytest.raises(OSError):
+        server.default_socket_path()
+    private.rmdir()
+    (tmp_path / "elsewhere").mkdir(mode=0o700)
+    private.symlink_to(tmp_path / "elsewhere")
+    with pytest.raises(OSError):
+        server.default_socket_path()
+
+    # Clients resolve in-process instead
+    path = str(tmp_path / "x")
+    assert server.resolve_many_via_server([path]) == {path: {}}
+
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1")
+    assert server.default_socket_path() == "/run/user/1/toolconfig.sock"
+    monkeypatch.setenv(server.SOCKET_ENV, "/elsewhere.sock")
+    assert server.default_socket_path() == "/elsewhere.sock"
+
+
+def test_stale_socket_replaced(tmp_path):
+    socket_path = str(tmp_path / "sock")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(socket_path)
+    sock.close()  # Leaves the socket file behind with no listener
+    srv = server.ResolverServer(socket_path)
+    with pytest.raises(OSError):
+        server.ResolverServer(socket_path)
+    srv.server_close()
+    assert not os.path.exists(socket_path)
+
+
+def test_fallback_without_server(tmp_tree):
+    tmp_tree.make(TREE)
+    path = str(tmp_tree.root / "dir" / "file.txt")
+    results = server.resolve_many_via_server(
+        [path], socket_path=str(tmp_tree.root / "nonexistent")
+    )
+    assert results == {path: {"key": "all", "txt": "yes"}}
+
+
+def test_cli(tmp_tree):
+    tmp_tree.make(TREE)
+    socket_path = tmp_tree.root / "sock"
+    target = tmp_tree.root / "dir" / "file.txt"
+    expected = {str(target): {"key": "all", "txt": "yes"}}
+
+    # No server yet
+    result = shell(f"toolconfig --connect --socket {socket_path} {target}")
+    assert result.exit_code == 0
+    assert tomli.loads(result.stdout) == expected
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "toolconfig_core", "serve", "--socket", socket_path]
+    )
+    try:
+        for _ in range(100):
+            if socket_path.exists():
+                break
+            time.sleep(0.05)
+        assert proc.poll() is None
+        with server.Client(str(socket_path)):
+            pass  # It is listening
+        result = shell(f"toolconfig --connect --socket {socket_path} {target}")
+        assert result.exit_code == 0
+        assert tomli.loads(result.stdout) == expected
+    finally:
+        proc.terminate()
+        proc.wait()
+    assert not socket_path.exists()
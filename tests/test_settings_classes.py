@@ -0,0 +1,84 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Tests of toolconfig_core.settings_classes"""
+
+import pickle
+
+import pytest
+
+from toolconfig_core import TC_CONFIG_NAME
+from toolconfig_core.frozen import thaw
+from toolconfig_core.resolve import resolve_many, resolve_tree
+from toolconfig_core.settings_classes import SettingsClass, SettingsClasses
+
+
+def test_equal_settings_share_a_class():
+    classes = SettingsClasses()
+    first = classes.intern({"a": "1", "b": 2})
+    assert isinstance(first, SettingsClass)
+    assert first == {"a": "1", "b": 2}
+    assert classes.intern({"b": 2, "a": "1"}) is first
+    assert classes.intern(first) is first
+    assert list(first) == ["a", "b"]  # Order of the first settings
+    assert len(classes) == 1
+    assert classes[first.id] is first
+
+
+def test_types_are_distinguished():
+    classes = SettingsClasses()
+    ids = {classes.intern({"a": value}).id for value in (1, True, 1.0, "1")}
+    assert len(ids) == 4
+
+
+def test_unhashable_values():
+    classes = SettingsClasses()
+    first = classes.intern({"a": [1, 2], "b": {"c": 3}})
+    assert classes.intern({"b": {"c": 3}, "a": [1, 2]}) is first
+    assert classes.intern({"a": [1, 3], "b": {"c": 3}}) is not first
+    assert classes.intern(first) is first
+    assert SettingsClasses().intern(first).id == first.id
+
+    # Nested values are read-only too
+    with pytest.raises(AttributeError):
+        first["a"].append(3)
+    with pytest.raises(TypeError):
+        first["b"]["c"] = 4
+    assert thaw(first) == {"a": [1, 2], "b": {"c": 3}}
+    assert pickle.loads(pickle.dumps(first)) == first
+
+
+def test_stable_ids():
+    settings = {"indent_style": "space", "indent_size": "4"}
+    first = SettingsClasses().intern(settings)
+    SettingsClasses().intern({"other": "x"})
+    assert SettingsClasses().intern(dict(reversed(settings.items()))).id == first.id
+    assert pickle.loads(pickle.dumps(first)).id == first.id
+
+
+def test_read_only():
+    settings_class = SettingsClasses().intern({"a": "1"})
+    with pytest.raises(TypeError):
+        settings_class["a"] = "2"
+    with pytest.raises(TypeError):
+        settings_class.update(b="3")
+    copy = settings_class.copy()
+    copy["a"] = "2"
+    assert settings_class == {"a": "1"}
+
+
+def test_resolve(tmp_tree):
+    tmp_tree.make(
+        {
+            TC_CONFIG_NAME: "root=true\n['*.py']\nindent=4\n",
+            "a": {"x.py": "", "y.py": "", "z.txt": ""},
+            "b": {"x.py": ""},
+        }
+    )
+    classes = SettingsClasses()
+    results = resolve_tree(str(tmp_tree.root), classes=classes)
+    assert results == resolve_tree(str(tmp_tree.root))
+    assert len({id(settings) for settings in results.values()}) == len(classes) == 2
+
+    py = str(tmp_tree.root / "a" / "x.py")
+    assert resolve_many([py], classes=classes)[py] is results[py]
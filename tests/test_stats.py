@@ -0,0 +1,74 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Tests of toolconfig_core.stats"""
+
+import pytest
+from cli_test_helpers import shell
+
+from toolconfig_core import stats
+from toolconfig_core.ecpy import fnmatch
+from toolconfig_core.handler import ToolConfigHandler
+
+
+@pytest.fixture
+def collecting():
+    stats.reset()
+    stats.enable()
+    yield
+    stats.disable()
+    stats.reset()
+
+
+def test_disabled_by_default(project):
+    stats.reset()
+    ToolConfigHandler(str(project.root / "src" / "x.py")).get_options()
+    assert stats.snapshot() == {"counters": {}, "timers": {}}
+
+
+def test_counts(project, collecting):
+    fnmatch.clear_cache()
+    target = str(project.root / "src" / "sub" / "x.py")
+    assert ToolConfigHandler(target).get_options() == {"a": 1, "b": 2}
+
+    data = stats.snapshot()
+    counters = data["counters"]
+    assert counters["config_file.created"] == 3
+    assert counters["files.opened"] == 2
+    assert (counters["tc.parsed"], counters["ec.parsed"]) == (1, 1)
+    assert counters["match.attempted"] == 3
+    assert counters["match.succeeded"] == 2
+    assert counters["fnmatch.compiles"] == 1  # The src/**/x*.py PatternSet
+    assert set(data["timers"]) == {"tc.parse", "ec.parse", "fnmatch.compile"}
+    assert data["timers"]["tc.parse"]["calls"] == 1
+
+    # Parsed files are cached
+    ToolConfigHandler(target).get_options()
+    counters = stats.snapshot()["counters"]
+    assert counters["config_file.created"] == 6
+    assert counters["files.opened"] == 2
+
+
+def test_translate_cache(collecting):
+    fnmatch.clear_cache()
+    fnmatch.fnmatch("/a/b.py", "**/*.py")
+    fnmatch.fnmatch("/a/c.py", "**/*.py")
+    counters = stats.snapshot()["counters"]
+    assert counters["fnmatch.cache_misses"] == 1
+    assert counters["fnmatch.cache_hits"] == 1
+
+
+def test_report(collecting):
+    stats.count("x.y", 3)
+    stats.add_time("t", 0.5)
+    report = stats.report()
+    assert "x.y" in report and "3" in report
+    assert "500.000 ms in 1 calls" in report
+
+
+def test_cli(project):
+    result = shell(f"toolconfig --stats {project.root / 'src' / 'x.py'}")
+    assert result.exit_code == 0
+    assert "toolconfig stats:" in result.stderr
+    assert "tc.parsed" in result.stderr
+    assert "stats" not in result.stdout
@@ -0,0 +1,65 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Tests of toolconfig_core.stream"""
+
+import io
+import os
+
+from toolconfig_core import TC_CONFIG_NAME
+from toolconfig_core.handler import ToolConfigHandler
+from toolconfig_core.stream import read_paths, resolve_batches
+
+
+class ChunkedStream(object):
+    """Returns one preset chunk per read1(), like a pipe"""
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+
+    def read1(self, size):
+        return self.chunks.pop(0) if self.chunks else b""
+
+
+def test_read_paths_split_across_reads():
+    stream = ChunkedStream([b"/a/one\0/a/t", b"wo\0", b"\0/b/three"])
+    assert list(read_paths(stream, b"\0")) == [
+        ["/a/one"],
+        ["/a/two"],
+        ["/b/three"],
+    ]
+
+
+def test_read_paths_newlines():
+    stream = io.BytesIO(b"/x\n\n/y\n")
+    assert list(read_paths(stream, chunk_size=3)) == [["/x"], ["/y"]]
+
+
+def test_read_paths_crlf():
+    stream = ChunkedStream([b"/x\r", b"\n\r\n/y\r\n/z\r"])
+    assert list(read_paths(stream)) == [["/x", "/y"], ["/z"]]
+    # Only newline-separated input is CRLF
+    assert list(read_paths(io.BytesIO(b"/x\r\0"), b"\0")) == [["/x\r"]]
+
+
+def test_read_paths_undecodable():
+    (batch,) = read_paths(io.BytesIO(b"/bad\xff\n"))
+    assert os.fsencode(batch[0]) == b"/bad\xff"
+
+
+def test_resolve_batches(tmp_tree, monkeypatch):
+    tmp_tree.make({TC_CONFIG_NAME: "root=true\n['*.txt']\ntxt='yes'\n"})
+    monkeypatch.chdir(tmp_tree.root)
+    absolute = str(tmp_tree.root / "b.txt")
+    batches = [["z.txt", absolute], ["sub/c"]]
+    assert list(resolve_batches(batches)) == [
+        [("z.txt", {"txt": "yes"}), (absolute, {"txt": "yes"})],
+        [("sub/c", ToolConfigHandler(str(tmp_tree.root / "sub" / "c")).get_options())],
+    ]
+
+    batches = [["a.txt", "b.txt"], ["a.txt", "c.txt", "b.txt"]]
+    results = resolve_batches(batches, unique=True)
+    assert [[path for path, _ in batch] for batch in results] == [
+        ["a.txt", "b.txt"],
+        ["c.txt"],
+    ]
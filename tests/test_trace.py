@@ -0,0 +1,95 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Tests of toolconfig_core.trace"""
+
+import pytest
+
+from toolconfig_core import EC_CONFIG_NAME, TC_CONFIG_NAME, trace
+from toolconfig_core.ecpy import fnmatch
+from toolconfig_core.handler import ToolConfigHandler
+from toolconfig_core.resolve import resolve_tree
+
+
+class Recorder(object):
+    def __init__(self):
+        self.events = []
+        self.ended = []
+
+    def start(self, span):
+        self.events.append(("start", span.stage))
+
+    def end(self, span):
+        self.events.append(("end", span.stage))
+        self.ended.append(span)
+
+    def spans(self, stage):
+        return [span for span in self.ended if span.stage == stage]
+
+
+@pytest.fixture
+def recorder():
+    fnmatch.clear_cache()
+    recorder = Recorder()
+    handle = trace.add_hook(recorder.start, recorder.end)
+    yield recorder
+    trace.remove_hook(handle)
+
+
+def test_inactive_without_hooks():
+    assert not trace.active
+    handle = trace.add_hook(end=lambda span: None)
+    assert trace.active
+    trace.remove_hook(handle)
+    assert not trace.active
+
+
+def test_lookup_stages(project, recorder):
+    target = str(project.root / "src" / "x.py")
+    assert ToolConfigHandler(target).get_options() == {"a": 1, "b": 2}
+
+    (walk,) = recorder.spans("walk")
+    assert walk.attributes == {"path": str(project.root / "src"), "configs": 2}
+
+    (load_tc,) = recorder.spans("load_tc")
+    assert load_tc.attributes == {
+        "path": str(project.root / TC_CONFIG_NAME),
+        "sections": 2,
+    }
+    (load_ec,) = recorder.spans("load_ec")
+    assert load_ec.attributes["sections"] == 1
+
+    matches = {
+        span.attributes["config"]: span.attributes for span in recorder.spans("match")
+    }
+    assert matches[str(project.root / TC_CONFIG_NAME)]["matched"] == 2
+    assert matches[str(project.root / "src" / EC_CONFIG_NAME)]["matched"] == 0
+
+    (merge,) = recorder.spans("merge")
+    assert merge.attributes == {"path": target, "configs": 2, "options": 2}
+
+    assert recorder.spans("translate")
+    assert all(span.duration >= 0 and span.error is None for span in recorder.ended)
+
+
+def test_nesting(project, recorder):
+    ToolConfigHandler(str(project.root / "src" / "x.py")).get_options()
+    events = recorder.events
+    assert events[0] == ("start", "walk")
+    assert events.index(("end", "load_tc")) < events.index(("end", "walk"))
+    assert events[-1] == ("end", "merge")
+
+
+def test_error(tmp_tree, recorder):
+    tmp_tree.make({TC_CONFIG_NAME: "root=true\n[[\n"})
+    with pytest.raises(Exception):
+        ToolConfigHandler(str(tmp_tree.root / "x.py")).get_options()
+    (load_tc,) = recorder.spans("load_tc")
+    assert load_tc.error is not None
+    assert "sections" not in load_tc.attributes
+
+
+def test_tree(project, recorder):
+    results = resolve_tree(str(project.root))
+    assert len(recorder.spans("walk")) == 2
+    assert len(recorder.spans("merge")) == len(results)
@@ -0,0 +1,210 @@
+# Part of toolconfig-core-py
+# Copyright (c) 2023 Christopher White.
+# SPDX-License-Identifier: BSD-2-Clause
+"""Tests of toolconfig_core.watch"""
+
+import os
+import time
+from unittest import mock
+
+import pytest
+
+from toolconfig_core import TC_CONFIG_NAME, watch
+from toolconfig_core.cache import ConfigCache
+from toolconfig_core.config_file import ToolConfigFile
+from toolconfig_core.handler import ToolConfigHandler
+
+
+def _inotify_cache():
+    cache = ConfigCache()
+    try:
+        cache.watcher = watch.InotifyWatcher(cache.invalidate)
+    except OSError:
+        pytest.skip("inotify is not available")
+    return cache
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def inotify_cache():
+    cache = _inotify_cache()
+    yield cache
+    watch.disable(cache)
+
+
+def test_hit_skips_stat(tmp_path, inotify_cache):
+    path = tmp_path / TC_CONFIG_NAME
+    path.write_text("['*']\nkey='v'\n")
+    first = inotify_cache.get(str(path), ToolConfigFile)
+    with mock.patch("os.stat", side_effect=AssertionError("stat called")):
+        assert inotify_cache.get(str(path), ToolConfigFile) is first
+
+
+def test_missing_file_remembered(tmp_path, inotify_cache):
+    path = str(tmp_path / TC_CONFIG_NAME)
+    with pytest.raises(FileNotFoundError):
+        inotify_cache.get(path, ToolConfigFile)
+    with mock.patch("os.stat", side_effect=AssertionError("stat called")):
+        with pytest.raises(FileNotFoundError):
+            inotify_cache.get(path, ToolConfigFile)
+
+    # Creating it is noticed
+    with open(path, "w") as f:
+        f.write("['*']\nkey='new'\n")
+    assert _wait_for(lambda: path not in inotify_cache)
+    loaded = inotify_cache.get(path, ToolConfigFile)
+    assert loaded.settings_for(str(tmp_path / "x")) == {"key": "new"}
+
+
+def test_modification_invalidates(tmp_path, inotify_cache):
+    path = tmp_path / TC_CONFIG_NAME
+    path.write_text("['*']\nkey='old'\n")
+    inotify_cache.get(str(path), ToolConfigFile)
+    path.write_text("['*']\nkey='new'\n")
+    assert _wait_for(lambda: str(path) not in inotify_cache)
+    loaded = inotify_cache.get(str(path), ToolConfigFile)
+    assert loaded.settings_for(str(tmp_path / "x")) == {"key": "new"}
+
+
+def test_other_files_ignored(tmp_path, inotify_cache):
+    path = tmp_path / TC_CONFIG_NAME
+    path.write_text("['*']\nkey='v'\n")
+    inotify_cache.get(str(path), ToolConfigFile)
+    generation = inotify_cache.watcher.generation(str(path))
+
+    # Events arrive in order, so once the barrier's is seen, the
+    # unrelated file's has been handled.
+    (tmp_path / "sub").mkdir()
+    barrier = str(tmp_path / "sub" / TC_CONFIG_NAME)
+    with pytest.raises(FileNotFoundError):
+        inotify_cache.get(barrier, ToolConfigFile)
+    (tmp_path / "unrelated").write_text("x")
+    with open(barrier, "w"):
+        pass
+    assert _wait_for(lambda: barrier not in inotify_cache)
+    assert inotify_cache.watcher.generation(str(path)) == generation
+    assert str(path) in inotify_cache
+
+
+def test_renamed_directory_untrusted(tmp_path, inotify_cache):
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    path = sub / TC_CONFIG_NAME
+    path.write_text("['*']\nkey='v'\n")
+    inotify_cache.watcher.generation(str(tmp_path / "sub"))  # Watch parent
+    inotify_cache.get(str(path), ToolConfigFile)
+    os.rename(sub, tmp_path / "moved")
+    assert _wait_for(lambda: str(path) not in inotify_cache)
+    assert inotify_cache.watcher.generation(str(path)) is None
+    with pytest.raises(FileNotFoundError):
+        inotify_cache.get(str(path), ToolConfigFile)
+
+
+class RecordingLibc(object):
+    """Records inotify_rm_watch() calls, passing every call through"""
+
+    def __init__(self, libc):
+        self.libc = libc
+        self.removed = []
+
+    def inotify_rm_watch(self, fd, wd):
+        self.removed.append(wd)
+        return self.libc.inotify_rm_watch(fd, wd)
+
+    def __getattr__(self, name):
+        return getattr(self.libc, name)
+
+
+@pytest.mark.parametrize("watch_parent", [False, True])
+def test_moved_directory_watch_removed(tmp_path, inotify_cache, watch_parent):
+    watcher = inotify_cache.watcher
+    libc = watcher._libc = RecordingLibc(watcher._libc)
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    if watch_parent:
+        watcher.generation(str(sub))
+    watcher.generation(str(sub / TC_CONFIG_NAME))
+    wd = watcher._dirs[str(sub)]
+    os.rename(sub, tmp_path / "moved")
+    assert _wait_for(lambda: wd in libc.removed)
+
+
+def test_deleted_directory_watch_dropped(tmp_path, inotify_cache):
+    watcher = inotify_cache.watcher
+    libc = watcher._libc = RecordingLibc(watcher._libc)
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    watcher.generation(str(sub / TC_CONFIG_NAME))
+    sub.rmdir()
+    assert _wait_for(lambda: str(sub) not in watcher._dirs)
+    assert libc.removed == []  # The kernel removed it
+
+
+def test_closed_watcher_untrusted(tmp_path, inotify_cache):
+    path = str(tmp_path / TC_CONFIG_NAME)
+    watcher = inotify_cache.watcher
+    assert watcher.generation(path) is not None
+    watcher.close()
+    assert watcher.generation(path) is None
+
+
+def test_watcher_is_abstract():
+    with pytest.raises(TypeError):
+        watch.Watcher()
+
+
+def test_handler_with_watcher(tmp_tree, inotify_cache):
+    tmp_tree.make(
+        {
+            TC_CONFIG_NAME: "root=true\n['*']\nkey='top'\n",
+            "a": {"b": {"file": ""}},
+        }
+    )
+    target = str(tmp_tree.root / "a" / "b" / "file")
+    with mock.patch("toolconfig_core.config_file.config_cache", inotify_cache):
+        assert ToolConfigHandler(target).get_options() == {"key": "top"}
+        with mock.patch("os.stat", side_effect=AssertionError("stat called")):
+            assert ToolConfigHandler(target).get_options() == {"key": "top"}
+
+        (tmp_tree.root / "a" / TC_CONFIG_NAME).write_text("['*']\nnew='a'\n")
+        assert _wait_for(
+            lambda: str(tmp_tree.root / "a" / TC_CONFIG_NAME) not in inotify_cache
+        )
+        expected = {"key": "top", "new": "a"}
+        assert ToolConfigHandler(target).get_options() == expected
+
+
+def test_polling_watcher(tmp_path):
+    cache = ConfigCache()
+    cache.watcher = watch.PollingWatcher(cache.invalidate, interval=3600)
+    try:
+        path = tmp_path / TC_CONFIG_NAME
+        path.write_text("['*']\nkey='old'\n")
+        first = cache.get(str(path), ToolConfigFile)
+        with mock.patch("os.stat", side_effect=AssertionError("stat called")):
+            assert cache.get(str(path), ToolConfigFile) is first
+
+        path.write_text("['*']\nkey='newer'\n")
+        cache.watcher.poll()
+        assert str(path) not in cache
+        loaded = cache.get(str(path), ToolConfigFile)
+        assert loaded.settings_for(str(tmp_path / "x")) == {"key": "newer"}
+    finally:
+        watch.disable(cache)
+
+
+def test_enable_disable():
+    cache = ConfigCache()
+    watcher = watch.enable(cache, polling_interval=3600)
+    assert cache.watcher is watcher
+    watch.disable(cache)
+    assert cache.watcher is None
+    assert watcher.generation("/x/y") is None